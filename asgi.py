@@ -0,0 +1,8 @@
+import os
+from input_data_test_cases.mysql_api.config import load_mysql_config
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases.async_ecommerce_data_tc import AsyncEcommerceDataTC
+
+
+mode = os.getenv("DB_MODE", "remote")
+
+app = AsyncEcommerceDataTC(load_mysql_config(mode)).app
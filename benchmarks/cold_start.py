@@ -0,0 +1,54 @@
+"""
+Cold start benchmark of a WSGI worker.
+
+Imports ``wsgi`` (which builds the app) in fresh interpreters and reports
+the wall time, plus the slowest imports from ``python -X importtime``.
+No database is needed: connections are only opened on first use.
+
+    python benchmarks/cold_start.py --runs 5 --top 15
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = (
+    "import time; start = time.perf_counter(); import wsgi; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def run_probe(env, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE]
+    return subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def slowest_imports(stderr, top):
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    env = {**os.environ, 'DB_MODE': os.environ.get('DB_MODE', 'local')}
+    timings = [float(run_probe(env).stdout.strip().splitlines()[-1]) for _ in range(args.runs)]
+    print(f"import wsgi: median {statistics.median(timings) * 1000:.1f} ms, "
+          f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms over {args.runs} runs")
+    print("\nslowest imports (cumulative):")
+    for cumulative, name in slowest_imports(run_probe(env, importtime=True).stderr, args.top):
+        print(f"{cumulative / 1000:9.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
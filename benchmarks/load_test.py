@@ -0,0 +1,319 @@
+"""
+Load test of the EcommerceDataTC routes.
+
+Seeds the ``parameters`` table with a chosen number of rows and params
+size, drives the API with a weighted mix of requests at a fixed
+concurrency and writes req/s and p50/p95/p99 latency per route as JSON.
+
+Typical run against the compose stack (MySQL on 127.0.0.1:3307, API on
+port 8000):
+
+    docker compose up -d
+    python benchmarks/load_test.py seed --rows 100000 --params large
+    python benchmarks/load_test.py run --concurrency 32 --duration 60 --output head.json
+    python benchmarks/load_test.py compare base.json head.json
+
+Seeding writes straight to MySQL through SQLDBHandler; ``run`` only talks
+HTTP so it can target any deployment.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import platform
+import threading
+import subprocess
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCHEMA_FILE = os.path.join(ROOT, "test", "functional_tests", "features", "data", "test_data.yml")
+SEED_BATCH = 50000
+DEFAULT_MIX = "get_id=40,get_name=20,all_test_cases=10,post=10,put=10,delete=10"
+PERCENTILES = (50, 95, 99)
+
+
+def small_params(i):
+    return [{'timeout': i % 60}]
+
+
+def large_params(i):
+    return [
+        {'article': f"article_{i}_{n}", 'expected_price': n * 10, 'expected_quantity': n % 50}
+        for n in range(200)
+    ]
+
+
+PARAMS_SIZES = {'small': small_params, 'large': large_params}
+
+
+# ---------------------------------------------------------------- seeding
+def seed(args):
+    import yaml
+    from input_data_test_cases.mysql_api.db_handler import ModifyTableQuery
+    from input_data_test_cases.mysql_api.ecommerce_data_test_cases.ecommerce_data_tc import EcommerceDataTC
+
+    with open(args.schema, encoding="utf-8") as schema_file:
+        table = yaml.safe_load(schema_file)['table']
+    config = {
+        'MYSQL_HOST': args.db_host,
+        'MYSQL_PORT': args.db_port,
+        'MYSQL_USER': args.db_user,
+        'MYSQL_PASSWORD': args.db_password,
+        'MYSQL_DB': args.db_name,
+    }
+    handler = EcommerceDataTC(config=config).db_handler
+    handler.wait_until_ready(max_seconds=60)
+    handler.create_db(table_name=table['name'], columns=table['columns'], indexes=table.get('indexes', []))
+    handler.modify_table(ModifyTableQuery.TRUNCATE_TABLE, kwargs={'table_name': table['name']})
+    if table.get('change_log', False):
+        # TRUNCATE does not fire the delete triggers, the log starts over too
+        handler.create_change_log(table_name=table['name'])
+        handler.modify_table(
+            ModifyTableQuery.TRUNCATE_TABLE, kwargs={'table_name': handler.change_log_table(table['name'])}
+        )
+
+    make_params = PARAMS_SIZES[args.params]
+    start = time.perf_counter()
+    for offset in range(0, args.rows, SEED_BATCH):
+        rows = [
+            {'name': f"bench_{i}", 'params': make_params(i)}
+            for i in range(offset, min(offset + SEED_BATCH, args.rows))
+        ]
+        handler.insert_many(table_name=table['name'], data=rows, chunk_size=args.chunk_size)
+        print(f"seeded {offset + len(rows)}/{args.rows} rows", file=sys.stderr)
+    report = {'rows': args.rows, 'params': args.params, 'seconds': round(time.perf_counter() - start, 3)}
+    print(json.dumps(report))
+
+
+# ------------------------------------------------------------------ load
+class Workload():
+    """
+    Request mix over the seeded table. Test cases created by ``post`` are
+    the ones later removed by ``delete`` so the seeded rows stay intact.
+    """
+
+    def __init__(self, base_url, rows, make_params, page_size):
+        self.base_url = base_url.rstrip("/")
+        self.rows = rows
+        self.make_params = make_params
+        self.page_size = page_size
+        self.created = deque()
+
+    def get_id(self, session):
+        return session.get(f"{self.base_url}/test_case", params={'id': random.randint(1, self.rows)})
+
+    def get_name(self, session):
+        return session.get(f"{self.base_url}/test_case", params={'name': f"bench_{random.randrange(self.rows)}"})
+
+    def all_test_cases(self, session):
+        after_id = random.randint(0, max(self.rows - self.page_size, 0))
+        return session.get(
+            f"{self.base_url}/all_test_cases",
+            params={'limit': self.page_size, 'after_id': after_id}
+        )
+
+    def post(self, session):
+        name = f"bench_post_{uuid.uuid4().hex}"
+        response = session.post(
+            f"{self.base_url}/test_case",
+            json={'name': name, 'params': self.make_params(random.randrange(1000))}
+        )
+        if response.ok:
+            self.created.append(name)
+        return response
+
+    def put(self, session):
+        i = random.randrange(self.rows)
+        return session.put(
+            f"{self.base_url}/test_case",
+            params={'id': i + 1},
+            data={'params': json.dumps(self.make_params(i))}
+        )
+
+    def delete(self, session):
+        try:
+            name = self.created.popleft()
+        except IndexError:
+            return None
+        return session.delete(f"{self.base_url}/test_case", params={'name': name})
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        route, weight = item.split("=")
+        if not hasattr(Workload, route.strip()):
+            raise SystemExit(f"Unknown route {route!r} in --mix")
+        weights[route.strip()] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def drive(workload, weights, concurrency, duration, warmup):
+    import requests
+
+    routes, route_weights = list(weights), list(weights.values())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker():
+        session = requests.Session()
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            route = random.choices(routes, route_weights)[0]
+            if route == 'delete' and not workload.created:
+                route = 'post'
+            failed = False
+            start = time.perf_counter()
+            try:
+                response = getattr(workload, route)(session)
+                if response is None:
+                    continue
+                failed = not response.ok
+            except requests.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - start
+            if start < measure_from:
+                continue
+            with lock:
+                latencies[route].append(elapsed)
+                if failed:
+                    errors[route] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return latencies, errors
+
+
+def summarize(latencies, errors, duration):
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        routes[route] = {
+            'requests': len(values),
+            'errors': errors.get(route, 0),
+            'rps': round(len(values) / duration, 2),
+            **{f"p{p}_ms": round(percentile(values, p) * 1000, 3) for p in PERCENTILES},
+        }
+    total = sum(r['requests'] for r in routes.values())
+    return {
+        'total': {
+            'requests': total,
+            'errors': sum(r['errors'] for r in routes.values()),
+            'rps': round(total / duration, 2),
+        },
+        'routes': routes,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    workload = Workload(args.base_url, args.rows, PARAMS_SIZES[args.params], args.page_size)
+    weights = parse_mix(args.mix)
+    latencies, errors = drive(workload, weights, args.concurrency, args.duration, args.warmup)
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'host': platform.node(),
+        'config': {
+            'base_url': args.base_url,
+            'rows': args.rows,
+            'params': args.params,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'mix': weights,
+        },
+        **summarize(latencies, errors, args.duration),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+# --------------------------------------------------------------- compare
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current, encoding="utf-8") as current_file:
+        current = json.load(current_file)
+    print(f"{'route':<16}{'metric':<10}{baseline.get('commit') or 'baseline':>12}"
+          f"{current.get('commit') or 'current':>12}{'change':>10}")
+    for route in sorted(set(baseline['routes']) | set(current['routes'])):
+        before = baseline['routes'].get(route, {})
+        after = current['routes'].get(route, {})
+        for metric in ['rps'] + [f"p{p}_ms" for p in PERCENTILES]:
+            old, new = before.get(metric), after.get(metric)
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "n/a"
+            print(f"{route:<16}{metric:<10}{old if old is not None else '-':>12}"
+                  f"{new if new is not None else '-':>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Recreate and fill the parameters table")
+    seed_parser.add_argument('--rows', type=int, default=1000, help="Rows to insert (e.g. 1000, 100000, 1000000)")
+    seed_parser.add_argument('--params', choices=PARAMS_SIZES, default='small', help="Size of each params document")
+    seed_parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per INSERT statement")
+    seed_parser.add_argument('--schema', default=SCHEMA_FILE, help="YAML file holding the table definition")
+    seed_parser.add_argument('--db-host', default=os.getenv("DB_HOST", "127.0.0.1"))
+    seed_parser.add_argument('--db-port', type=int, default=int(os.getenv("DB_PORT", "3307")))
+    seed_parser.add_argument('--db-user', default=os.getenv("DB_USER", "root"))
+    seed_parser.add_argument('--db-password', default=os.getenv("DB_PASS", "root"))
+    seed_parser.add_argument('--db-name', default=os.getenv("DB_NAME", "testdb"))
+    seed_parser.set_defaults(handler=seed)
+
+    run_parser = commands.add_parser("run", help="Drive the API and report latency per route")
+    run_parser.add_argument('--base-url', default="http://127.0.0.1:8000")
+    run_parser.add_argument('--rows', type=int, default=1000, help="Rows seeded, ids are picked in 1..rows")
+    run_parser.add_argument('--params', choices=PARAMS_SIZES, default='small', help="Size of posted params")
+    run_parser.add_argument('--concurrency', type=int, default=16, help="Concurrent clients")
+    run_parser.add_argument('--duration', type=float, default=30, help="Measured seconds")
+    run_parser.add_argument('--warmup', type=float, default=5, help="Seconds run before measuring")
+    run_parser.add_argument('--page-size', type=int, default=100, help="limit used on /all_test_cases")
+    run_parser.add_argument('--mix', default=DEFAULT_MIX, help="Comma separated route=weight pairs")
+    run_parser.add_argument('--output', help="Also write the JSON report to this file")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two run reports")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
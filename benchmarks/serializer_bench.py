@@ -0,0 +1,53 @@
+"""
+Microbenchmark of the response encoding paths for large params documents.
+
+Compares flask.jsonify, the pluggable serializers on a decoded document
+and writing the document as it comes from MySQL (already encoded JSON)
+through RawJSON.
+
+    python benchmarks/serializer_bench.py --items 5000 --number 200
+"""
+import json
+import argparse
+import timeit
+from flask import Flask, jsonify
+from input_data_test_cases import serializers
+from input_data_test_cases.serializers import JSONSerializer, OrjsonSerializer, RawJSON
+
+
+def build_params(items):
+    return [
+        {'article': f"article_{i}", 'expected_price': i * 10, 'expected_quantity': i % 50, 'tags': ['a', 'b', 'c']}
+        for i in range(items)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000, help="Elements in the params array")
+    parser.add_argument('--number', type=int, default=200, help="Encodes per measurement")
+    args = parser.parse_args()
+
+    params = build_params(args.items)
+    stored = json.dumps(params)
+    app = Flask(__name__)
+    cases = {
+        'flask.jsonify(decoded)': lambda: jsonify([{'params': json.loads(stored)}]).get_data(),
+        'json dumps(decoded)': lambda: JSONSerializer().dumps([{'params': json.loads(stored)}]),
+        'json dumps(RawJSON)': lambda: JSONSerializer().dumps([{'params': RawJSON(stored)}]),
+    }
+    if serializers.orjson is not None:
+        cases['orjson dumps(decoded)'] = lambda: OrjsonSerializer().dumps([{'params': json.loads(stored)}])
+        cases['orjson dumps(RawJSON)'] = lambda: OrjsonSerializer().dumps([{'params': RawJSON(stored)}])
+
+    print(f"params: {args.items} items, {len(stored) / 1024:.1f} KiB encoded")
+    with app.app_context():
+        baseline = None
+        for name, case in cases.items():
+            seconds = min(timeit.repeat(case, number=args.number, repeat=3)) / args.number
+            baseline = baseline or seconds
+            print(f"{name:<26} {seconds * 1e6:10.1f} us/op  x{baseline / seconds:6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import os
+import shutil
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    # Metric files of a previous run would otherwise be summed into the new one
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+    # Schema changes run once, in the master, before any worker is forked
+    from input_data_test_cases.mysql_api.config import load_mysql_config
+    from input_data_test_cases.mysql_api.ecommerce_data_test_cases.ecommerce_data_tc import EcommerceDataTC
+    EcommerceDataTC.migrate(load_mysql_config(os.getenv("DB_MODE", "remote")))
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from quart import Quart, g, request
+from input_data_test_cases.base_api import BaseApiException, StatusCode
+from input_data_test_cases.metrics import RequestMetrics
+from input_data_test_cases.serializers import get_serializer
+
+
+class AsyncRequestMetrics(RequestMetrics):
+    """
+    RequestMetrics hooks for Quart, recording the same series.
+    """
+
+    @classmethod
+    async def before_request(cls):
+        cls.request_started(g, request)
+
+    @classmethod
+    async def after_request(cls, response):
+        g.metrics_status = response.status_code
+        return response
+
+    @classmethod
+    async def teardown_request(cls, exc):
+        cls.request_finished(g, request)
+
+
+class AsyncBaseApi(ABC):
+    """
+    ASGI sibling of BaseApi built on Quart, whose views are coroutines so
+    a single worker can keep many requests waiting on I/O at once.
+    """
+
+    def __init__(self, config):
+        self.app = Quart(__name__)
+        self.config = config
+        self.serializer = get_serializer(config.get('JSON_SERIALIZER', 'auto'))
+        self.metrics = AsyncRequestMetrics(self.app)
+        self.client = self.setup_client()
+        self.define_routes()
+        self.app.add_url_rule("/metrics", endpoint="metrics", view_func=self.get_metrics, methods=["GET"])
+        self.app.add_url_rule("/livez", endpoint="livez", view_func=self.get_livez, methods=["GET"])
+        self.app.add_url_rule("/readyz", endpoint="readyz", view_func=self.get_readyz, methods=["GET"])
+
+    @abstractmethod
+    def setup_client(self):
+        raise BaseApiException("Rout are not defined")
+
+    @abstractmethod
+    def define_routes(self):
+        raise BaseApiException("Rout are not defined")
+
+    async def is_ready(self):
+        return True, {}
+
+    async def get_livez(self):
+        return self.format_response({'status': 'alive'}, status_code=StatusCode.OK)
+
+    async def get_readyz(self):
+        ready, details = await self.is_ready()
+        if ready:
+            return self.format_response({'status': 'ready', **details}, status_code=StatusCode.OK)
+        return self.format_response({'status': 'unavailable', **details}, status_code=StatusCode.SERVICE_UNAVAILABLE)
+
+    async def get_metrics(self):
+        body, content_type = self.metrics.render()
+        return self.app.response_class(body, content_type=content_type), StatusCode.OK
+
+    def run(self, debug):
+        self.app.run(debug=debug)
+
+    def format_response(self, response, status_code):
+        return self.format_raw_response(self.serializer.dumps(response), status_code)
+
+    def format_raw_response(self, body, status_code):
+        return self.app.response_class(body, mimetype="application/json"), status_code
+
+    def is_not_modified(self, etag):
+        return request.if_none_match.contains(etag)
+
+    def not_modified_response(self, etag):
+        response = self.app.response_class(b"", status=StatusCode.NOT_MODIFIED)
+        response.set_etag(etag)
+        return response, StatusCode.NOT_MODIFIED
+
+    async def make_conditional(self, formatted, etag=None):
+        response, status_code = formatted
+        if status_code != StatusCode.OK:
+            return formatted
+        response.status_code = status_code
+        if etag is None:
+            await response.add_etag()
+        else:
+            response.set_etag(etag)
+        await response.make_conditional(request)
+        return response, response.status_code
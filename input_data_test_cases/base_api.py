@@ -1,14 +1,20 @@
 from abc import ABC, abstractmethod
-from flask import Flask,jsonify
+from flask import Flask,request
 from enum import Enum
+from input_data_test_cases.serializers import get_serializer
+from input_data_test_cases.compression import ResponseCompressor
+from input_data_test_cases.metrics import RequestMetrics
 
 
 class StatusCode(int, Enum):
     OK = 200
     CREATED = 201
     NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     NOT_FOUND = 404
+    CONFLICT = 409
+    SERVICE_UNAVAILABLE = 503
 
 
 
@@ -20,8 +26,29 @@ class BaseApi(ABC):
     def __init__(self, config):
         self.app = Flask(__name__)
         self.config = config
+        self.serializer = get_serializer(config.get('JSON_SERIALIZER', 'auto'))
+        self.metrics = RequestMetrics(self.app)
+        self.compressor = self.setup_compressor()
         self.client = self.setup_client()
         self.define_routes()
+        self.app.add_url_rule("/metrics", endpoint="metrics", view_func=self.get_metrics, methods=["GET"])
+        self.app.add_url_rule("/livez", endpoint="livez", view_func=self.get_livez, methods=["GET"])
+        self.app.add_url_rule("/readyz", endpoint="readyz", view_func=self.get_readyz, methods=["GET"])
+
+    def setup_compressor(self):
+        """
+        Register response compression unless COMPRESSION_MIN_SIZE is None.
+        """
+        if 'COMPRESSION_MIN_SIZE' in self.config and self.config['COMPRESSION_MIN_SIZE'] is None:
+            return None
+        compressor = ResponseCompressor(
+            min_size=self.config.get('COMPRESSION_MIN_SIZE', 1024),
+            level=self.config.get('COMPRESSION_LEVEL'),
+            encodings=self.config.get('COMPRESSION_ENCODINGS'),
+            cache_size=self.config.get('COMPRESSION_CACHE_SIZE', 256)
+        )
+        self.app.after_request(compressor.after_request)
+        return compressor
     
     @abstractmethod
     def setup_client(self):
@@ -35,8 +62,63 @@ class BaseApi(ABC):
     def define_routes(self):
         raise BaseApiException("Rout are not defined")
 
+    def is_ready(self):
+        """
+        Return ``(ready, details)`` about the backing services; APIs with
+        a client to wait on override it.
+        """
+        return True, {}
+
+    def get_livez(self):
+        return self.format_response({'status': 'alive'}, status_code=StatusCode.OK)
+
+    def get_readyz(self):
+        ready, details = self.is_ready()
+        if ready:
+            return self.format_response({'status': 'ready', **details}, status_code=StatusCode.OK)
+        return self.format_response({'status': 'unavailable', **details}, status_code=StatusCode.SERVICE_UNAVAILABLE)
+
+    def get_metrics(self):
+        body, content_type = self.metrics.render()
+        return self.app.response_class(body, content_type=content_type), StatusCode.OK
+
     def run(self, debug):
         self.app.run(debug=debug)
     
     def format_response(self, response, status_code):
-        return jsonify(response), status_code
\ No newline at end of file
+        return self.format_raw_response(self.serializer.dumps(response), status_code)
+
+    def format_raw_response(self, body, status_code):
+        """
+        Same as ``format_response`` for a body that is already encoded
+        JSON, which is written out without being decoded again.
+        """
+        return self.app.response_class(body, mimetype="application/json"), status_code
+
+    def is_not_modified(self, etag):
+        etags = [etag]
+        if self.compressor is not None:
+            etags += [f"{etag}-{codec.name}" for codec in self.compressor.codecs]
+        return any(request.if_none_match.contains(e) for e in etags)
+
+    def not_modified_response(self, etag):
+        response = self.app.response_class(status=StatusCode.NOT_MODIFIED)
+        response.set_etag(etag)
+        return response, StatusCode.NOT_MODIFIED
+
+    def make_conditional(self, formatted, etag=None):
+        """
+        Tag a successful ``format_response`` result with a strong ETag (the
+        given one or a hash of the body) and turn it into a 304 when the
+        request's If-None-Match already holds it.
+        """
+        response, status_code = formatted
+        if status_code != StatusCode.OK:
+            return formatted
+        response.status_code = status_code
+        if etag is None:
+            response.add_etag()
+        else:
+            response.set_etag(etag)
+        response.make_conditional(request)
+        return response, response.status_code
\ No newline at end of file
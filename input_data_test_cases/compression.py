@@ -0,0 +1,208 @@
+import zlib
+import hashlib
+from flask import request
+from input_data_test_cases.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+class CompressionException(Exception):
+    pass
+
+
+class GzipCodec():
+    name = "gzip"
+    min_level, max_level, default_level = 1, 9, 6
+
+    def compress(self, data, level):
+        compressor = self.compressobj(level)
+        return compressor.compress(data) + compressor.flush()
+
+    def compressobj(self, level):
+        # wbits 31 writes a gzip header with a zero mtime, so equal bodies
+        # always compress to equal bytes
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class BrotliCodec():
+    name = "br"
+    min_level, max_level, default_level = 0, 11, 5
+
+    def compress(self, data, level):
+        return brotli.compress(data, quality=level)
+
+    def compressobj(self, level):
+        return _BrotliStream(brotli.Compressor(quality=level))
+
+
+class _BrotliStream():
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+class ZstdCodec():
+    name = "zstd"
+    min_level, max_level, default_level = 1, 22, 3
+
+    def compress(self, data, level):
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def compressobj(self, level):
+        return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+def available_codecs():
+    """
+    Codecs usable in this environment, in server preference order.
+    """
+    codecs = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec())
+    if brotli is not None:
+        codecs.append(BrotliCodec())
+    codecs.append(GzipCodec())
+    return codecs
+
+
+class ResponseCompressor():
+    """
+    ``after_request`` hook compressing responses with the best encoding
+    the client accepts.
+
+    Bodies under ``min_size`` bytes are left alone; streamed responses are
+    compressed chunk by chunk as they are sent. Compressed bodies are cached
+    by ETag (or a digest of the body) so unchanged results are compressed
+    once. The ETag of a compressed response gets the encoding as suffix, as
+    it is a different representation, and If-None-Match is checked again
+    against it.
+    """
+    COMPRESSIBLE_MIMETYPES = (
+        'application/json',
+        'application/x-ndjson',
+    )
+
+    def __init__(self, min_size=1024, level=None, encodings=None, cache_size=256, cache_ttl=300):
+        codecs = {codec.name: codec for codec in available_codecs()}
+        if encodings is None:
+            encodings = list(codecs)
+        unknown = [e for e in encodings if e not in codecs]
+        if unknown:
+            raise CompressionException(f"Unsupported encodings {unknown}, available {list(codecs)}")
+        self.codecs = [codecs[e] for e in encodings]
+        self.min_size = min_size
+        self.level = level
+        self.cache = TTLCache(max_size=cache_size, ttl=cache_ttl)
+
+    def negotiate(self, accept_encodings):
+        """
+        Pick the codec with the highest quality in ``accept_encodings``,
+        preferring the configured order on ties.
+        """
+        best, best_quality = None, 0
+        for codec in self.codecs:
+            quality = accept_encodings.quality(codec.name)
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    def codec_level(self, codec):
+        if self.level is None:
+            return codec.default_level
+        return max(codec.min_level, min(codec.max_level, self.level))
+
+    def is_compressible(self, response):
+        return (
+            response.mimetype in self.COMPRESSIBLE_MIMETYPES or response.mimetype.startswith('text/')
+        ) and 'Content-Encoding' not in response.headers
+
+    def after_request(self, response):
+        if not self.is_compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        codec = self.negotiate(request.accept_encodings)
+        if codec is None:
+            return response
+        if response.status_code == 304:
+            return self._tag_not_modified(response, codec)
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+        if response.is_streamed:
+            return self._compress_stream(response, codec)
+        return self._compress_body(response, codec)
+
+    @staticmethod
+    def _encoded_etag(response, codec):
+        etag, weak = response.get_etag()
+        return (f"{etag}-{codec.name}", weak) if etag else (None, weak)
+
+    def _tag_not_modified(self, response, codec):
+        etag, weak = self._encoded_etag(response, codec)
+        if etag and request.if_none_match.contains(etag):
+            response.set_etag(etag, weak=weak)
+        return response
+
+    def _compress_body(self, response, codec):
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        level = self.codec_level(codec)
+        etag, weak = self._encoded_etag(response, codec)
+        key = (codec.name, level, etag or hashlib.blake2b(data, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = codec.compress(data, level)
+            self.cache.set(key, compressed)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = codec.name
+        if etag:
+            response.set_etag(etag, weak=weak)
+            response.make_conditional(request)
+        return response
+
+    def _compress_stream(self, response, codec):
+        chunks = response.response
+        compressor = codec.compressobj(self.codec_level(codec))
+
+        def compressed_chunks():
+            try:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    compressed = compressor.compress(chunk)
+                    if compressed:
+                        yield compressed
+                yield compressor.flush()
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+
+        response.response = compressed_chunks()
+        response.headers['Content-Encoding'] = codec.name
+        response.headers.pop('Content-Length', None)
+        etag, weak = self._encoded_etag(response, codec)
+        if etag:
+            response.set_etag(etag, weak=weak)
+        return response
+
+    def stats(self):
+        return {
+            'encodings': [codec.name for codec in self.codecs],
+            'min_size': self.min_size,
+            'level': self.level,
+            'cache': self.cache.stats(),
+        }
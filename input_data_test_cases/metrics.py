@@ -0,0 +1,127 @@
+import os
+import time
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests served', ['method', 'route', 'status'])
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests', ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'HTTP requests being handled', ['method'], multiprocess_mode='livesum')
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Time spent executing SQL statements', ['query', 'status'],
+    buckets=LATENCY_BUCKETS)
+DB_QUERY_ROWS = Histogram(
+    'db_query_rows', 'Rows returned by consult queries', ['query'], buckets=ROWS_BUCKETS)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    'db_pool_checkout_seconds', 'Time spent waiting for a pooled connection', buckets=LATENCY_BUCKETS)
+
+
+def query_label(base_query):
+    """
+    Metric label of a ``ConsultTableQuery``/``ModifyTableQuery`` member.
+    """
+    return getattr(base_query, 'name', 'raw')
+
+
+class timed():
+    """
+    Context manager observing the time spent in its block on a histogram.
+    When ``with_status`` is set the ``status`` label is ``ok`` or ``error``
+    depending on whether the block raised.
+    """
+
+    def __init__(self, histogram, with_status=False, **labels):
+        self.histogram = histogram
+        self.with_status = with_status
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = dict(self.labels)
+        if self.with_status:
+            labels['status'] = 'error' if exc_type else 'ok'
+        self.elapsed = time.perf_counter() - self.start
+        histogram = self.histogram.labels(**labels) if labels else self.histogram
+        histogram.observe(self.elapsed)
+        return False
+
+
+class RequestMetrics():
+    """
+    Flask hooks recording request counts, latency and in-flight requests
+    per route template and status.
+
+    Under gunicorn the values are shared between workers through
+    ``PROMETHEUS_MULTIPROC_DIR`` and ``render`` aggregates them.
+    """
+
+    def __init__(self, app):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    @classmethod
+    def before_request(cls):
+        cls.request_started(g, request)
+
+    @classmethod
+    def after_request(cls, response):
+        g.metrics_status = response.status_code
+        return response
+
+    @classmethod
+    def teardown_request(cls, exc):
+        cls.request_finished(g, request)
+
+    @staticmethod
+    def request_started(g, request):
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = None
+        HTTP_REQUESTS_IN_FLIGHT.labels(method=request.method).inc()
+
+    @staticmethod
+    def request_finished(g, request):
+        """
+        Record a request from the ``g`` and ``request`` proxies of the
+        framework serving it (Flask or Quart).
+        """
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        status = g.pop('metrics_status', None) or 500
+        # Unmatched urls share one label to keep the series count bounded
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = {'method': request.method, 'route': route, 'status': str(status)}
+        HTTP_REQUESTS.labels(**labels).inc()
+        HTTP_REQUEST_DURATION.labels(**labels).observe(time.perf_counter() - start)
+        HTTP_REQUESTS_IN_FLIGHT.labels(method=request.method).dec()
+
+    @staticmethod
+    def render():
+        """
+        Return the Prometheus text exposition and its content type.
+        """
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,249 @@
+import time
+import json
+import asyncio
+import aiomysql
+import pymysql
+from contextlib import asynccontextmanager
+from input_data_test_cases.mysql_api.db_handler import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_FETCH_SIZE,
+    READINESS_TIMEOUT,
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.dialects import MySQLDialect
+from input_data_test_cases.mysql_api.statements import StatementRegistry, StatementRegistryException
+from input_data_test_cases.metrics import DB_QUERY_DURATION, DB_QUERY_ROWS, query_label, timed
+
+
+class AsyncMySQLDialect(MySQLDialect):
+    """
+    MySQL as spoken through aiomysql, whose errors are PyMySQL's.
+    """
+    Error = pymysql.err.MySQLError
+    IntegrityError = pymysql.err.IntegrityError
+    OperationalError = pymysql.err.OperationalError
+    ProgrammingError = pymysql.err.ProgrammingError
+
+
+class AsyncSQLDBHandler():
+    """
+    asyncio counterpart of SQLDBHandler backed by an aiomysql pool.
+
+    The pool is opened lazily on first use (or explicitly through
+    ``open``) because it has to be created inside the running event loop.
+    """
+    dialect = AsyncMySQLDialect()
+    param_symbol = dialect.param_symbol
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=10, checkout_timeout=10, max_idle_seconds=300):
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.statements = StatementRegistry(param_symbol=self.param_symbol)
+        self.pool = None
+        self._open_lock = asyncio.Lock()
+
+    async def open(self):
+        async with self._open_lock:
+            if self.pool is None:
+                self.pool = await aiomysql.create_pool(
+                    minsize=self.min_size,
+                    maxsize=self.max_size,
+                    pool_recycle=self.max_idle_seconds,
+                    autocommit=False,
+                    **self.connect_kwargs
+                )
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    def pool_stats(self):
+        if self.pool is None:
+            return {'size': 0, 'in_use': 0, 'idle': 0, 'min_size': self.min_size, 'max_size': self.max_size}
+        return {
+            'size': self.pool.size,
+            'in_use': self.pool.size - self.pool.freesize,
+            'idle': self.pool.freesize,
+            'min_size': self.pool.minsize,
+            'max_size': self.pool.maxsize,
+        }
+
+    def statement_stats(self):
+        return self.statements.stats()
+
+    def violates_constraint(self, error):
+        while error is not None:
+            if isinstance(error, self.dialect.IntegrityError):
+                return True
+            error = error.__cause__
+        return False
+
+    async def readiness(self):
+        """
+        Return ``(ready, details)`` for a readiness probe after pinging one
+        pooled connection.
+        """
+        details = {'pool': self.pool_stats()}
+        try:
+            conn = await self._checkout(timeout=READINESS_TIMEOUT)
+        except SQLDBHandlerException as e:
+            return False, {**details, 'error': str(e.__cause__ or e)}
+        self.pool.release(conn)
+        return True, {'pool': self.pool_stats()}
+
+    async def _checkout(self, timeout=None):
+        timeout = timeout or self.checkout_timeout
+        if self.pool is None:
+            try:
+                await self.open()
+            except (pymysql.err.MySQLError, OSError) as e:
+                raise SQLDBHandlerException("Unable to reach the database") from e
+        try:
+            conn = await asyncio.wait_for(self.pool.acquire(), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            raise SQLDBHandlerException(f"Timed out after {timeout}s waiting for a connection") from e
+        try:
+            await conn.ping()
+        except pymysql.err.MySQLError as e:
+            conn.close()
+            self.pool.release(conn)
+            raise SQLDBHandlerException("Unable to reach the database") from e
+        return conn
+
+    @asynccontextmanager
+    async def _cursor(self, cursor_class=None):
+        conn = await self._checkout()
+        try:
+            cursor = await (conn.cursor(cursor_class) if cursor_class else conn.cursor())
+            try:
+                yield conn, cursor
+            finally:
+                await cursor.close()
+        except BaseException:
+            try:
+                await conn.rollback()
+            except Exception:
+                conn.close()
+            raise
+        finally:
+            self.pool.release(conn)
+
+    async def _query_cmd(self, cursor, base_query, kwargs, params):
+        try:
+            query = self.statements.render(base_query, kwargs)
+        except StatementRegistryException as e:
+            raise SQLDBHandlerException(str(e)) from e
+        with timed(DB_QUERY_DURATION, with_status=True, query=query_label(base_query)):
+            await cursor.execute(query, params)
+
+    async def modify_table(self, base_query: ModifyTableQuery, kwargs, params=()):
+        try:
+            async with self._cursor() as (conn, cursor):
+                await self._query_cmd(cursor=cursor, base_query=base_query, kwargs=kwargs, params=params)
+                await conn.commit()
+                return cursor.rowcount
+        except pymysql.err.IntegrityError as e:
+            raise SQLDBHandlerException("Value violates a table constraint") from e
+        except pymysql.err.OperationalError as e:
+            raise SQLDBHandlerException("Unable to modify table") from e
+
+    async def consult_table(self, base_query: ConsultTableQuery, kwargs, params=()):
+        try:
+            async with self._cursor() as (conn, cursor):
+                await self._query_cmd(cursor=cursor, base_query=base_query, kwargs=kwargs, params=params)
+                rows = await cursor.fetchall()
+                DB_QUERY_ROWS.labels(query=query_label(base_query)).observe(len(rows))
+                await conn.rollback()
+                return rows
+        except (pymysql.err.OperationalError, pymysql.err.ProgrammingError) as e:
+            raise SQLDBHandlerException("Unable to perform research") from e
+
+    async def iter_consult_table(self, base_query: ConsultTableQuery, kwargs, params=(), fetch_size=DEFAULT_FETCH_SIZE):
+        """
+        Run a consult query on an unbuffered cursor and return an async
+        iterator over its rows. The query runs before returning so errors
+        surface to the caller; a half-read connection is closed rather than
+        returned to the pool.
+        """
+        rows = self._iter_rows(base_query, kwargs, params, fetch_size)
+        try:
+            await rows.__anext__()
+        except (pymysql.err.OperationalError, pymysql.err.ProgrammingError) as e:
+            raise SQLDBHandlerException("Unable to perform research") from e
+        return rows
+
+    async def _iter_rows(self, base_query, kwargs, params, fetch_size):
+        conn = await self._checkout()
+        finished = False
+        try:
+            cursor = await conn.cursor(aiomysql.SSCursor)
+            await self._query_cmd(cursor=cursor, base_query=base_query, kwargs=kwargs, params=params)
+            yield
+            while True:
+                rows = await cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+            finished = True
+            await cursor.close()
+            await conn.rollback()
+        finally:
+            if not finished:
+                conn.close()
+            self.pool.release(conn)
+
+    async def insert_many(self, table_name, data, chunk_size=DEFAULT_CHUNK_SIZE, single_transaction=False):
+        if chunk_size < 1:
+            raise SQLDBHandlerException(f"Invalid chunk size {chunk_size}")
+        groups = {}
+        for index, datum in enumerate(data):
+            values = [json.dumps(v) if isinstance(v, (dict, list)) else v for v in datum.values()]
+            groups.setdefault(tuple(datum.keys()), []).append((index, values))
+        ids = [None] * len(data)
+        start = time.perf_counter()
+        rows = 0
+        chunks = 0
+        committed = 0
+        try:
+            async with self._cursor() as (conn, cursor):
+                for columns, indexed_values in groups.items():
+                    row_placeholders = "(" + ",".join([self.param_symbol] * len(columns)) + ")"
+                    for offset in range(0, len(indexed_values), chunk_size):
+                        chunk = indexed_values[offset:offset + chunk_size]
+                        await self._query_cmd(
+                            cursor=cursor,
+                            base_query=ModifyTableQuery.INSERT_MANY_VALUES_BASE_QUERY,
+                            kwargs={
+                                'table_name': table_name,
+                                'columns': ",".join(map(str, columns)),
+                                'rows': ",".join([row_placeholders] * len(chunk)),
+                            },
+                            params=[v for _, values in chunk for v in values]
+                        )
+                        if not single_transaction:
+                            await conn.commit()
+                            committed += len(chunk)
+                        for position, (index, _) in enumerate(chunk):
+                            ids[index] = cursor.lastrowid + position if cursor.lastrowid else None
+                        rows += len(chunk)
+                        chunks += 1
+                if single_transaction:
+                    await conn.commit()
+        except pymysql.err.MySQLError as e:
+            raise SQLDBHandlerException(f"Bulk insert failed after {committed} committed rows") from e
+        seconds = time.perf_counter() - start
+        return {
+            'rows': rows,
+            'chunks': chunks,
+            'ids': ids,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(rows / seconds, 2) if seconds else None,
+        }
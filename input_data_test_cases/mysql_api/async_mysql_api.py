@@ -0,0 +1,111 @@
+from abc import abstractmethod
+from input_data_test_cases.async_base_api import AsyncBaseApi
+from input_data_test_cases.mysql_api.async_db_handler import AsyncSQLDBHandler
+from input_data_test_cases.mysql_api.config import POOL_CONFIG_KEYS
+from input_data_test_cases.mysql_api.db_handler import (
+    DEFAULT_FETCH_SIZE,
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.mysql_api import MyslApiException
+
+
+class AsyncMysqlApi(AsyncBaseApi):
+    """
+    ASGI sibling of MysqlApi: same configuration keys and query semantics,
+    served through an aiomysql connection pool.
+    """
+    POOL_CONFIG_KEYS = POOL_CONFIG_KEYS
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.db_handler = self.client
+        self.app.before_serving(self.db_handler.open)
+        self.app.after_serving(self.db_handler.close)
+
+    def setup_client(self):
+        if self.config.get('DB_ENGINE', 'mysql') != 'mysql':
+            raise MyslApiException(
+                f"The ASGI app only serves MySQL, DB_ENGINE={self.config['DB_ENGINE']} is served by wsgi:app"
+            )
+        return AsyncSQLDBHandler(
+            connect_kwargs={
+                'host': self.config['MYSQL_HOST'],
+                'port': int(self.config.get('MYSQL_PORT', 3306)),
+                'user': self.config['MYSQL_USER'],
+                'password': self.config['MYSQL_PASSWORD'],
+                'db': self.config['MYSQL_DB'],
+            },
+            **self.pool_config()
+        )
+
+    def pool_config(self):
+        return {
+            arg: self.config[key]
+            for key, arg in self.POOL_CONFIG_KEYS.items()
+            if self.config.get(key) is not None
+        }
+
+    def placeholders(self, count):
+        return ",".join([self.db_handler.param_symbol] * count)
+
+    def pool_stats(self):
+        return self.db_handler.pool_stats()
+
+    async def is_ready(self):
+        return await self.db_handler.readiness()
+
+    @abstractmethod
+    def define_queries(self, key):
+        raise MyslApiException("Method not implemented yet")
+
+    async def query(self, base_query, kwargs, params=(), stream=False):
+        if stream:
+            return await self.stream_query(base_query=base_query, kwargs=kwargs, params=params)
+        try:
+            if isinstance(base_query, ConsultTableQuery):
+                response = await self.db_handler.consult_table(
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params
+                )
+                if response is None:
+                    raise MyslApiException("Unable to execute command")
+            elif isinstance(base_query, ModifyTableQuery):
+                response = await self.db_handler.modify_table(
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params
+                )
+                if response <= 0:
+                    raise MyslApiException("Unable to create/delete")
+            else:
+                raise MyslApiException("Unknown query type")
+            return response
+        except SQLDBHandlerException as e:
+            raise MyslApiException("Unknown query type") from e
+
+    async def bulk_insert(self, table_name, data, chunk_size, single_transaction=True):
+        try:
+            return await self.db_handler.insert_many(
+                table_name=table_name,
+                data=data,
+                chunk_size=chunk_size,
+                single_transaction=single_transaction
+            )
+        except SQLDBHandlerException as e:
+            raise MyslApiException("Unable to insert rows") from e
+
+    async def stream_query(self, base_query, kwargs, params=(), fetch_size=None):
+        if not isinstance(base_query, ConsultTableQuery):
+            raise MyslApiException("Only consult queries can be streamed")
+        try:
+            return await self.db_handler.iter_consult_table(
+                base_query=base_query,
+                kwargs=kwargs,
+                params=params,
+                fetch_size=fetch_size or self.config.get('MYSQL_FETCH_SIZE') or DEFAULT_FETCH_SIZE
+            )
+        except SQLDBHandlerException as e:
+            raise MyslApiException("Unable to execute command") from e
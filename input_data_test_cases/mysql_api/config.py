@@ -0,0 +1,148 @@
+import os
+
+# MYSQL_POOL_* configuration keys and the pool argument each one sets,
+# shared by the WSGI and ASGI APIs
+POOL_CONFIG_KEYS = {
+    'MYSQL_POOL_MIN_SIZE': 'min_size',
+    'MYSQL_POOL_MAX_SIZE': 'max_size',
+    'MYSQL_POOL_CHECKOUT_TIMEOUT': 'checkout_timeout',
+    'MYSQL_POOL_MAX_IDLE': 'max_idle_seconds',
+}
+
+
+def load_pool_config() -> dict:
+    return {
+        "MYSQL_POOL_MIN_SIZE": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "MYSQL_POOL_MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+        "MYSQL_POOL_CHECKOUT_TIMEOUT": float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10")),
+        "MYSQL_POOL_MAX_IDLE": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    }
+
+
+def load_slow_query_config() -> dict:
+    threshold = os.getenv("DB_SLOW_QUERY_SECONDS", "0.2")
+    return {
+        "MYSQL_SLOW_QUERY_SECONDS": float(threshold) if threshold.lower() != "off" else None,
+        "MYSQL_SLOW_QUERY_LOG_SIZE": int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "100")),
+        "MYSQL_SLOW_QUERY_LOG_PATH": os.getenv("DB_SLOW_QUERY_LOG_PATH"),
+        "MYSQL_SLOW_QUERY_EXPLAIN": os.getenv("DB_SLOW_QUERY_EXPLAIN", "1") not in ("0", "false", "off"),
+    }
+
+
+def load_stream_config() -> dict:
+    return {
+        "MYSQL_FETCH_SIZE": int(os.getenv("DB_FETCH_SIZE", "1000")),
+    }
+
+
+def load_replica_config() -> dict:
+    # DB_REPLICA_HOSTS=replica1:3306,replica2:3306, same credentials as the primary
+    replicas = []
+    for host in filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")):
+        host, _, port = host.strip().partition(":")
+        replicas.append({"MYSQL_HOST": host, **({"MYSQL_PORT": int(port)} if port else {})})
+    return {
+        "MYSQL_REPLICAS": replicas,
+        "MYSQL_REPLICA_STRATEGY": os.getenv("DB_REPLICA_STRATEGY", "round_robin"),
+        "MYSQL_REPLICA_RETRY_SECONDS": float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30")),
+        "MYSQL_READ_YOUR_WRITES_SECONDS": float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "0")),
+    }
+
+
+def load_cache_config() -> dict:
+    return {
+        "TEST_CASE_CACHE_SIZE": int(os.getenv("TEST_CASE_CACHE_SIZE", "1024")),
+        "TEST_CASE_CACHE_TTL": float(os.getenv("TEST_CASE_CACHE_TTL", "30")),
+    }
+
+
+def load_snapshot_config() -> dict:
+    return {
+        "TEST_CASE_SNAPSHOT": os.getenv("TEST_CASE_SNAPSHOT", "0") in ("1", "true", "on"),
+        "TEST_CASE_SNAPSHOT_POLL_SECONDS": float(os.getenv("TEST_CASE_SNAPSHOT_POLL_SECONDS", "5")),
+    }
+
+
+def load_change_log_config() -> dict:
+    return {
+        "TEST_CASE_CHANGE_LOG": os.getenv("TEST_CASE_CHANGE_LOG", "0") in ("1", "true", "on"),
+    }
+
+
+def load_group_commit_config() -> dict:
+    return {
+        "GROUP_COMMIT": os.getenv("GROUP_COMMIT", "0") in ("1", "true", "on"),
+        "GROUP_COMMIT_MAX_BATCH_SIZE": int(os.getenv("GROUP_COMMIT_MAX_BATCH_SIZE", "100")),
+        "GROUP_COMMIT_MAX_LATENCY": float(os.getenv("GROUP_COMMIT_MAX_LATENCY", "0.005")),
+    }
+
+
+def load_serializer_config() -> dict:
+    return {
+        "JSON_SERIALIZER": os.getenv("JSON_SERIALIZER", "auto"),
+    }
+
+
+def load_compression_config() -> dict:
+    min_size = os.getenv("COMPRESSION_MIN_SIZE", "1024")
+    level = os.getenv("COMPRESSION_LEVEL")
+    encodings = os.getenv("COMPRESSION_ENCODINGS")
+    return {
+        "COMPRESSION_MIN_SIZE": int(min_size) if min_size.lower() != "off" else None,
+        "COMPRESSION_LEVEL": int(level) if level else None,
+        "COMPRESSION_ENCODINGS": encodings.split(",") if encodings else None,
+        "COMPRESSION_CACHE_SIZE": int(os.getenv("COMPRESSION_CACHE_SIZE", "256")),
+    }
+
+
+def load_mysql_config(mode: str) -> dict:
+    if mode == "sqlite":
+        return {
+            "DB_ENGINE": "sqlite",
+            "SQLITE_PATH": os.getenv("SQLITE_PATH", "ecommerce.db"),
+            **load_pool_config(),
+            **load_slow_query_config(),
+            **load_stream_config(),
+            **load_cache_config(),
+            **load_snapshot_config(),
+            **load_change_log_config(),
+            **load_group_commit_config(),
+            **load_serializer_config(),
+            **load_compression_config(),
+        }
+    if mode == "remote":
+        return {
+            "MYSQL_USER": os.environ["DB_USER"],
+            "MYSQL_PASSWORD": os.environ["DB_PASS"],
+            "MYSQL_HOST": os.environ["DB_HOST"],
+            "MYSQL_PORT": int(os.getenv("DB_PORT", "17494")),
+            "MYSQL_DB": os.environ["DB_NAME"],
+            **load_pool_config(),
+            **load_replica_config(),
+            **load_slow_query_config(),
+            **load_stream_config(),
+            **load_cache_config(),
+            **load_snapshot_config(),
+            **load_change_log_config(),
+            **load_group_commit_config(),
+            **load_serializer_config(),
+            **load_compression_config(),
+        }
+    else:
+        return {
+            "MYSQL_USER": os.getenv("DB_USER", "root"),
+            "MYSQL_PASSWORD": os.getenv("DB_PASS", "root"),
+            "MYSQL_HOST": os.getenv("DB_HOST", "db"),
+            "MYSQL_PORT": int(os.getenv("DB_PORT", "3306")),
+            "MYSQL_DB": os.getenv("DB_NAME", "ecommerce"),
+            **load_pool_config(),
+            **load_replica_config(),
+            **load_slow_query_config(),
+            **load_stream_config(),
+            **load_cache_config(),
+            **load_snapshot_config(),
+            **load_change_log_config(),
+            **load_group_commit_config(),
+            **load_serializer_config(),
+            **load_compression_config(),
+        }
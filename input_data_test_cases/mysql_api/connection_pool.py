@@ -0,0 +1,163 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+class ConnectionPoolException(Exception):
+    pass
+
+
+class ConnectionPool():
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    Connections are created lazily through ``factory`` up to ``max_size``,
+    health-checked on every checkout and closed once they have been idle
+    for longer than ``max_idle_seconds`` (never going below ``min_size``).
+    """
+
+    def __init__(self, factory, min_size=1, max_size=4, checkout_timeout=10,
+                 max_idle_seconds=300, health_check=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ConnectionPoolException(
+                f"Invalid pool bounds min_size={min_size} max_size={max_size}")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check = health_check or (lambda conn: conn.ping())
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._counters = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'evicted_idle': 0,
+        }
+
+    def checkout(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        stale = []
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ConnectionPoolException("Pool is closed")
+                stale.extend(self._pop_stale_locked())
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise ConnectionPoolException(
+                        f"Timed out after {timeout}s waiting for a connection")
+                self._counters['waits'] += 1
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._counters['checkouts'] += 1
+        self._close_all(stale)
+        try:
+            return self._ensure_healthy(conn)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, conn, discard=False):
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            self._close_all([conn])
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.checkout(timeout=timeout)
+        try:
+            yield conn
+        except Exception:
+            self.checkin(conn, discard=not self._rollback(conn))
+            raise
+        self.checkin(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._counters,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            conns = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(conns)
+            self._cond.notify_all()
+        self._close_all(conns)
+
+    def _ensure_healthy(self, conn):
+        if conn is not None:
+            try:
+                self.health_check(conn)
+                return conn
+            except Exception:
+                with self._cond:
+                    self._counters['health_check_failures'] += 1
+                self._close_all([conn])
+        conn = self.factory()
+        with self._cond:
+            self._counters['created'] += 1
+        return conn
+
+    def _pop_stale_locked(self):
+        stale = []
+        now = time.monotonic()
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] > self.max_idle_seconds):
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._counters['evicted_idle'] += 1
+            stale.append(conn)
+        return stale
+
+    def _close_all(self, conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._cond:
+                self._counters['closed'] += 1
+
+    @staticmethod
+    def _rollback(conn):
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
@@ -1,20 +1,121 @@
 import time
 import json
-import MySQLdb
+import random
+import threading
 from enum import Enum
-from flask_mysqldb import MySQL
+from contextlib import ExitStack, contextmanager
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPool, ConnectionPoolException
+from input_data_test_cases.mysql_api.statements import StatementRegistry, StatementRegistryException
+from input_data_test_cases.mysql_api.slow_queries import SlowQueryLog
+from input_data_test_cases.mysql_api.dialects import get_dialect
+from input_data_test_cases.metrics import (
+    DB_POOL_CHECKOUT_DURATION,
+    DB_QUERY_DURATION,
+    DB_QUERY_ROWS,
+    query_label,
+    timed
+)
 
 
 class ModifyTableQuery(str, Enum):
     CREATE_TABLE_BASE_QUERY = "CREATE TABLE IF NOT EXISTS {table_name}({columns_to_insert})"
     INSERT_NEW_VALUE_BASE_QUERY = "INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-    DELETE_VALUE_WHERE_COLUMN_EQUALS = "DELETE FROM {table_name} where {column} = '{value}'"
-    UPDATE_VALUE_WHERE_COLUMN_EQUALS = "UPDATE {table_name} set {updates} where {column} = '{value}'"
+    INSERT_MANY_VALUES_BASE_QUERY = "INSERT INTO {table_name} ({columns}) VALUES {rows}"
+    DELETE_VALUE_WHERE_COLUMN_EQUALS = "DELETE FROM {table_name} where {column} = {placeholder}"
+    UPDATE_VALUE_WHERE_COLUMN_EQUALS = "UPDATE {table_name} set {updates} where {column} = {placeholder}"
+    PATCH_PARAMS_WHERE_COLUMN_EQUALS = (
+        "UPDATE {table_name} set params = {params_expression} where {column} = {placeholder}"
+    )
+    CREATE_INDEX_BASE_QUERY = "CREATE {unique}INDEX {index_name} ON {table_name} ({index_columns})"
+    TRUNCATE_TABLE = "TRUNCATE TABLE {table_name}"
+    DELETE_ALL_ROWS = "DELETE FROM {table_name}"
+    CREATE_CHANGE_TRIGGER = (
+        "CREATE TRIGGER {trigger_name} AFTER {event} ON {table_name} FOR EACH ROW "
+        "INSERT INTO {changes_table} (test_case_id, name, operation, changed_at) "
+        "VALUES ({row}.id, {row}.name, '{operation}', {now})"
+    )
+    LOAD_DATA_LOCAL_INFILE = (
+        "LOAD DATA LOCAL INFILE {path} INTO TABLE {table_name} CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns})"
+    )
+    BACKFILL_CHANGE_LOG = (
+        "INSERT INTO {changes_table} (test_case_id, name, operation, changed_at) "
+        "SELECT id, name, 'insert', {now} FROM {table_name} "
+        "WHERE id NOT IN (SELECT test_case_id FROM {changes_table})"
+    )
 
 
 class ConsultTableQuery(str, Enum):
-    WHERE_COLUMN_EQUALS = "select params from {table_name} where {column} = '{value}'"
+    WHERE_COLUMN_EQUALS = "select params from {table_name} where {column} = {placeholder}"
+    JSON_PATH_WHERE_COLUMN_EQUALS = (
+        "select json_extract(params, {placeholder}) as params from {table_name} where {column} = {placeholder}"
+    )
+    PARAMS_CHECKSUM_WHERE_COLUMN_EQUALS = (
+        "select md5(params) as checksum from {table_name} where {column} = {placeholder}"
+    )
+    WHERE_COLUMN_IN = "select id, name, params from {table_name} where {column} in ({placeholders})"
+    GET_ID_AND_NAME_WHERE_COLUMN_EQUALS = "select id, name from {table_name} where {column} = {placeholder}"
     GET_ALL_COLUMNS = "select * from {table_name}"
+    GET_COLUMNS_ORDER_BY_ID = "select {columns} from {table_name} order by id"
+    INDEX_EXISTS = (
+        "select index_name from information_schema.statistics "
+        "where table_schema = database() and table_name = {placeholder} and index_name = {placeholder}"
+    )
+    GET_PAGE_AFTER_ID = "select * from {table_name} where id > {placeholder} order by id limit {placeholder}"
+    TRIGGER_EXISTS = (
+        "select trigger_name from information_schema.triggers "
+        "where trigger_schema = database() and trigger_name = {placeholder}"
+    )
+    # oldest_write: start of the oldest transaction still holding uncommitted
+    # row changes (reading innodb_trx takes the PROCESS privilege)
+    CHANGE_LOG_HEAD = (
+        "select coalesce(max(version), 0) as version, {now} as db_now, "
+        "(select unix_timestamp(min(trx_started)) from information_schema.innodb_trx "
+        "where trx_rows_modified > 0) as oldest_write "
+        "from {changes_table}"
+    )
+    # Without the PROCESS privilege innodb_trx can not be read
+    CHANGE_LOG_HEAD_WITHOUT_WRITES = (
+        "select coalesce(max(version), 0) as version, {now} as db_now from {changes_table}"
+    )
+    CHANGES_SINCE = (
+        "select c.version, c.test_case_id, c.name, c.operation, c.changed_at, p.params "
+        "from {changes_table} c left join {table_name} p on p.id = c.test_case_id and c.operation <> 'delete' "
+        "where c.version > {placeholder} order by c.version limit {placeholder}"
+    )
+    CHANGED_IDS_SINCE = (
+        "select version, test_case_id, changed_at from {changes_table} where version > {placeholder} order by version"
+    )
+    TABLE_VERSION = (
+        "select count(*) as row_count, coalesce(bit_xor(crc32(concat_ws(':', id, name, params))), 0) as checksum "
+        "from {table_name}"
+    )
+    ROW_CHECKSUMS = "select id, crc32(concat_ws(':', id, name, params)) as checksum from {table_name}"
+    SNAPSHOT_ROWS = "select id, name, params, crc32(concat_ws(':', id, name, params)) as checksum from {table_name}"
+    SNAPSHOT_ROWS_WHERE_ID_IN = (
+        "select id, name, params, crc32(concat_ws(':', id, name, params)) as checksum "
+        "from {table_name} where id in ({placeholders})"
+    )
+
+
+CHANGE_LOG_COLUMNS = (
+    {'name': 'version', 'type': 'BIGINT', 'primary': True, 'auto_increment': True},
+    {'name': 'test_case_id', 'type': 'INT'},
+    {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+    {'name': 'operation', 'type': 'VARCHAR', 'length': 6},
+    {'name': 'changed_at', 'type': 'DOUBLE'},
+)
+CHANGE_EVENTS = (
+    ('insert', 'INSERT', 'NEW'),
+    ('update', 'UPDATE', 'NEW'),
+    ('delete', 'DELETE', 'OLD'),
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_FETCH_SIZE = 1000
+DEFAULT_BACKOFF_INITIAL = 0.5
+DEFAULT_BACKOFF_MAX = 30
+READINESS_TIMEOUT = 1
 
 
 class SQLDBHandlerException(Exception):
@@ -24,109 +125,472 @@ class SQLDBHandlerException(Exception):
 class SQLDBHandler():
    
 
-    def __init__(self, engine):
+    def __init__(self, engine, pool_config=None, slow_query_config=None,
+                 backoff_initial=DEFAULT_BACKOFF_INITIAL, backoff_max=DEFAULT_BACKOFF_MAX,
+                 fetch_size=DEFAULT_FETCH_SIZE):
+        if fetch_size < 1:
+            raise SQLDBHandlerException(f"Invalid fetch size {fetch_size}")
         self.engine = engine
-        self.param_symbol = "%s" if isinstance(engine, MySQL) else "?"
-        self._app_ctx = self.engine.app.app_context()
-        self._app_ctx.push()
-        self.conn = engine.connect
-        self.cursor =  self.conn.cursor()
-        self._wait_for_mysql_ready(max_seconds=60)
-    
-    def fetchone(self):
-        return self.cursor.fetchone()
+        self.fetch_size = fetch_size
+        self.dialect = get_dialect(engine)
+        self.param_symbol = self.dialect.param_symbol
+        self.statements = StatementRegistry(
+            param_symbol=self.param_symbol,
+            overrides=self.dialect.query_overrides
+        )
+        self.slow_queries = SlowQueryLog(**(slow_query_config or {}))
+        # Connections are opened on first use, so building the handler never
+        # blocks on (or fails because of) the database
+        self.pool = ConnectionPool(
+            factory=self._connect,
+            health_check=self.dialect.health_check,
+            **(pool_config or {})
+        )
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._state_lock = threading.Lock()
+        self._connect_failures = 0
+        self._retry_at = 0.0
+        self._last_error = None
 
-    def fetchall(self):
-        return self.cursor.fetchall()
+    def _connect(self):
+        """
+        Open a new connection unless a previous attempt failed less than
+        the current backoff ago, in which case fail fast. The backoff
+        doubles on every consecutive failure up to ``backoff_max``.
+        """
+        with self._state_lock:
+            retry_in = self._retry_at - time.monotonic()
+        if retry_in > 0:
+            raise ConnectionPoolException(
+                f"Database unavailable, next connection attempt in {retry_in:.1f}s")
+        try:
+            conn = self.dialect.connect(self.engine)
+        except Exception as e:
+            with self._state_lock:
+                self._connect_failures += 1
+                delay = min(self.backoff_initial * 2 ** (self._connect_failures - 1), self.backoff_max)
+                self._retry_at = time.monotonic() + delay * random.uniform(0.5, 1)
+                self._last_error = str(e)
+            raise
+        with self._state_lock:
+            self._connect_failures = 0
+            self._retry_at = 0.0
+            self._last_error = None
+        return conn
 
-    def commit(self):
-        self.conn.commit()
-    
-    def rowcount(self):
-        return self.cursor.rowcount
+    def connect_state(self):
+        with self._state_lock:
+            return {
+                'connect_failures': self._connect_failures,
+                'retry_in_seconds': round(max(self._retry_at - time.monotonic(), 0), 3),
+                'last_error': self._last_error,
+            }
+
+    @contextmanager
+    def _cursor(self):
+        with ExitStack() as stack:
+            # Failed and timed out checkouts are observed as well
+            with timed(DB_POOL_CHECKOUT_DURATION):
+                conn = stack.enter_context(self.pool.connection())
+            cursor = conn.cursor()
+            try:
+                yield conn, cursor
+            finally:
+                cursor.close()
+
+    def pool_stats(self):
+        return self.pool.stats()
+
+    def violates_constraint(self, error):
+        """
+        Whether ``error`` was raised, directly or through the exceptions it
+        was chained from, by a statement breaking a table constraint.
+        """
+        while error is not None:
+            if isinstance(error, self.dialect.IntegrityError):
+                return True
+            error = error.__cause__
+        return False
+
+    def statement_stats(self):
+        return self.statements.stats()
 
     def close(self):
-        self.cursor.close()
-        self.conn.close()
+        self.pool.close()
+
+    def readiness(self):
+        """
+        Return ``(ready, details)`` for a readiness probe. Connections in use
+        prove the database is reachable; otherwise one pooled connection is
+        pinged, failing fast while a reconnect backoff is pending.
+        """
+        stats = self.pool.stats()
+        details = {'pool': stats, **self.connect_state()}
+        if stats['in_use'] and not details['connect_failures']:
+            return True, details
+        try:
+            with self.pool.connection(timeout=READINESS_TIMEOUT) as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchall()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            return False, {**details, **self.connect_state(), 'error': str(e)}
+        return True, {**details, **self.connect_state()}
 
-    def _wait_for_mysql_ready(self, max_seconds=30):
-        start = time.time()
+    def wait_until_ready(self, max_seconds=60):
+        """
+        Block until the database answers, retrying on the reconnect
+        backoff, and raise SQLDBHandlerException after ``max_seconds``.
+        """
+        deadline = time.monotonic() + max_seconds
         while True:
-            try:
-                self.cursor.execute("SELECT 1")
-                self.fetchall()
-                return
-            except Exception:
-                if time.time() - start > max_seconds:
-                    raise
-                time.sleep(1)
-    
+            ready, details = self.readiness()
+            if ready:
+                return details
+            if time.monotonic() >= deadline:
+                raise SQLDBHandlerException(f"Database not ready after {max_seconds}s: {details.get('error')}")
+            time.sleep(min(max(details['retry_in_seconds'], 0.1), max(deadline - time.monotonic(), 0)))
+
     def modify_table(self, base_query:ModifyTableQuery, kwargs, params=()):
-        self._query_cmd(
-            base_query=base_query,
-            kwargs=kwargs,
-            params=params
-        )
-        self.commit()
-        return self.rowcount()
+        try:
+            with self._cursor() as (conn, cursor):
+                self._query_cmd(
+                    cursor=cursor,
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params
+                )
+                conn.commit()
+                return cursor.rowcount
+        except self.dialect.IntegrityError as e:
+            raise SQLDBHandlerException("Value violates a table constraint") from e
+        except (self.dialect.OperationalError, ConnectionPoolException) as e:
+            raise SQLDBHandlerException("Unable to modify table") from e
     
     def consult_table(self, base_query:ConsultTableQuery, kwargs, params=()):
         try:
-            self._query_cmd(
-                base_query=base_query,
-                kwargs=kwargs,
-                params=params
-            )
-            return self.fetchall()
-        except MySQLdb.OperationalError as e:
+            with self._cursor() as (conn, cursor):
+                self._query_cmd(
+                    cursor=cursor,
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params
+                )
+                rows = cursor.fetchall()
+                DB_QUERY_ROWS.labels(query=query_label(base_query)).observe(len(rows))
+                # End the read transaction so the pooled connection does not
+                # keep serving an old REPEATABLE READ snapshot to later requests.
+                conn.rollback()
+                return rows
+        except (self.dialect.OperationalError, self.dialect.ProgrammingError, ConnectionPoolException) as e:
+            # ProgrammingError: a table missing from the schema, e.g. the change log
             raise SQLDBHandlerException("Unable to perform research") from e
 
-    def _query_cmd(self, base_query, kwargs, params):
-        query = base_query.format(**kwargs)
-        self.cursor.execute(query, params)
+    def iter_consult_table(self, base_query:ConsultTableQuery, kwargs, params=(), fetch_size=None):
+        """
+        Run a consult query on an unbuffered (server-side) cursor and return
+        an iterator over its rows, fetched ``fetch_size`` (default: the
+        handler's ``fetch_size``) at a time, so memory stays bounded by one
+        batch whatever the result size.
+
+        The query is executed before returning so errors surface to the
+        caller; the pooled connection is held until the iterator is
+        exhausted or closed. Callers that may stop early must ``close()``
+        it, a half-read connection is discarded rather than reused.
+        """
+        fetch_size = fetch_size or self.fetch_size
+        if fetch_size < 1:
+            raise SQLDBHandlerException(f"Invalid fetch size {fetch_size}")
+        rows = self._iter_rows(base_query, kwargs, params, fetch_size)
+        try:
+            next(rows)
+        except (self.dialect.OperationalError, self.dialect.ProgrammingError, ConnectionPoolException) as e:
+            raise SQLDBHandlerException("Unable to perform research") from e
+        return rows
+
+    def _iter_rows(self, base_query, kwargs, params, fetch_size):
+        with timed(DB_POOL_CHECKOUT_DURATION):
+            conn = self.pool.checkout()
+        finished = False
+        count = 0
+        try:
+            cursor = conn.cursor(*self.dialect.streaming_cursor_args())
+            try:
+                # The unbuffered result still occupies the connection, so
+                # a slow streamed query is logged without its plan
+                self._query_cmd(
+                    cursor=cursor,
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params,
+                    explain=False
+                )
+                yield
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    yield from rows
+                finished = True
+                DB_QUERY_ROWS.labels(query=query_label(base_query)).observe(count)
+            finally:
+                if finished:
+                    cursor.close()
+            conn.rollback()
+        finally:
+            # A half-read unbuffered result would have to be drained before the
+            # connection could run anything else, so drop it instead.
+            self.pool.checkin(conn, discard=not finished)
+
+    def _query_cmd(self, cursor, base_query, kwargs, params, explain=True):
+        try:
+            query = self.statements.render(base_query, kwargs)
+        except StatementRegistryException as e:
+            raise SQLDBHandlerException(str(e)) from e
+        with timed(DB_QUERY_DURATION, with_status=True, query=query_label(base_query)) as timer:
+            cursor.execute(query, params)
+        if self.slow_queries.is_slow(timer.elapsed):
+            self._log_slow_query(cursor, base_query, query, params, timer.elapsed, explain)
+
+    def _log_slow_query(self, cursor, base_query, query, params, seconds, explain):
+        plan = None
+        if explain and self.slow_queries.wants_plan(query):
+            plan = self.slow_queries.cached_plan(query)
+            if plan is None:
+                plan = self._explain(cursor, query, params)
+        self.slow_queries.record(
+            query=query_label(base_query),
+            statement=query,
+            params=params,
+            seconds=seconds,
+            rows=cursor.rowcount,
+            plan=plan
+        )
+
+    def _explain(self, cursor, query, params):
+        """
+        EXPLAIN ``query`` on the connection that just ran it. The result
+        of the explained statement is already buffered client side, so the
+        connection is free for one more round trip.
+        """
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(f"{self.dialect.explain_prefix} {query}", params)
+            columns = [column[0] for column in explain_cursor.description or ()]
+            plan = [dict(zip(columns, row)) for row in explain_cursor.fetchall()]
+        except self.dialect.Error as e:
+            self.slow_queries.store_plan(query, None, failed=True)
+            return {'error': str(e)}
+        finally:
+            explain_cursor.close()
+        self.slow_queries.store_plan(query, plan)
+        return plan
+
+    def slow_query_stats(self):
+        return {**self.slow_queries.stats(), 'entries': self.slow_queries.entries()}
     
-    def init_database(self, table, data):
+    def init_database(self, table, data, bulk=False, chunk_size=DEFAULT_CHUNK_SIZE):
         self.create_db(
             table_name=table['name'],
-            columns=table['columns']
+            columns=table['columns'],
+            indexes=table.get('indexes', [])
         )
+        if table.get('change_log', False):
+            self.create_change_log(table_name=table['name'])
+        if bulk:
+            return self.insert_many(
+                table_name=table['name'],
+                data=data,
+                chunk_size=chunk_size
+            )
         self.insert_new_value(
             table_name=table['name'],
             data=data
         )
     
-    def create_db(self, table_name, columns):
-        columns_to_insert = ""
-        for i, column in enumerate(columns):
-            cmd = " ".join([column['name'], column['type']])
-            if column['type'].upper() == 'VARCHAR':
-                columns_to_insert += f"{cmd}({column.get('length', 255)})"
-            else:
-                columns_to_insert += cmd
-            if column.get('auto_increment', False):
-                columns_to_insert += ' auto_increment'
-            if column.get('primary', False):
-                columns_to_insert += ' PRIMARY KEY'
-            if i < len(columns) - 1:
-                columns_to_insert += ","
-            
+    def create_db(self, table_name, columns, indexes=()):
+        columns_to_insert = ",".join(self.dialect.column_definition(column) for column in columns)
         self.modify_table(
             base_query=ModifyTableQuery.CREATE_TABLE_BASE_QUERY,
             kwargs={'table_name':table_name, 'columns_to_insert':columns_to_insert},
         )
+        self.create_indexes(table_name=table_name, indexes=indexes)
+
+    def create_indexes(self, table_name, indexes):
+        """
+        Create the secondary/unique indexes declared for ``table_name``,
+        skipping the ones that already exist.
+
+        Each index is a mapping with ``name``, ``columns`` and an optional
+        ``unique`` flag; a column is either its name or a mapping with
+        ``name`` and a prefix ``length`` (for VARCHAR/TEXT columns).
+        """
+        for index in indexes:
+            exists = self.consult_table(
+                base_query=ConsultTableQuery.INDEX_EXISTS,
+                kwargs={},
+                params=(table_name, index['name'])
+            )
+            if exists:
+                continue
+            index_columns = []
+            for column in index['columns']:
+                if isinstance(column, str):
+                    index_columns.append(column)
+                else:
+                    index_columns.append(self.dialect.index_column(column['name'], column.get('length')))
+            self.modify_table(
+                base_query=ModifyTableQuery.CREATE_INDEX_BASE_QUERY,
+                kwargs={
+                    'unique': 'UNIQUE ' if index.get('unique', False) else '',
+                    'index_name': index['name'],
+                    'table_name': table_name,
+                    'index_columns': ",".join(index_columns),
+                },
+            )
+
+    @staticmethod
+    def change_log_table(table_name):
+        return f"{table_name}_changes"
+
+    def has_change_log(self, table_name):
+        """
+        Whether the triggers of ``create_change_log`` are set on ``table_name``.
+        """
+        return bool(self.consult_table(
+            base_query=ConsultTableQuery.TRIGGER_EXISTS,
+            kwargs={},
+            params=(self._change_trigger(table_name, 'delete'),)
+        ))
+
+    def _change_trigger(self, table_name, operation):
+        return f"{self.change_log_table(table_name)}_{operation}"
+
+    def create_change_log(self, table_name):
+        """
+        Create ``<table_name>_changes`` and the triggers appending a row to
+        it, with a new auto-increment ``version``, on every insert, update
+        and delete of ``table_name`` (deletes are kept as tombstones).
+
+        Rows that predate the change log are recorded as inserts, so
+        reading the log from version 0 rebuilds the whole table.
+        """
+        changes_table = self.change_log_table(table_name)
+        self.modify_table(
+            base_query=ModifyTableQuery.CREATE_TABLE_BASE_QUERY,
+            kwargs={
+                'table_name': changes_table,
+                'columns_to_insert': ",".join(self.dialect.column_definition(c) for c in CHANGE_LOG_COLUMNS),
+            },
+        )
+        for operation, event, row in CHANGE_EVENTS:
+            trigger_name = self._change_trigger(table_name, operation)
+            if self.consult_table(base_query=ConsultTableQuery.TRIGGER_EXISTS, kwargs={}, params=(trigger_name,)):
+                continue
+            self.modify_table(
+                base_query=ModifyTableQuery.CREATE_CHANGE_TRIGGER,
+                kwargs={
+                    'trigger_name': trigger_name,
+                    'event': event,
+                    'table_name': table_name,
+                    'changes_table': changes_table,
+                    'row': row,
+                    'operation': operation,
+                    'now': self.dialect.row_change_now,
+                },
+            )
+        # After the triggers so no write can fall between backfill and log
+        self.modify_table(
+            base_query=ModifyTableQuery.BACKFILL_CHANGE_LOG,
+            kwargs={'table_name': table_name, 'changes_table': changes_table, 'now': self.dialect.epoch_now},
+        )
+
+    @staticmethod
+    def _encode_values(datum):
+        values = []
+        for v in datum.values():
+            if isinstance(v, (dict, list)):
+                values.append(json.dumps(v))
+            else:
+                values.append(v)
+        return values
 
     def insert_new_value(self, table_name, data):
         for datum in data:
             columns = ",".join(map(str, list(datum.keys())))
-            values = []
-            for v in datum.values():
-                if isinstance(v, (dict, list)):
-                    values.append(json.dumps(v))
-                else:
-                    values.append(v)
+            values = self._encode_values(datum)
             placeholders = ",".join([self.param_symbol] * len(values))  # %s,%s,%s
             self.modify_table(
                 base_query=ModifyTableQuery.INSERT_NEW_VALUE_BASE_QUERY,
                 kwargs={'table_name':table_name,'columns':columns, 'placeholders':placeholders},
                 params=values
             )
+
+    def insert_many(self, table_name, data, chunk_size=DEFAULT_CHUNK_SIZE, single_transaction=False):
+        """
+        Insert rows with one multi-row INSERT statement per chunk of
+        ``chunk_size`` rows. Rows are grouped by their column set so every
+        chunk shares the same statement shape.
+
+        By default each chunk is committed on its own; with
+        ``single_transaction`` everything is committed once at the end and
+        rolled back as a whole on failure.
+
+        Returns a report with the inserted row count, chunks, throughput and
+        the generated ids in the order of ``data``.
+        """
+        if chunk_size < 1:
+            raise SQLDBHandlerException(f"Invalid chunk size {chunk_size}")
+        groups = {}
+        for index, datum in enumerate(data):
+            groups.setdefault(tuple(datum.keys()), []).append((index, self._encode_values(datum)))
+        ids = [None] * len(data)
+        start = time.perf_counter()
+        rows = 0
+        chunks = 0
+        committed = 0
+        try:
+            with self._cursor() as (conn, cursor):
+                for columns, indexed_values in groups.items():
+                    row_placeholders = "(" + ",".join([self.param_symbol] * len(columns)) + ")"
+                    for offset in range(0, len(indexed_values), chunk_size):
+                        chunk = indexed_values[offset:offset + chunk_size]
+                        self._query_cmd(
+                            cursor=cursor,
+                            base_query=ModifyTableQuery.INSERT_MANY_VALUES_BASE_QUERY,
+                            kwargs={
+                                'table_name': table_name,
+                                'columns': ",".join(map(str, columns)),
+                                'rows': ",".join([row_placeholders] * len(chunk)),
+                            },
+                            params=[v for _, values in chunk for v in values]
+                        )
+                        if not single_transaction:
+                            conn.commit()
+                            committed += len(chunk)
+                        # A single multi-row INSERT gets consecutive auto-increment
+                        # values, the dialect knows which end lastrowid points at.
+                        first_id = None
+                        if cursor.lastrowid:
+                            first_id = self.dialect.first_insert_id(cursor.lastrowid, len(chunk))
+                        for position, (index, _) in enumerate(chunk):
+                            ids[index] = first_id + position if first_id else None
+                        rows += len(chunk)
+                        chunks += 1
+                if single_transaction:
+                    conn.commit()
+        except (self.dialect.Error, ConnectionPoolException) as e:
+            raise SQLDBHandlerException(f"Bulk insert failed after {committed} committed rows") from e
+        seconds = time.perf_counter() - start
+        return {
+            'rows': rows,
+            'chunks': chunks,
+            'ids': ids,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(rows / seconds, 2) if seconds else None,
+        }
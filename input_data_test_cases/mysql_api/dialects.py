@@ -0,0 +1,211 @@
+import MySQLdb
+import MySQLdb.cursors as mysql_c
+import sqlite3
+from flask_mysqldb import MySQL
+from input_data_test_cases.mysql_api.sqlite_engine import SQLiteEngine
+
+# Row text checksummed by the snapshot queries, concat_ws(':', id, name, params)
+ROW_TEXT = "id || ':' || coalesce(name, '') || ':' || coalesce(params, '')"
+
+
+class Dialect():
+    """
+    How SQLDBHandler talks to a DB-API engine: placeholder style, how to
+    open and health-check connections, error classes, DDL rendering and
+    the ``ConsultTableQuery``/``ModifyTableQuery`` templates it has to
+    phrase differently.
+
+    The base class is a generic qmark engine exposing flask_mysqldb's
+    ``app``/``connect`` interface.
+    """
+    name = "generic"
+    param_symbol = "?"
+    explain_prefix = "EXPLAIN"
+    # Current time in epoch seconds, evaluated by the database
+    epoch_now = "unix_timestamp(now(3))"
+    # Same, but taken when a trigger fires rather than when its statement began
+    row_change_now = "unix_timestamp(sysdate(3))"
+    load_data_local = False
+    query_overrides = {}
+    Error = MySQLdb.Error
+    IntegrityError = MySQLdb.IntegrityError
+    OperationalError = MySQLdb.OperationalError
+    ProgrammingError = MySQLdb.ProgrammingError
+    # Templates of the JSON edits behind PATCH, nested in the order applied
+    json_value = "cast({placeholder} as json)"
+    json_operations = {
+        'merge': "json_merge_patch({doc}, {value})",
+        'set': "json_set({doc}, {path}, {value})",
+        'insert': "json_insert({doc}, {path}, {value})",
+        'replace': "json_replace({doc}, {path}, {value})",
+        'remove': "json_remove({doc}, {path})",
+        'append': "json_array_append({doc}, {path}, {value})",
+    }
+
+    def connect(self, engine):
+        # flask_mysqldb reads its settings from current_app, so every new
+        # connection is opened inside a short-lived app context instead of
+        # one context pushed for the lifetime of the handler.
+        with engine.app.app_context():
+            return engine.connect
+
+    @staticmethod
+    def health_check(conn):
+        conn.ping()
+
+    def streaming_cursor_args(self):
+        return ()
+
+    @staticmethod
+    def first_insert_id(lastrowid, count):
+        """
+        Id of the first row of a ``count`` rows INSERT given the driver's
+        ``lastrowid``.
+        """
+        return lastrowid
+
+    def column_definition(self, column):
+        definition = " ".join([column['name'], column['type']])
+        if column['type'].upper() == 'VARCHAR':
+            definition += f"({column.get('length', 255)})"
+        if column.get('auto_increment', False):
+            definition += ' auto_increment'
+        if column.get('primary', False):
+            definition += ' PRIMARY KEY'
+        return definition
+
+    def index_column(self, name, length=None):
+        return f"{name}({int(length)})" if length else name
+
+    def string_literal(self, value):
+        # For the few statements that take no bound parameters, e.g. a file name
+        return "'" + value.replace("'", "''") + "'"
+
+    def json_patch_expression(self, column, operations):
+        """
+        SQL expression applying ``(op, path, value)`` operations to the
+        JSON document in ``column`` and the parameters it binds, in order.
+        Paths and values are always bound, never inlined.
+        """
+        expression, params = column, []
+        value = self.json_value.format(placeholder=self.param_symbol)
+        for op, op_path, op_value in operations:
+            template = self.json_operations[op]
+            expression = template.format(doc=expression, path=self.param_symbol, value=value)
+            if '{path}' in template:
+                params.append(op_path)
+            if '{value}' in template:
+                params.append(op_value)
+        return expression, params
+
+
+class MySQLDialect(Dialect):
+    name = "mysql"
+    param_symbol = "%s"
+    # LOAD DATA LOCAL INFILE, when the server and the client both allow it
+    load_data_local = True
+
+    def streaming_cursor_args(self):
+        return (mysql_c.SSCursor,)
+
+    def string_literal(self, value):
+        # Backslashes are escapes in MySQL strings and MySQLdb applies
+        # pyformat to every statement, so % has to be doubled as well
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'").replace("%", "%%") + "'"
+
+
+class SQLiteDialect(Dialect):
+    """
+    SQLite through ``SQLiteEngine``. JSON columns rely on the built in JSON
+    functions; ``md5``, ``crc32`` and ``bit_xor`` are registered on every
+    connection by the engine.
+    """
+    name = "sqlite"
+    explain_prefix = "EXPLAIN QUERY PLAN"
+    epoch_now = "((julianday('now') - 2440587.5) * 86400.0)"
+    row_change_now = epoch_now
+    Error = sqlite3.Error
+    IntegrityError = sqlite3.IntegrityError
+    OperationalError = sqlite3.OperationalError
+    ProgrammingError = sqlite3.ProgrammingError
+    json_value = "json({placeholder})"
+    json_operations = {
+        **Dialect.json_operations,
+        'merge': "json_patch({doc}, {value})",
+        'append': "json_insert({doc}, {path} || '[#]', {value})",
+    }
+
+    def __init__(self):
+        # Imported here as db_handler imports this module for Dialect
+        from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery
+        self.query_overrides = {
+            ConsultTableQuery.INDEX_EXISTS: (
+                "select name from sqlite_master "
+                "where type = 'index' and tbl_name = {placeholder} and name = {placeholder}"
+            ),
+            # -> returns JSON text for scalars too, like MySQL's json_extract
+            ConsultTableQuery.JSON_PATH_WHERE_COLUMN_EQUALS: (
+                "select params -> {placeholder} as params from {table_name} where {column} = {placeholder}"
+            ),
+            ModifyTableQuery.TRUNCATE_TABLE: "DELETE FROM {table_name}",
+            ModifyTableQuery.CREATE_CHANGE_TRIGGER: (
+                "CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event} ON {table_name} BEGIN "
+                "INSERT INTO {changes_table} (test_case_id, name, operation, changed_at) "
+                "VALUES ({row}.id, {row}.name, '{operation}', {now}); END"
+            ),
+            # Writers are serialized and commit in version order, so a
+            # hole in the log is never a transaction still in flight
+            ConsultTableQuery.CHANGE_LOG_HEAD: (
+                "select coalesce(max(version), 0) as version, {now} as db_now, null as oldest_write "
+                "from {changes_table}"
+            ),
+            ConsultTableQuery.TRIGGER_EXISTS: (
+                "select name from sqlite_master where type = 'trigger' and name = {placeholder}"
+            ),
+            # concat_ws only exists from SQLite 3.44
+            ConsultTableQuery.TABLE_VERSION: (
+                f"select count(*) as row_count, coalesce(bit_xor(crc32({ROW_TEXT})), 0) as checksum "
+                "from {table_name}"
+            ),
+            ConsultTableQuery.ROW_CHECKSUMS: f"select id, crc32({ROW_TEXT}) as checksum from {{table_name}}",
+            ConsultTableQuery.SNAPSHOT_ROWS: (
+                f"select id, name, params, crc32({ROW_TEXT}) as checksum from {{table_name}}"
+            ),
+            ConsultTableQuery.SNAPSHOT_ROWS_WHERE_ID_IN: (
+                f"select id, name, params, crc32({ROW_TEXT}) as checksum "
+                "from {table_name} where id in ({placeholders})"
+            ),
+        }
+
+    def connect(self, engine):
+        return engine.connect()
+
+    @staticmethod
+    def health_check(conn):
+        conn.execute("select 1").fetchall()
+
+    @staticmethod
+    def first_insert_id(lastrowid, count):
+        # SQLite reports the rowid of the last row of a multi-row INSERT
+        return lastrowid - count + 1
+
+    def column_definition(self, column):
+        column_type = column['type'].upper()
+        if column.get('auto_increment', False) or (column.get('primary', False) and column_type == 'INT'):
+            return f"{column['name']} INTEGER PRIMARY KEY AUTOINCREMENT"
+        definition = super().column_definition(column)
+        if column_type == 'JSON':
+            definition += f" CHECK ({column['name']} IS NULL OR json_valid({column['name']}))"
+        return definition
+
+    def index_column(self, name, length=None):
+        # Prefix indexes do not exist in SQLite, the whole value is indexed
+        return name
+
+
+def get_dialect(engine):
+    if isinstance(engine, MySQL):
+        return MySQLDialect()
+    if isinstance(engine, SQLiteEngine):
+        return SQLiteDialect()
+    return Dialect()
@@ -0,0 +1,463 @@
+import json
+import time
+import asyncio
+from functools import wraps
+from quart import request
+from input_data_test_cases.cache import TTLCache
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.mysql_api import MyslApiException
+from input_data_test_cases.mysql_api.async_mysql_api import AsyncMysqlApi
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases.ecommerce_data_tc import (
+    EcommerceDataTCBase,
+    check_test_case_fields
+)
+
+
+def async_verify_test_case_fields(function):
+
+    @wraps(function)
+    async def wrapper(self, *args, **kwargs):
+        error, value, column = check_test_case_fields(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        return await function(self, value, column, *args, **kwargs)
+    return wrapper
+
+
+class NDJSONBody():
+    """
+    Response body streaming ``rows`` as NDJSON lines. Quart calls
+    ``aclose`` once the body was sent or the client went away; unlike an
+    async generator that never ran, it releases the rows' connection
+    even when not a single line was read.
+    """
+
+    def __init__(self, rows, encode):
+        self.rows = rows
+        self.encode = encode
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return self.encode(await self.rows.__anext__()).encode()
+
+    async def aclose(self):
+        await self.rows.aclose()
+
+
+class AsyncEcommerceDataTC(EcommerceDataTCBase, AsyncMysqlApi):
+    """
+    ASGI version of EcommerceDataTC serving the same routes with coroutine
+    views, so DB round trips do not hold a worker thread.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.test_case_cache = TTLCache(
+            max_size=self.config.get('TEST_CASE_CACHE_SIZE', 1024),
+            ttl=self.config.get('TEST_CASE_CACHE_TTL', 30)
+        )
+        self._changes_cond = asyncio.Condition()
+        self._writes_tracked = True
+
+    async def _table_changed(self):
+        # Wake the change feed long-polls of this process
+        async with self._changes_cond:
+            self._changes_cond.notify_all()
+
+    def define_routes(self):
+        self.app.add_url_rule("/",view_func=self.home)
+        self.app.add_url_rule("/test_case",endpoint="get_test_case",view_func=self.get_test_case,methods=["GET"])
+        self.app.add_url_rule("/test_case",endpoint="post_test_case",view_func=self.post_test_case,methods=["POST"])
+        self.app.add_url_rule(
+            "/test_case", endpoint="delete_test_case",
+            view_func=self.delete_test_case, methods=["DELETE"]
+        )
+        self.app.add_url_rule("/test_case",endpoint="update_test_case",view_func=self.update_test_case,methods=["PUT"])
+        self.app.add_url_rule("/test_case",endpoint="patch_test_case",view_func=self.patch_test_case,methods=["PATCH"])
+
+        self.app.add_url_rule(
+            "/test_cases", endpoint="get_test_cases",
+            view_func=self.get_test_cases, methods=["GET", "POST"]
+        )
+        self.app.add_url_rule(
+            "/test_cases/changes", endpoint="get_test_case_changes",
+            view_func=self.get_test_case_changes, methods=["GET"]
+        )
+        self.app.add_url_rule(
+            "/test_cases/bulk", endpoint="post_test_cases_bulk",
+            view_func=self.post_test_cases_bulk, methods=["POST"]
+        )
+        self.app.add_url_rule(
+            "/all_test_cases", endpoint="get_all_test_cases",
+            view_func=self.get_all_test_cases, methods=["GET"]
+        )
+        self.app.add_url_rule("/pool_stats",endpoint="get_pool_stats",view_func=self.get_pool_stats,methods=["GET"])
+        self.app.add_url_rule("/cache_stats",endpoint="get_cache_stats",view_func=self.get_cache_stats,methods=["GET"])
+        self.app.add_url_rule(
+            "/statement_stats", endpoint="get_statement_stats",
+            view_func=self.get_statement_stats, methods=["GET"]
+        )
+
+    async def home(self):
+        return self.format_response({'message': "Base url"}, status_code=StatusCode.OK)
+
+    async def _test_case_cache_keys(self, column, value, extra_names=()):
+        if not self.test_case_cache.enabled:
+            return []
+        keys = [self._cache_key(column, value)] + [('name', n) for n in extra_names]
+        try:
+            rows = await self.query(
+                base_query=self.define_queries(key='GET_TESTCASE_IDENTITY'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(value,)
+            )
+        except MyslApiException:
+            return None
+        for row in rows:
+            row = self._row_as_dict(row, ('id', 'name'))
+            keys += [self._cache_key('id', row['id']), ('name', row['name'])]
+        return keys
+
+    def _invalidate_test_case(self, keys):
+        if keys is None:
+            self.test_case_cache.clear()
+        elif keys:
+            self.test_case_cache.invalidate(*keys)
+
+    async def _stored_etag(self, column, value):
+        rows = await self.query(
+            base_query=self.define_queries(key='GET_TESTCASE_CHECKSUM'),
+            kwargs={'table_name': self.TABLE_NAME, 'column': column},
+            params=(value,)
+        )
+        if not rows:
+            return None
+        return self._params_etag([row['checksum'] if isinstance(row, dict) else row[0] for row in rows])
+
+    @async_verify_test_case_fields
+    async def get_test_case(self, value, column):
+        error, json_path = self._check_projection_args(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        if json_path is not None:
+            return await self._get_test_case_fragment(value, column, json_path)
+        cache_key = self._cache_key(column, value)
+        cached = self.test_case_cache.get(cache_key)
+        if cached is not None:
+            body, etag = cached
+            return await self.make_conditional(self.format_raw_response(body, status_code=StatusCode.OK), etag=etag)
+        try:
+            if request.if_none_match:
+                etag = await self._stored_etag(column, value)
+                if etag is not None and self.is_not_modified(etag):
+                    return self.not_modified_response(etag)
+            response = await self.query(
+                base_query=self.define_queries(key='GET_TESTCASE_PARAMS'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(value,)
+            )
+            etag = self._response_etag(response)
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable find the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+            etag = None
+        formatted = self.format_response(response, status_code=status_code)
+        if etag is not None and response:
+            self.test_case_cache.set(cache_key, (await formatted[0].get_data(), etag))
+        return await self.make_conditional(formatted, etag=etag)
+
+    async def _get_test_case_fragment(self, value, column, json_path):
+        try:
+            response = await self.query(
+                base_query=self.define_queries(key='GET_TESTCASE_PARAMS_PATH'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(json_path, value)
+            )
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable find the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        etag = self._response_etag(response) if status_code == StatusCode.OK else None
+        return await self.make_conditional(self.format_response(response, status_code=status_code), etag=etag)
+
+    async def post_test_case(self):
+        if request.is_json:
+            data = await request.get_json()
+            name = data.get('name', None)
+            params = json.dumps(data.get('params', None))
+        else:
+            form = await request.form
+            name = form.get('name', None)
+            params = form.get('params', None)
+        if name is None or params is None:
+            return self.format_response({'message': 'Missing arguments'}, status_code=StatusCode.BAD_REQUEST)
+        values = [name, str(params)]
+        try:
+            await self.query(
+                base_query=self.define_queries(key='POST_TESTCASE_PARAMS'),
+                kwargs={
+                    'table_name': self.TABLE_NAME, 'columns': "name, params",
+                    'placeholders': self.placeholders(len(values))
+                },
+                params=values
+            )
+            self.test_case_cache.invalidate(('name', name))
+            await self._table_changed()
+            response = {'message': "New test case added successfully"}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable created the new test case'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
+    @async_verify_test_case_fields
+    async def delete_test_case(self, value, column):
+        try:
+            cache_keys = await self._test_case_cache_keys(column, value)
+            await self.query(
+                base_query=self.define_queries(key='DELETE_TEST_CASE'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(value,)
+            )
+            self._invalidate_test_case(cache_keys)
+            await self._table_changed()
+            response = {'message': 'Test case deleted successfully'}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable deleted the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
+    @async_verify_test_case_fields
+    async def update_test_case(self, value, column):
+        form = await request.form
+        data = {field: form[field] for field in ['name', 'params'] if form.get(field) is not None}
+        if not data:
+            return self.format_response({'message': 'Missing arguments'}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            extra_names = [data['name']] if 'name' in data else []
+            cache_keys = await self._test_case_cache_keys(column, value, extra_names=extra_names)
+            updates = ",".join([f"{k} = {self.db_handler.param_symbol}" for k in data])
+            await self.query(
+                base_query=self.define_queries(key='UPDATE_TEST_CASE'),
+                kwargs={'table_name': self.TABLE_NAME, 'updates': updates, 'column': column},
+                params=[*data.values(), value]
+            )
+            self._invalidate_test_case(cache_keys)
+            await self._table_changed()
+            response = {'message': 'Test case deleted successfully'}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable deleted the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
+    @async_verify_test_case_fields
+    async def patch_test_case(self, value, column):
+        error, operations = self._parse_patch(request.mimetype, await request.get_data(as_text=True))
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        expression, params = self.db_handler.dialect.json_patch_expression('params', operations)
+        try:
+            cache_keys = await self._test_case_cache_keys(column, value)
+            await self.query(
+                base_query=self.define_queries(key='PATCH_TEST_CASE'),
+                kwargs={'table_name': self.TABLE_NAME, 'params_expression': expression, 'column': column},
+                params=[*params, value]
+            )
+            self._invalidate_test_case(cache_keys)
+            await self._table_changed()
+            response = {'message': 'Test case patched successfully'}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to patch the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
+    async def get_all_test_cases(self):
+        if request.args.get('format') == 'ndjson':
+            return await self._stream_all_test_cases()
+        if 'limit' in request.args or 'after_id' in request.args:
+            error, limit, after_id = self._check_page_args(request.args)
+            if error:
+                return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+            base_query = self.define_queries(key='GET_TCS_PAGE')
+            params = (after_id, limit)
+        else:
+            base_query = self.define_queries(key='GET_ALL_TCS')
+            params = ()
+        try:
+            rows = await self.query(
+                base_query=base_query,
+                kwargs={'table_name': self.TABLE_NAME},
+                params=params
+            )
+            if params:
+                next_after_id = self._row_id(rows[-1]) if len(rows) == limit else None
+                response = {'test_cases': rows, 'next_after_id': next_after_id}
+            else:
+                response = rows
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to get all the test cases'}
+            status_code = StatusCode.NOT_FOUND
+        return await self.make_conditional(self.format_response(response, status_code=status_code))
+
+    async def _stream_all_test_cases(self):
+        try:
+            rows = await self.stream_query(
+                base_query=self.define_queries(key='GET_ALL_TCS'),
+                kwargs={'table_name': self.TABLE_NAME}
+            )
+        except MyslApiException:
+            return self.format_response(
+                {'message': 'Unable to get all the test cases'}, status_code=StatusCode.NOT_FOUND
+            )
+
+        body = NDJSONBody(rows, self._ndjson_line)
+        return self.app.response_class(body, status=StatusCode.OK, mimetype="application/x-ndjson")
+
+    async def get_test_cases(self):
+        if request.method == "POST":
+            data = await request.get_json(silent=True) or {}
+            ids = data.get('ids', [])
+            names = data.get('names', [])
+        else:
+            ids = request.args.getlist('id')
+            names = request.args.getlist('name')
+        error, ids, names = self._check_batch_identifiers(ids, names)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            response = {
+                'ids': await self._lookup_many('id', ids),
+                'names': await self._lookup_many('name', names),
+            }
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to get the requested test cases'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
+    async def _lookup_many(self, column, values):
+        matched = []
+        unique_values = list(dict.fromkeys(values))
+        base_query = self.define_queries(key='GET_TESTCASES_IN')
+        for offset in range(0, len(unique_values), self.BATCH_CHUNK_SIZE):
+            chunk = unique_values[offset:offset + self.BATCH_CHUNK_SIZE]
+            rows = await self.query(
+                base_query=base_query,
+                kwargs={'table_name': self.TABLE_NAME, 'column': column, 'placeholders': self.placeholders(len(chunk))},
+                params=chunk
+            )
+            matched.extend(rows)
+        return self._found_map(column, unique_values, matched)
+
+    async def get_test_case_changes(self):
+        error, since, limit, wait = self._check_changes_args(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        deadline = time.monotonic() + wait
+        try:
+            while True:
+                version, db_now, oldest_write, writes_tracked = await self._changes_head()
+                changes = []
+                if version > since:
+                    rows = await self.query(
+                        base_query=self.define_queries(key='GET_CHANGES_SINCE'),
+                        kwargs={'table_name': self.TABLE_NAME, 'changes_table': self.changes_table_name},
+                        params=(since, limit)
+                    )
+                    changes = self._settled_changes(rows, since, db_now, oldest_write, writes_tracked)
+                remaining = deadline - time.monotonic()
+                if changes or remaining <= 0:
+                    break
+                async with self._changes_cond:
+                    try:
+                        await asyncio.wait_for(
+                            self._changes_cond.wait(),
+                            min(self.CHANGES_POLL_SECONDS, remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+        except MyslApiException:
+            return self.format_response(
+                {'message': 'Unable to get the test case changes'},
+                status_code=StatusCode.NOT_FOUND
+            )
+        return self.format_response(
+            self._changes_response(changes, since, version, writes_tracked),
+            status_code=StatusCode.OK
+        )
+
+    async def _changes_head(self):
+        kwargs = {'changes_table': self.changes_table_name, 'now': self.db_handler.dialect.epoch_now}
+        if self._writes_tracked:
+            try:
+                version, db_now, oldest_write = (await self.query(
+                    base_query=self.define_queries(key='GET_CHANGES_HEAD'),
+                    kwargs=kwargs
+                ))[0]
+                return version, db_now, oldest_write, True
+            except MyslApiException:
+                # No PROCESS privilege, raises again below when the log itself can not be read
+                pass
+        version, db_now = (await self.query(
+            base_query=self.define_queries(key='GET_CHANGES_HEAD_WITHOUT_WRITES'),
+            kwargs=kwargs
+        ))[0]
+        self._writes_tracked = False
+        return version, db_now, None, False
+
+    async def post_test_cases_bulk(self):
+        try:
+            items = self._parse_bulk_body(request.mimetype, await request.get_data(as_text=True))
+        except ValueError as e:
+            return self.format_response({'message': str(e)}, status_code=StatusCode.BAD_REQUEST)
+        if len(items) > self.MAX_BULK_SIZE:
+            return self.format_response(
+                {'message': f"At most {self.MAX_BULK_SIZE} test cases can be created at once"},
+                status_code=StatusCode.BAD_REQUEST
+            )
+        rows, indexes, errors = self._split_bulk_items(items)
+        if not rows:
+            return self.format_response({'created': [], 'errors': errors}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            report = await self.bulk_insert(
+                table_name=self.TABLE_NAME,
+                data=rows,
+                chunk_size=self.BULK_CHUNK_SIZE
+            )
+        except MyslApiException as e:
+            if self.db_handler.violates_constraint(e):
+                try:
+                    existing = await self._lookup_many('name', [row['name'] for row in rows])
+                except MyslApiException:
+                    existing = {}
+                return self.format_response(
+                    self._bulk_conflicts(rows, indexes, errors, existing),
+                    status_code=StatusCode.CONFLICT
+                )
+            return self.format_response(
+                {'message': 'Unable to create the test cases, nothing was added', 'errors': errors},
+                status_code=StatusCode.NOT_FOUND
+            )
+        self.test_case_cache.invalidate(*[('name', row['name']) for row in rows])
+        await self._table_changed()
+        created = [
+            {'index': index, 'name': row['name'], 'id': row_id}
+            for index, row, row_id in zip(indexes, rows, report['ids'])
+        ]
+        return self.format_response({'created': created, 'errors': errors}, status_code=StatusCode.CREATED)
+
+    async def get_pool_stats(self):
+        return self.format_response(self.pool_stats(), status_code=StatusCode.OK)
+
+    async def get_statement_stats(self):
+        return self.format_response(self.db_handler.statement_stats(), status_code=StatusCode.OK)
+
+    async def get_cache_stats(self):
+        return self.format_response(self.test_case_cache.stats(), status_code=StatusCode.OK)
@@ -1,39 +1,57 @@
-
 import os
+import re
 import json
-from flask import request
+import time
+import hashlib
+import threading
+from flask import Response, request, stream_with_context
 from functools import wraps
-from dotenv import load_dotenv
+from input_data_test_cases.cache import TTLCache
 from input_data_test_cases.base_api import StatusCode
-from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery, SQLDBHandler
 from input_data_test_cases.mysql_api.mysql_api import MysqlApi, MyslApiException
+from input_data_test_cases.mysql_api.snapshot import TableSnapshot
+from input_data_test_cases.mysql_api.group_commit import GroupCommitException, GroupCommitQueue
+
+
+def check_test_case_fields(args):
+    """
+    Validate the id/name query arguments of a single test case request.
+
+    Returns a tuple ``(error, value, column)`` where ``error`` is the
+    message to answer with when the arguments are invalid.
+    """
+    id = args.get('id', None)
+    name = args.get('name', None)
+    if id is None and name is None:
+        return "Missing id or testcase name", None, None
+    elif id and name:
+        return "You just can choose id or name, not both", None, None
+    elif id:
+        try:
+            int(id)
+        except ValueError:
+            return "ID should be an integer", None, None
+    elif name:
+        try:
+            int(name)
+            return "Name should be a string", None, None
+        except ValueError:
+            pass
+    else:
+        pass
+    value = id or name
+    column = 'id' if id and not name else 'name'
+    return None, value, column
 
 
 def verify_test_case_fields(function):
 
     @wraps(function)
     def wrapper(self, *args, **kwargs):
-        id = request.args.get('id', None)
-        name = request.args.get('name', None)
-        if id is None and name is None:
-            return self.format_response({'message': "Missing id or testcase name"}, status_code=StatusCode.BAD_REQUEST)
-        elif id and name:
-            return self.format_response({'message': "You just can choose id or name, not both"}, status_code=StatusCode.BAD_REQUEST)
-        elif id:
-            try:
-                int(id)
-            except ValueError:
-                return self.format_response({'message': "ID should be an integer"}, status_code=StatusCode.BAD_REQUEST)
-        elif name:
-            try:
-                int(name)
-                return self.format_response({'message': "Name should be a string"}, status_code=StatusCode.BAD_REQUEST)
-            except ValueError:
-                pass
-        else:
-            pass
-        value = id or name
-        column = 'id' if id and not name else 'name'
+        error, value, column = check_test_case_fields(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
         return function(self, value, column, *args, **kwargs)
     return wrapper
 
@@ -42,11 +60,425 @@ class EcommerceDataTCException(Exception):
     pass
 
 
-class EcommerceDataTC(MysqlApi):
+class EcommerceDataTCBase():
+    """
+    Framework independent parts of the test case API (table layout,
+    query map, request validation and row helpers) shared by the WSGI and
+    ASGI implementations.
+    """
     TABLE_NAME = "parameters"
+    MAX_PAGE_SIZE = 1000
+    MAX_BATCH_SIZE = 10000
+    BATCH_CHUNK_SIZE = 500
+    MAX_BULK_SIZE = 50000
+    BULK_CHUNK_SIZE = 500
+    JSON_PATH_PATTERN = re.compile(r'^(\.(\w+|\*|"[^"]+")|\[(\d+|\*)\])*$')
+    MAX_CHANGES_WAIT = 30
+    CHANGES_POLL_SECONDS = 0.5
+    # innodb_trx is refreshed at most every 0.1s and trx_started has a one
+    # second resolution; log rows younger than this are not checked against it
+    CHANGES_SETTLE_SECONDS = 1
+    # When the open writes can not be read, holes are waited for this
+    # long, more than any write transaction is expected to last
+    CHANGES_UNTRACKED_SETTLE_SECONDS = 60
+    PATCH_OPERATIONS = ('set', 'insert', 'replace', 'remove', 'append')
+    MAX_PATCH_OPERATIONS = 100
+
+    def define_queries(self, key):
+        return {
+            'GET_TESTCASE_PARAMS': ConsultTableQuery.WHERE_COLUMN_EQUALS,
+            'POST_TESTCASE_PARAMS': ModifyTableQuery.INSERT_NEW_VALUE_BASE_QUERY,
+            'DELETE_TEST_CASE': ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+            'UPDATE_TEST_CASE': ModifyTableQuery.UPDATE_VALUE_WHERE_COLUMN_EQUALS,
+            'GET_ALL_TCS': ConsultTableQuery.GET_ALL_COLUMNS,
+            'GET_TCS_PAGE': ConsultTableQuery.GET_PAGE_AFTER_ID,
+            'GET_TESTCASE_IDENTITY': ConsultTableQuery.GET_ID_AND_NAME_WHERE_COLUMN_EQUALS,
+            'GET_TESTCASES_IN': ConsultTableQuery.WHERE_COLUMN_IN,
+            'GET_TESTCASE_CHECKSUM': ConsultTableQuery.PARAMS_CHECKSUM_WHERE_COLUMN_EQUALS,
+            'GET_TESTCASE_PARAMS_PATH': ConsultTableQuery.JSON_PATH_WHERE_COLUMN_EQUALS,
+            'PATCH_TEST_CASE': ModifyTableQuery.PATCH_PARAMS_WHERE_COLUMN_EQUALS,
+            'GET_CHANGES_HEAD': ConsultTableQuery.CHANGE_LOG_HEAD,
+            'GET_CHANGES_HEAD_WITHOUT_WRITES': ConsultTableQuery.CHANGE_LOG_HEAD_WITHOUT_WRITES,
+            'GET_CHANGES_SINCE': ConsultTableQuery.CHANGES_SINCE
+        }.get(key, None)
+
+    @property
+    def changes_table_name(self):
+        # Named by the handler that creates the log and its triggers
+        return SQLDBHandler.change_log_table(self.TABLE_NAME)
+
+    @staticmethod
+    def _cache_key(column, value):
+        return (column, str(int(value)) if column == 'id' else value)
+
+    @staticmethod
+    def _params_etag(checksums):
+        """
+        Strong ETag of a test case read, derived from the MD5 of each
+        returned ``params`` document so MySQL can compute it as well.
+        """
+        return hashlib.sha256("\n".join(c or '' for c in checksums).encode()).hexdigest()
+
+    def _response_etag(self, response):
+        checksums = []
+        for row in response:
+            params = self._row_as_dict(row, ('params',))['params']
+            if isinstance(params, str):
+                params = params.encode()
+            elif params is not None and not isinstance(params, bytes):
+                params = json.dumps(params).encode()
+            checksums.append(hashlib.md5(params).hexdigest() if params is not None else None)
+        return self._params_etag(checksums)
+
+    @staticmethod
+    def _row_id(row):
+        return row['id'] if isinstance(row, dict) else row[0]
+
+    @staticmethod
+    def _row_as_dict(row, columns):
+        return row if isinstance(row, dict) else dict(zip(columns, row))
+
+    @staticmethod
+    def _validate_new_test_case(item):
+        if not isinstance(item, dict):
+            return "Test case should be an object"
+        name = item.get('name')
+        if not isinstance(name, str) or not name:
+            return "Name should be a non empty string"
+        if name.isdigit():
+            return "Name should be a string"
+        if item.get('params') is None:
+            return "Missing params"
+        return None
+
+    @classmethod
+    def _check_page_args(cls, args):
+        try:
+            limit = int(args.get('limit', cls.MAX_PAGE_SIZE))
+            after_id = int(args.get('after_id', 0))
+        except ValueError:
+            return "limit and after_id should be integers", None, None
+        if not 0 < limit <= cls.MAX_PAGE_SIZE:
+            return f"limit should be between 1 and {cls.MAX_PAGE_SIZE}", None, None
+        return None, limit, after_id
+
+    @classmethod
+    def _check_projection_args(cls, args):
+        """
+        Build the MySQL JSON path selected by the ``index`` and ``path``
+        query arguments: ``index`` picks an element of the params array and
+        ``path`` (``$.key``, ``.key`` or ``key``) is read from there on.
+
+        Returns a tuple ``(error, json_path)``; ``json_path`` is None when
+        the whole document was requested.
+        """
+        index = args.get('index', None)
+        path = args.get('path', None)
+        if index is None and path is None:
+            return None, None
+        json_path = "$"
+        if index is not None:
+            try:
+                index = int(index)
+            except ValueError:
+                return "index should be an integer", None
+            if index < 0:
+                return "index should not be negative", None
+            json_path += f"[{index}]"
+        if path:
+            path = cls._json_path_suffix(path)
+            if path is None:
+                return "path should be a JSON path like $.key[0]", None
+            json_path += path
+        return None, json_path
+
+    @classmethod
+    def _check_changes_args(cls, args):
+        """
+        Returns a tuple ``(error, since, limit, wait)`` for the change feed.
+        """
+        try:
+            since = int(args.get('since', 0))
+            limit = int(args.get('limit', cls.MAX_PAGE_SIZE))
+            wait = float(args.get('wait', 0))
+        except ValueError:
+            return "since and limit should be integers, wait a number of seconds", None, None, None
+        if since < 0:
+            return "since should not be negative", None, None, None
+        if not 0 < limit <= cls.MAX_PAGE_SIZE:
+            return f"limit should be between 1 and {cls.MAX_PAGE_SIZE}", None, None, None
+        if not 0 <= wait <= cls.MAX_CHANGES_WAIT:
+            return f"wait should be between 0 and {cls.MAX_CHANGES_WAIT} seconds", None, None, None
+        return None, since, limit, wait
+
+    @classmethod
+    def _settled_changes(cls, rows, since, db_now, oldest_write, writes_tracked=True):
+        """
+        Keep the change rows that can be handed out without skipping one.
+
+        Versions are allocated when a row is written but become visible on
+        commit, so a hole in the sequence may be a transaction still in
+        flight. Such a transaction allocated its version before the row
+        after the hole and so started before it was written. Rows after a
+        hole are held back while a write transaction that old is open
+        (``oldest_write`` comes from the log head read before ``rows``);
+        once none is left the hole is a rollback and is stepped over.
+        Without ``writes_tracked`` (the open writes could not be read) a
+        hole is stepped over once CHANGES_UNTRACKED_SETTLE_SECONDS passed.
+        """
+        changes = []
+        expected = since + 1
+        for version, test_case_id, name, operation, changed_at, params in rows:
+            if version != expected and not cls._gap_settled(changed_at, db_now, oldest_write, writes_tracked):
+                break
+            changes.append({
+                'version': version,
+                'id': test_case_id,
+                'name': name,
+                'op': operation,
+                'params': params if operation != 'delete' else None,
+            })
+            expected = version + 1
+        return changes
+
+    @classmethod
+    def _gap_settled(cls, changed_at, db_now, oldest_write, writes_tracked=True):
+        if not writes_tracked:
+            return float(db_now) - changed_at >= cls.CHANGES_UNTRACKED_SETTLE_SECONDS
+        if float(db_now) - changed_at < cls.CHANGES_SETTLE_SECONDS:
+            return False
+        return oldest_write is None or float(oldest_write) > changed_at
+
+    @staticmethod
+    def _changes_response(changes, since, version, writes_tracked=True):
+        return {
+            'changes': changes,
+            'since': since,
+            'next_since': changes[-1]['version'] if changes else since,
+            'version': version,
+            # Tells clients holes may have been skipped on a timeout
+            'gap_check': 'open_writes' if writes_tracked else 'time_window',
+        }
+
+    @classmethod
+    def _json_path_suffix(cls, path):
+        """
+        Normalize ``$.key``, ``.key`` or ``key`` to the part following ``$``,
+        or None when ``path`` is not a supported JSON path.
+        """
+        if not isinstance(path, str):
+            return None
+        path = path[1:] if path.startswith("$") else path
+        if path and not path.startswith((".", "[")):
+            path = "." + path
+        return path if cls.JSON_PATH_PATTERN.match(path) else None
+
+    @classmethod
+    def _parse_patch(cls, mimetype, body):
+        """
+        Read a PATCH body: a JSON merge patch object, or a list of
+        ``{"op", "path", "value"}`` operations applied in order.
+
+        Returns a tuple ``(error, operations)`` where operations are
+        ``(op, json_path, json_value)`` tuples (``merge`` for a merge patch).
+        """
+        try:
+            patch = json.loads(body)
+        except ValueError:
+            return "Expected a JSON body", None
+        if mimetype == 'application/merge-patch+json' or isinstance(patch, dict):
+            if not isinstance(patch, dict):
+                return "A merge patch should be a JSON object", None
+            return None, [('merge', None, json.dumps(patch))]
+        if not isinstance(patch, list) or not patch:
+            return "Expected a merge patch object or a list of operations", None
+        if len(patch) > cls.MAX_PATCH_OPERATIONS:
+            return f"At most {cls.MAX_PATCH_OPERATIONS} operations can be applied at once", None
+        operations = []
+        for number, operation in enumerate(patch):
+            if not isinstance(operation, dict) or operation.get('op') not in cls.PATCH_OPERATIONS:
+                return f"Operation {number}: op should be one of {', '.join(cls.PATCH_OPERATIONS)}", None
+            path = cls._json_path_suffix(operation.get('path'))
+            # Wildcards only make sense when reading
+            if path is None or '*' in path:
+                return f"Operation {number}: path should be a JSON path like $[0].key", None
+            if operation['op'] == 'remove':
+                if not path:
+                    return f"Operation {number}: the whole document can not be removed", None
+                operations.append(('remove', "$" + path, None))
+                continue
+            if 'value' not in operation:
+                return f"Operation {number}: missing value", None
+            operations.append((operation['op'], "$" + path, json.dumps(operation['value'])))
+        return None, operations
+
+    @classmethod
+    def _check_batch_identifiers(cls, ids, names):
+        if not isinstance(ids, list) or not isinstance(names, list):
+            return "ids and names should be lists", None, None
+        if not ids and not names:
+            return "Missing ids or test case names", None, None
+        if len(ids) + len(names) > cls.MAX_BATCH_SIZE:
+            return f"At most {cls.MAX_BATCH_SIZE} ids and names can be requested at once", None, None
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return "ID should be an integer", None, None
+        if not all(isinstance(n, str) and not n.isdigit() for n in names):
+            return "Name should be a string", None, None
+        return None, ids, names
+
+    @staticmethod
+    def _parse_bulk_body(mimetype, body):
+        if mimetype == 'application/x-ndjson':
+            items = []
+            for number, line in enumerate(body.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    raise ValueError(f"Invalid JSON on line {number}")
+        else:
+            try:
+                items = json.loads(body)
+            except ValueError:
+                items = None
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array or NDJSON body of test cases")
+        return items
+
+    @classmethod
+    def _split_bulk_items(cls, items):
+        rows, indexes, errors = [], [], []
+        first_index = {}
+        for index, item in enumerate(items):
+            error = cls._validate_new_test_case(item)
+            if error is None and item['name'] in first_index:
+                error = f"Duplicate name, already given at index {first_index[item['name']]}"
+            if error:
+                errors.append({'index': index, 'message': error})
+            else:
+                rows.append({'name': item['name'], 'params': item['params']})
+                indexes.append(index)
+                first_index[item['name']] = index
+        return rows, indexes, errors
+
+    @classmethod
+    def _bulk_conflicts(cls, rows, indexes, errors, existing):
+        """
+        Body of a bulk create refused by a unique constraint: the rows whose
+        name is in ``existing`` (a _found_map of the names) are reported
+        along with the validation errors.
+        """
+        conflicts = []
+        errors = list(errors)
+        for index, row in zip(indexes, rows):
+            if existing.get(row['name'], {}).get('found', False):
+                conflicts.append(row['name'])
+                errors.append({'index': index, 'message': f"Test case {row['name']} already exists"})
+        return {
+            'message': 'Test cases already exist, nothing was added',
+            'conflicts': conflicts,
+            'errors': sorted(errors, key=lambda error: error['index']),
+        }
+
+    @classmethod
+    def _found_map(cls, column, values, rows):
+        found = {}
+        for row in rows:
+            row = cls._row_as_dict(row, ('id', 'name', 'params'))
+            found.setdefault(str(row[column]), {'found': True, 'params': row['params']})
+        return {str(v): found.get(str(v), {'found': False}) for v in values}
+
+    @staticmethod
+    def _ndjson_line(row):
+        return json.dumps(row, default=str) + "\n"
+
+
+class EcommerceDataTC(EcommerceDataTCBase, MysqlApi):
+    # A long-poll holds one of the few gunicorn worker threads for its
+    # whole wait; longer waits are served by the ASGI app
+    MAX_CHANGES_WAIT = 5
 
     def __init__(self, config):
         super().__init__(config)
+        self.test_case_cache = TTLCache(
+            max_size=self.config.get('TEST_CASE_CACHE_SIZE', 1024),
+            ttl=self.config.get('TEST_CASE_CACHE_TTL', 30)
+        )
+        self.snapshot = self.setup_snapshot()
+        self.write_queue = self.setup_write_queue()
+        self._changes_cond = threading.Condition()
+        self._writes_tracked = True
+
+    @classmethod
+    def migrate(cls, config, max_seconds=60):
+        """
+        Create the schema the API needs besides its table: with
+        TEST_CASE_CHANGE_LOG the change log and triggers behind
+        /test_cases/changes. Run it once per deployment before any worker
+        serves (gunicorn's on_starting hook does), as workers creating
+        the triggers concurrently would race each other.
+        """
+        if not config.get('TEST_CASE_CHANGE_LOG', False):
+            return
+        # Nothing but the schema is needed, no background threads
+        db_handler = cls(config={**config, 'TEST_CASE_SNAPSHOT': False, 'GROUP_COMMIT': False}).db_handler
+        try:
+            db_handler.wait_until_ready(max_seconds=max_seconds)
+            db_handler.create_change_log(table_name=cls.TABLE_NAME)
+        finally:
+            db_handler.close()
+
+    def setup_snapshot(self):
+        """
+        With TEST_CASE_SNAPSHOT the whole table is held in memory and single
+        test case reads are answered from it, falling back to the database
+        until it is loaded and for rows it does not hold yet.
+        """
+        if not self.config.get('TEST_CASE_SNAPSHOT', False):
+            return None
+        snapshot = TableSnapshot(
+            db_handler=self.db_handler,
+            table_name=self.TABLE_NAME,
+            encode_params=self._encode_snapshot_params,
+            poll_seconds=self.config.get('TEST_CASE_SNAPSHOT_POLL_SECONDS', 5),
+            # The change log head is far cheaper to poll than a table checksum
+            changes_table=self.changes_table_name if self.config.get('TEST_CASE_CHANGE_LOG', False) else None
+        )
+        snapshot.start()
+        return snapshot
+
+    def setup_write_queue(self):
+        """
+        With GROUP_COMMIT concurrent POST /test_case inserts are batched into
+        one multi-row INSERT and commit.
+        """
+        if not self.config.get('GROUP_COMMIT', False):
+            return None
+        return GroupCommitQueue(
+            db_handler=self.db_handler,
+            table_name=self.TABLE_NAME,
+            max_batch_size=self.config.get('GROUP_COMMIT_MAX_BATCH_SIZE', 100),
+            max_latency=self.config.get('GROUP_COMMIT_MAX_LATENCY', 0.005)
+        )
+
+    def _encode_snapshot_params(self, params):
+        # Same body and ETag as a database read of the row
+        response = [(params,)]
+        return self.serializer.dumps(response), self._response_etag(response)
+
+    def _table_changed(self, column=None, value=None):
+        # Wake the change feed long-polls of this process
+        with self._changes_cond:
+            self._changes_cond.notify_all()
+        if self.snapshot is None:
+            return
+        if column is not None:
+            self.snapshot.discard(column, value)
+        else:
+            self.snapshot.wake()
 
     def define_routes(self):
         self.app.add_url_rule("/",view_func=self.home)
@@ -54,36 +486,162 @@ class EcommerceDataTC(MysqlApi):
         self.app.add_url_rule("/test_case",endpoint="post_test_case",view_func=self.post_test_case,methods=["POST"])
         self.app.add_url_rule("/test_case",endpoint="delete_test_case",view_func=self.delete_test_case,methods=["DELETE"])
         self.app.add_url_rule("/test_case",endpoint="update_test_case",view_func=self.update_test_case,methods=["PUT"])
+        self.app.add_url_rule("/test_case",endpoint="patch_test_case",view_func=self.patch_test_case,methods=["PATCH"])
 
+        self.app.add_url_rule(
+            "/test_cases", endpoint="get_test_cases",
+            view_func=self.get_test_cases, methods=["GET", "POST"]
+        )
+        self.app.add_url_rule(
+            "/test_cases/changes", endpoint="get_test_case_changes",
+            view_func=self.get_test_case_changes, methods=["GET"]
+        )
+        self.app.add_url_rule(
+            "/test_cases/bulk", endpoint="post_test_cases_bulk",
+            view_func=self.post_test_cases_bulk, methods=["POST"]
+        )
         self.app.add_url_rule("/all_test_cases",endpoint="get_all_test_cases",view_func=self.get_all_test_cases,methods=["GET"])
+        self.app.add_url_rule("/pool_stats",endpoint="get_pool_stats",view_func=self.get_pool_stats,methods=["GET"])
+        self.app.add_url_rule(
+            "/replica_stats", endpoint="get_replica_stats",
+            view_func=self.get_replica_stats, methods=["GET"]
+        )
+        self.app.add_url_rule("/cache_stats",endpoint="get_cache_stats",view_func=self.get_cache_stats,methods=["GET"])
+        self.app.add_url_rule(
+            "/statement_stats", endpoint="get_statement_stats",
+            view_func=self.get_statement_stats, methods=["GET"]
+        )
+        self.app.add_url_rule(
+            "/compression_stats", endpoint="get_compression_stats",
+            view_func=self.get_compression_stats, methods=["GET"]
+        )
+        self.app.add_url_rule(
+            "/slow_queries", endpoint="get_slow_queries",
+            view_func=self.get_slow_queries, methods=["GET", "DELETE"]
+        )
+        self.app.add_url_rule(
+            "/group_commit_stats", endpoint="get_group_commit_stats",
+            view_func=self.get_group_commit_stats, methods=["GET"]
+        )
+        self.app.add_url_rule(
+            "/snapshot_stats", endpoint="get_snapshot_stats",
+            view_func=self.get_snapshot_stats, methods=["GET"]
+        )
 
 
-    def define_queries(self, key):
-        return {
-            'GET_TESTCASE_PARAMS': ConsultTableQuery.WHERE_COLUMN_EQUALS,
-            'POST_TESTCASE_PARAMS': ModifyTableQuery.INSERT_NEW_VALUE_BASE_QUERY,
-            'DELETE_TEST_CASE': ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
-            'UPDATE_TEST_CASE': ModifyTableQuery.UPDATE_VALUE_WHERE_COLUMN_EQUALS,
-            'GET_ALL_TCS': ConsultTableQuery.GET_ALL_COLUMNS
-        }.get(key, None)
-
     def home(self):
         return self.format_response({'message': "Base url"}, status_code=StatusCode.OK)
 
+    def _test_case_cache_keys(self, column, value, extra_names=()):
+        """
+        Cached id and name entries of the rows matched by ``column = value``.
+        Looked up before a write since a rename changes them, None when they
+        can not be resolved. Read from the primary, a lagging replica may
+        not know a row created or renamed moments ago.
+        """
+        if not self.test_case_cache.enabled:
+            return []
+        keys = [self._cache_key(column, value)] + [('name', n) for n in extra_names]
+        try:
+            rows = self.query(
+                base_query=self.define_queries(key='GET_TESTCASE_IDENTITY'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(value,),
+                primary=True
+            )
+        except MyslApiException:
+            return None
+        for row in rows:
+            row = self._row_as_dict(row, ('id', 'name'))
+            keys += [self._cache_key('id', row['id']), ('name', row['name'])]
+        return keys
+
+    def _invalidate_test_case(self, keys):
+        # Only once the write committed, a read running before that would
+        # put the old row back in the cache for a whole TTL
+        if keys is None:
+            self.test_case_cache.clear()
+        elif keys:
+            self.test_case_cache.invalidate(*keys)
+
+    def _stored_etag(self, column, value):
+        """
+        ETag of the rows matched by ``column = value`` computed from
+        ``md5(params)`` in MySQL, without shipping the documents.
+        """
+        rows = self.query(
+            base_query=self.define_queries(key='GET_TESTCASE_CHECKSUM'),
+            kwargs={'table_name': self.TABLE_NAME, 'column': column},
+            params=(value,)
+        )
+        if not rows:
+            return None
+        return self._params_etag([row['checksum'] if isinstance(row, dict) else row[0] for row in rows])
+
     @verify_test_case_fields
     def get_test_case(self, value, column):
+        error, json_path = self._check_projection_args(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        if json_path is not None:
+            return self._get_test_case_fragment(value, column, json_path)
+        # Reads that must see the client's own writes skip the in-process
+        # copies, which may predate them (another worker served the write)
+        read_primary = self._reads_from_primary()
+        cache_key = self._cache_key(column, value)
+        if not read_primary:
+            snapshot_entry = self.snapshot.get(column, value) if self.snapshot is not None else None
+            if snapshot_entry is not None:
+                body, etag = snapshot_entry
+                return self.make_conditional(self.format_raw_response(body, status_code=StatusCode.OK), etag=etag)
+            cached = self.test_case_cache.get(cache_key)
+            if cached is not None:
+                body, etag = cached
+                return self.make_conditional(self.format_raw_response(body, status_code=StatusCode.OK), etag=etag)
         response = {}
         try:
+            if request.if_none_match:
+                etag = self._stored_etag(column, value)
+                if etag is not None and self.is_not_modified(etag):
+                    return self.not_modified_response(etag)
             base_query = self.define_queries(key='GET_TESTCASE_PARAMS')
             response = self.query(
                 base_query=base_query,
-                kwargs={'table_name': self.TABLE_NAME,'column': column, 'value':value},
+                kwargs={'table_name': self.TABLE_NAME,'column': column},
+                params=(value,)
             )
+            etag = self._response_etag(response)
             status_code = StatusCode.OK
         except MyslApiException:
             response = {'message': 'Unable find the desired test case'}
             status_code = StatusCode.NOT_FOUND
-        return self.format_response(response, status_code=status_code)
+            etag = None
+        formatted = self.format_response(response, status_code=status_code)
+        # Empty results are not cached so a later POST is visible at once.
+        # The encoded body is kept so hits skip serialization altogether.
+        # A lagging replica could put back a row a write just invalidated,
+        # so only primary reads are cached.
+        if etag is not None and response and (read_primary or not self.replica_router.replicas):
+            self.test_case_cache.set(cache_key, (formatted[0].get_data(), etag))
+        return self.make_conditional(formatted, etag=etag)
+
+    def _get_test_case_fragment(self, value, column, json_path):
+        """
+        Answer a projected read with the ``json_path`` fragment extracted by
+        MySQL. Fragments are not cached, the ETag is taken from the fragment.
+        """
+        try:
+            response = self.query(
+                base_query=self.define_queries(key='GET_TESTCASE_PARAMS_PATH'),
+                kwargs={'table_name': self.TABLE_NAME, 'column': column},
+                params=(json_path, value)
+            )
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable find the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        etag = self._response_etag(response) if status_code == StatusCode.OK else None
+        return self.make_conditional(self.format_response(response, status_code=status_code), etag=etag)
 
     def post_test_case(self):
         if request.is_json:
@@ -97,17 +655,23 @@ class EcommerceDataTC(MysqlApi):
             return self.format_response({'message': 'Missing arguments'}, status_code=StatusCode.BAD_REQUEST)
         columns = "name, params"
         values =  [name, str(params)]
-        placeholders = ",".join(["%s"] * len(values))  # %s,%s,%s
+        placeholders = self.placeholders(len(values))  # %s,%s,%s
         base_query = self.define_queries(key='POST_TESTCASE_PARAMS')
         try:
-            self.query(
-                base_query=base_query,
-                kwargs={'table_name': self.TABLE_NAME,'columns': columns, 'placeholders':placeholders},
-                params=values
-            )
+            if self.write_queue is not None:
+                self.write_queue.submit({'name': name, 'params': str(params)})
+                self._record_write()
+            else:
+                self.query(
+                    base_query=base_query,
+                    kwargs={'table_name': self.TABLE_NAME,'columns': columns, 'placeholders':placeholders},
+                    params=values
+                )
+            self.test_case_cache.invalidate(('name', name))
+            self._table_changed()
             response = {'message': "New test case added successfully"}
             status_code = StatusCode.OK
-        except MyslApiException:
+        except (MyslApiException, GroupCommitException):
             response = {'message': 'Unable created the new test case'}
             status_code = StatusCode.NOT_FOUND
         return self.format_response(response, status_code=status_code)
@@ -116,11 +680,15 @@ class EcommerceDataTC(MysqlApi):
     def delete_test_case(self, value, column):
         response = {}
         try:
+            cache_keys = self._test_case_cache_keys(column, value)
             base_query = self.define_queries(key='DELETE_TEST_CASE')
             self.query(
                 base_query=base_query,
-                kwargs={'table_name': self.TABLE_NAME,'column': column, 'value':value},
+                kwargs={'table_name': self.TABLE_NAME,'column': column},
+                params=(value,)
             )
+            self._invalidate_test_case(cache_keys)
+            self._table_changed(column, value)
             response = {'message': 'Test case deleted successfully'}
             status_code = StatusCode.OK
         except MyslApiException:
@@ -136,13 +704,19 @@ class EcommerceDataTC(MysqlApi):
             v = request.form.get(field, None)
             if v is not None:
                 data.update({field: v})
+        if not data:
+            return self.format_response({'message': 'Missing arguments'}, status_code=StatusCode.BAD_REQUEST)
         try:
+            cache_keys = self._test_case_cache_keys(column, value, extra_names=[data['name']] if 'name' in data else [])
             base_query = self.define_queries(key='UPDATE_TEST_CASE')
-            updates = ",".join([f"{k} = '{v}'" for k, v in data.items()])
+            updates = ",".join([f"{k} = {self.db_handler.param_symbol}" for k in data])
             self.query(
                 base_query=base_query,
-                kwargs={'table_name': self.TABLE_NAME,'updates': updates, 'value':value, 'column': column},
+                kwargs={'table_name': self.TABLE_NAME,'updates': updates, 'column': column},
+                params=[*data.values(), value]
             )
+            self._invalidate_test_case(cache_keys)
+            self._table_changed(column, value)
             response = {'message': 'Test case deleted successfully'}
             status_code = StatusCode.OK
         except MyslApiException:
@@ -150,7 +724,34 @@ class EcommerceDataTC(MysqlApi):
             status_code = StatusCode.NOT_FOUND
         return self.format_response(response, status_code=status_code)
 
+    @verify_test_case_fields
+    def patch_test_case(self, value, column):
+        error, operations = self._parse_patch(request.mimetype, request.get_data(as_text=True))
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        # Only the changed fragments travel, the database edits the stored document
+        expression, params = self.db_handler.dialect.json_patch_expression('params', operations)
+        try:
+            cache_keys = self._test_case_cache_keys(column, value)
+            self.query(
+                base_query=self.define_queries(key='PATCH_TEST_CASE'),
+                kwargs={'table_name': self.TABLE_NAME, 'params_expression': expression, 'column': column},
+                params=[*params, value]
+            )
+            self._invalidate_test_case(cache_keys)
+            self._table_changed(column, value)
+            response = {'message': 'Test case patched successfully'}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to patch the desired test case'}
+            status_code = StatusCode.NOT_FOUND
+        return self.format_response(response, status_code=status_code)
+
     def get_all_test_cases(self):
+        if request.args.get('format') == 'ndjson':
+            return self._stream_all_test_cases()
+        if 'limit' in request.args or 'after_id' in request.args:
+            return self._get_test_cases_page()
         try:
             base_query = self.define_queries(key='GET_ALL_TCS')
             response = self.query(
@@ -161,11 +762,233 @@ class EcommerceDataTC(MysqlApi):
         except MyslApiException:
             response = {'message': 'Unable to get all the test cases'}
             status_code = StatusCode.NOT_FOUND
+        return self.make_conditional(self.format_response(response, status_code=status_code))
+
+    def _get_test_cases_page(self):
+        error, limit, after_id = self._check_page_args(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            base_query = self.define_queries(key='GET_TCS_PAGE')
+            rows = self.query(
+                base_query=base_query,
+                kwargs={'table_name': self.TABLE_NAME},
+                params=(after_id, limit)
+            )
+            next_after_id = self._row_id(rows[-1]) if len(rows) == limit else None
+            response = {'test_cases': rows, 'next_after_id': next_after_id}
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to get all the test cases'}
+            status_code = StatusCode.NOT_FOUND
+        return self.make_conditional(self.format_response(response, status_code=status_code))
+
+    def _stream_all_test_cases(self):
+        try:
+            base_query = self.define_queries(key='GET_ALL_TCS')
+            rows = self.stream_query(
+                base_query=base_query,
+                kwargs={'table_name': self.TABLE_NAME}
+            )
+        except MyslApiException:
+            return self.format_response(
+                {'message': 'Unable to get all the test cases'}, status_code=StatusCode.NOT_FOUND
+            )
+
+        def ndjson_lines():
+            try:
+                for row in rows:
+                    yield self._ndjson_line(row)
+            finally:
+                rows.close()
+        response = Response(stream_with_context(ndjson_lines()), status=StatusCode.OK, mimetype="application/x-ndjson")
+        # The generator's finally only runs once iteration started; a body
+        # never read (client gone before the first chunk) frees the
+        # connection when the server closes the response, not on collection
+        response.call_on_close(rows.close)
+        return response
+
+    def get_test_cases(self):
+        if request.method == "POST":
+            data = request.get_json(silent=True) or {}
+            ids = data.get('ids', [])
+            names = data.get('names', [])
+        else:
+            ids = request.args.getlist('id')
+            names = request.args.getlist('name')
+        error, ids, names = self._check_batch_identifiers(ids, names)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            response = {
+                'ids': self._lookup_many('id', ids),
+                'names': self._lookup_many('name', names),
+            }
+            status_code = StatusCode.OK
+        except MyslApiException:
+            response = {'message': 'Unable to get the requested test cases'}
+            status_code = StatusCode.NOT_FOUND
         return self.format_response(response, status_code=status_code)
 
+    def get_test_case_changes(self):
+        """
+        Changes of the parameters table after version ``since``, oldest
+        first. With ``wait`` the request is held until a change shows up
+        or ``wait`` seconds passed. Deletes come as tombstones without
+        params, the other entries carry the row's current params.
+        """
+        error, since, limit, wait = self._check_changes_args(request.args)
+        if error:
+            return self.format_response({'message': error}, status_code=StatusCode.BAD_REQUEST)
+        deadline = time.monotonic() + wait
+        try:
+            while True:
+                version, db_now, oldest_write, writes_tracked = self._changes_head()
+                changes = []
+                if version > since:
+                    rows = self.query(
+                        base_query=self.define_queries(key='GET_CHANGES_SINCE'),
+                        kwargs={'table_name': self.TABLE_NAME, 'changes_table': self.changes_table_name},
+                        params=(since, limit),
+                        primary=True
+                    )
+                    changes = self._settled_changes(rows, since, db_now, oldest_write, writes_tracked)
+                remaining = deadline - time.monotonic()
+                if changes or remaining <= 0:
+                    break
+                with self._changes_cond:
+                    self._changes_cond.wait(min(self.CHANGES_POLL_SECONDS, remaining))
+        except MyslApiException:
+            return self.format_response(
+                {'message': 'Unable to get the test case changes'},
+                status_code=StatusCode.NOT_FOUND
+            )
+        return self.format_response(
+            self._changes_response(changes, since, version, writes_tracked),
+            status_code=StatusCode.OK
+        )
+
+    def _changes_head(self):
+        """
+        ``(version, db_now, oldest_write, writes_tracked)`` of the change
+        log, read from the primary as a replica does not list the open
+        writes of the primary. When innodb_trx can not be read (no PROCESS
+        privilege) the head is read without it from then on and
+        ``writes_tracked`` is False.
+        """
+        kwargs = {'changes_table': self.changes_table_name, 'now': self.db_handler.dialect.epoch_now}
+        if self._writes_tracked:
+            try:
+                version, db_now, oldest_write = self.query(
+                    base_query=self.define_queries(key='GET_CHANGES_HEAD'),
+                    kwargs=kwargs,
+                    primary=True
+                )[0]
+                return version, db_now, oldest_write, True
+            except MyslApiException:
+                # No PROCESS privilege, raises again below when the log itself can not be read
+                pass
+        version, db_now = self.query(
+            base_query=self.define_queries(key='GET_CHANGES_HEAD_WITHOUT_WRITES'),
+            kwargs=kwargs,
+            primary=True
+        )[0]
+        self._writes_tracked = False
+        return version, db_now, None, False
+
+    def post_test_cases_bulk(self):
+        try:
+            items = self._parse_bulk_body(request.mimetype, request.get_data(as_text=True))
+        except ValueError as e:
+            return self.format_response({'message': str(e)}, status_code=StatusCode.BAD_REQUEST)
+        if len(items) > self.MAX_BULK_SIZE:
+            return self.format_response(
+                {'message': f"At most {self.MAX_BULK_SIZE} test cases can be created at once"},
+                status_code=StatusCode.BAD_REQUEST
+            )
+        rows, indexes, errors = self._split_bulk_items(items)
+        if not rows:
+            return self.format_response({'created': [], 'errors': errors}, status_code=StatusCode.BAD_REQUEST)
+        try:
+            report = self.bulk_insert(
+                table_name=self.TABLE_NAME,
+                data=rows,
+                chunk_size=self.BULK_CHUNK_SIZE
+            )
+        except MyslApiException as e:
+            if self.db_handler.violates_constraint(e):
+                try:
+                    existing = self._lookup_many('name', [row['name'] for row in rows])
+                except MyslApiException:
+                    existing = {}
+                return self.format_response(
+                    self._bulk_conflicts(rows, indexes, errors, existing),
+                    status_code=StatusCode.CONFLICT
+                )
+            return self.format_response(
+                {'message': 'Unable to create the test cases, nothing was added', 'errors': errors},
+                status_code=StatusCode.NOT_FOUND
+            )
+        self.test_case_cache.invalidate(*[('name', row['name']) for row in rows])
+        self._table_changed()
+        created = [
+            {'index': index, 'name': row['name'], 'id': row_id}
+            for index, row, row_id in zip(indexes, rows, report['ids'])
+        ]
+        return self.format_response({'created': created, 'errors': errors}, status_code=StatusCode.CREATED)
+
+    def _lookup_many(self, column, values):
+        """
+        Resolve ``values`` of ``column`` with ``IN (...)`` queries of at most
+        BATCH_CHUNK_SIZE values each, keyed by the requested identifier.
+        """
+        matched = []
+        unique_values = list(dict.fromkeys(values))
+        base_query = self.define_queries(key='GET_TESTCASES_IN')
+        for offset in range(0, len(unique_values), self.BATCH_CHUNK_SIZE):
+            chunk = unique_values[offset:offset + self.BATCH_CHUNK_SIZE]
+            rows = self.query(
+                base_query=base_query,
+                kwargs={'table_name': self.TABLE_NAME, 'column': column, 'placeholders': self.placeholders(len(chunk))},
+                params=chunk
+            )
+            matched.extend(rows)
+        return self._found_map(column, unique_values, matched)
+
+    def get_pool_stats(self):
+        return self.format_response(self.pool_stats(), status_code=StatusCode.OK)
+
+    def get_replica_stats(self):
+        return self.format_response(self.replica_stats(), status_code=StatusCode.OK)
+
+    def get_group_commit_stats(self):
+        stats = self.write_queue.stats() if self.write_queue is not None else {'enabled': False}
+        return self.format_response(stats, status_code=StatusCode.OK)
+
+    def get_statement_stats(self):
+        return self.format_response(self.db_handler.statement_stats(), status_code=StatusCode.OK)
+
+    def get_cache_stats(self):
+        return self.format_response(self.test_case_cache.stats(), status_code=StatusCode.OK)
+
+    def get_compression_stats(self):
+        stats = self.compressor.stats() if self.compressor is not None else {'enabled': False}
+        return self.format_response(stats, status_code=StatusCode.OK)
+
+    def get_slow_queries(self):
+        if request.method == "DELETE":
+            self.db_handler.slow_queries.clear()
+        return self.format_response(self.db_handler.slow_query_stats(), status_code=StatusCode.OK)
+
+    def get_snapshot_stats(self):
+        stats = self.snapshot.stats() if self.snapshot is not None else {'enabled': False}
+        return self.format_response(stats, status_code=StatusCode.OK)
 
 
 if __name__ == "__main__":
+    # Only needed when running the module directly, kept out of the
+    # import path of wsgi/gunicorn workers
+    from dotenv import load_dotenv
     debug = False
     env = os.getenv("ENV", 'remote')
     env_file = f".env.{env}"
@@ -0,0 +1,154 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPoolException
+from input_data_test_cases.mysql_api.db_handler import SQLDBHandlerException
+
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_MAX_LATENCY = 0.005
+
+
+class GroupCommitException(Exception):
+    pass
+
+
+class GroupCommitQueue():
+    """
+    Write-behind queue coalescing concurrent single row inserts into one
+    multi-row INSERT and one commit.
+
+    ``submit`` blocks its caller until the batch holding its row has been
+    committed and returns the row id. A background thread flushes a batch
+    once it holds ``max_batch_size`` rows or ``max_latency`` seconds after
+    its first row arrived. When a batch breaks a constraint (e.g. one row
+    takes a name already stored) its rows are retried one by one, so only
+    the offending callers get an error; any other failure (database
+    unreachable, pool exhausted, ...) fails the whole batch at once.
+
+    Coalescing needs concurrent callers in the same process, i.e. a
+    threaded server (gunicorn ``--threads``).
+    """
+
+    def __init__(self, db_handler, table_name, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency=DEFAULT_MAX_LATENCY, clock=time.monotonic):
+        if max_batch_size < 1 or max_latency < 0:
+            raise GroupCommitException(
+                f"Invalid group commit bounds max_batch_size={max_batch_size} max_latency={max_latency}")
+        self.db_handler = db_handler
+        self.table_name = table_name
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._thread = None
+        self._closed = False
+        self._counters = {
+            'submitted': 0,
+            'batches': 0,
+            'rows': 0,
+            'fallbacks': 0,
+            'failed_rows': 0,
+        }
+        self._last_batch = {
+            'size': None,
+            'seconds': None,
+        }
+
+    def submit(self, row, timeout=None):
+        """
+        Queue ``row`` (column -> value) and wait until it is committed.
+        Returns the generated id.
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise GroupCommitException("Write queue is closed")
+            if self._thread is None:
+                # Started on first use so forked workers each get their own
+                self._thread = threading.Thread(target=self._run, name=f"group-commit-{self.table_name}", daemon=True)
+                self._thread.start()
+            self._pending.append((row, future))
+            self._counters['submitted'] += 1
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._cond.notify()
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError as e:
+            raise GroupCommitException(f"Insert not committed after {timeout}s") from e
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = self.clock() + self.max_latency
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch_size))]
+            self._flush(batch)
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            report = self.db_handler.insert_many(
+                table_name=self.table_name,
+                data=[row for row, _ in batch],
+                chunk_size=self.max_batch_size,
+                single_transaction=True
+            )
+        except (SQLDBHandlerException, ConnectionPoolException) as e:
+            if len(batch) > 1 and self.db_handler.violates_constraint(e):
+                with self._cond:
+                    self._counters['fallbacks'] += 1
+                for entry in batch:
+                    self._flush([entry])
+                return
+            # Retrying row by row would only fail slower
+            self._fail(batch, e.__cause__ or e)
+            return
+        except Exception as e:  # callers must never wait on a future nobody completes
+            self._fail(batch, e)
+            return
+        with self._cond:
+            self._counters['batches'] += 1
+            self._counters['rows'] += len(batch)
+            self._last_batch.update(size=len(batch), seconds=round(time.perf_counter() - start, 6))
+        for (_, future), row_id in zip(batch, report['ids']):
+            future.set_result(row_id)
+
+    def _fail(self, batch, error):
+        with self._cond:
+            self._counters['failed_rows'] += len(batch)
+        for _, future in batch:
+            future.set_exception(GroupCommitException(f"Unable to insert rows: {error}"))
+
+    def close(self, timeout=None):
+        """
+        Stop accepting rows, flush the queued ones and stop the thread.
+        """
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            batches = self._counters['batches']
+            return {
+                **self._counters,
+                'pending': len(self._pending),
+                'avg_batch_size': round(self._counters['rows'] / batches, 2) if batches else None,
+                'max_batch_size': self.max_batch_size,
+                'max_latency': self.max_latency,
+                'last_batch_size': self._last_batch['size'],
+                'last_batch_seconds': self._last_batch['seconds'],
+            }
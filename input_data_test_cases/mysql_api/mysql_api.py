@@ -1,24 +1,115 @@
-
+import math
+import time
+from flask import Flask, g, has_request_context, request
 from flask_mysqldb import MySQL
 import MySQLdb.cursors as mysql_c
 from abc import abstractmethod
 from input_data_test_cases.base_api import BaseApi
-from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery, SQLDBHandler, SQLDBHandlerException
+from input_data_test_cases.mysql_api.db_handler import (
+    DEFAULT_FETCH_SIZE,
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandler,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.config import POOL_CONFIG_KEYS
+from input_data_test_cases.mysql_api.sqlite_engine import MEMORY_PATH, SQLiteEngine
+from input_data_test_cases.mysql_api.replicas import DEFAULT_RETRY_SECONDS, ReplicaRouter
 
 
 class MyslApiException(Exception):
     pass
 
 class MysqlApi(BaseApi):
+    POOL_CONFIG_KEYS = POOL_CONFIG_KEYS
+    SLOW_QUERY_CONFIG_KEYS = {
+        'MYSQL_SLOW_QUERY_SECONDS': 'threshold_seconds',
+        'MYSQL_SLOW_QUERY_LOG_SIZE': 'max_entries',
+        'MYSQL_SLOW_QUERY_LOG_PATH': 'path',
+        'MYSQL_SLOW_QUERY_EXPLAIN': 'explain',
+    }
+    READ_YOUR_WRITES_COOKIE = "primary_reads_until"
 
     def __init__(self, config):
         super().__init__(config)
-        self.db_handler = SQLDBHandler(engine=self.client)
+        self.db_handler = SQLDBHandler(
+            engine=self.client,
+            pool_config=self.pool_config(),
+            slow_query_config=self.slow_query_config(),
+            fetch_size=self.fetch_size()
+        )
+        self.replica_router = self.setup_replicas()
+        self.app.after_request(self._set_read_your_writes_cookie)
 
     def setup_client(self):
+        # DB_ENGINE=sqlite serves the same API from an embedded database
+        if self.config.get('DB_ENGINE', 'mysql') == 'sqlite':
+            return SQLiteEngine(path=self.config.get('SQLITE_PATH') or MEMORY_PATH)
         self.app.config = {**self.app.config, **self.config}
         return MySQL(self.app)
 
+    def setup_replicas(self):
+        """
+        One SQLDBHandler per MYSQL_REPLICAS entry (``MYSQL_HOST``/``MYSQL_PORT``
+        overrides of the primary settings), each with its own pool.
+        flask_mysqldb reads the host from the app config, so every replica
+        engine is bound to its own bare Flask app.
+        """
+        replicas = {}
+        if self.config.get('DB_ENGINE', 'mysql') == 'mysql':
+            for index, replica in enumerate(self.config.get('MYSQL_REPLICAS') or []):
+                name = f"{replica['MYSQL_HOST']}:{replica.get('MYSQL_PORT', self.config.get('MYSQL_PORT'))}"
+                replica_app = Flask(f"{self.app.import_name}_replica_{index}")
+                replica_app.config.update({**self.config, **replica})
+                replicas[name] = SQLDBHandler(
+                    engine=MySQL(replica_app),
+                    pool_config=self.pool_config(),
+                    slow_query_config=self.slow_query_config(),
+                    fetch_size=self.fetch_size()
+                )
+        return ReplicaRouter(
+            primary=self.db_handler,
+            replicas=replicas,
+            strategy=self.config.get('MYSQL_REPLICA_STRATEGY') or 'round_robin',
+            retry_seconds=self.config.get('MYSQL_REPLICA_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+        )
+
+    def _record_write(self):
+        if has_request_context():
+            g.wrote_to_primary = True
+
+    def _reads_from_primary(self):
+        """
+        Whether reads must see this client's own writes: the request already
+        wrote, or a recent response carried the read-your-writes cookie.
+        """
+        if not has_request_context():
+            return False
+        if g.get('wrote_to_primary', False):
+            return True
+        window = self.config.get('MYSQL_READ_YOUR_WRITES_SECONDS') or 0
+        if not window:
+            return False
+        try:
+            until = float(request.cookies.get(self.READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            return False
+        now = time.time()
+        # A value further out than the window was not set by us
+        return now < until <= now + window
+
+    def _set_read_your_writes_cookie(self, response):
+        window = self.config.get('MYSQL_READ_YOUR_WRITES_SECONDS') or 0
+        if window and g.get('wrote_to_primary', False):
+            response.set_cookie(
+                self.READ_YOUR_WRITES_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=math.ceil(window),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
     def connect_data_base(self, command, extra=None):
         cursor = self.client.connection.cursor(mysql_c.DictCursor)
         if extra:
@@ -30,19 +121,60 @@ class MysqlApi(BaseApi):
             raise MyslApiException("Unable to execute command")
         return data
 
+    def pool_config(self):
+        return {
+            arg: self.config[key]
+            for key, arg in self.POOL_CONFIG_KEYS.items()
+            if self.config.get(key) is not None
+        }
+
+    def slow_query_config(self):
+        # An explicit None threshold turns the slow query log off
+        return {
+            arg: self.config[key]
+            for key, arg in self.SLOW_QUERY_CONFIG_KEYS.items()
+            if key in self.config and (self.config[key] is not None or key == 'MYSQL_SLOW_QUERY_SECONDS')
+        }
+
+    def fetch_size(self):
+        # Rows pulled per round trip by streamed queries
+        return self.config.get('MYSQL_FETCH_SIZE') or DEFAULT_FETCH_SIZE
+
+    def placeholders(self, count):
+        return ",".join([self.db_handler.param_symbol] * count)
+
+    def pool_stats(self):
+        return self.db_handler.pool_stats()
+
+    def replica_stats(self):
+        return self.replica_router.stats()
+
+    def is_ready(self):
+        return self.db_handler.readiness()
+
     @abstractmethod
     def define_queries(self, key):
         raise MyslApiException("Method not implemented yet")
 
-    def query(self, base_query, kwargs, params=()):
+    def query(self, base_query, kwargs, params=(), stream=False, primary=None):
+        # stream=True returns a row iterator instead of a list, see stream_query.
+        # primary pins (True) or frees (False) a read from the primary, by
+        # default it follows the read-your-writes state of the request
+        if primary is None:
+            primary = self._reads_from_primary()
+        if stream:
+            return self.stream_query(base_query=base_query, kwargs=kwargs, params=params)
         response = None
         try:
             if isinstance(base_query, ConsultTableQuery):
-                response = self.db_handler.consult_table(
-                    base_query=base_query,
-                    kwargs=kwargs,
-                    params=params
-                    )
+                response = self.replica_router.read(
+                    lambda handler: handler.consult_table(
+                        base_query=base_query,
+                        kwargs=kwargs,
+                        params=params
+                    ),
+                    primary=primary
+                )
                 if response is None:
                     raise MyslApiException("Unable to execute command")
             elif isinstance(base_query, ModifyTableQuery):
@@ -53,8 +185,45 @@ class MysqlApi(BaseApi):
                 )
                 if response <= 0:
                     raise MyslApiException("Unable to create/delete")
+                self._record_write()
             else:
                 raise MyslApiException("Unknown query type")
             return response
         except SQLDBHandlerException as e:
             raise MyslApiException("Unknown query type") from e
+
+    def bulk_insert(self, table_name, data, chunk_size, single_transaction=True):
+        try:
+            report = self.db_handler.insert_many(
+                table_name=table_name,
+                data=data,
+                chunk_size=chunk_size,
+                single_transaction=single_transaction
+            )
+            self._record_write()
+            return report
+        except SQLDBHandlerException as e:
+            raise MyslApiException("Unable to insert rows") from e
+
+    def stream_query(self, base_query, kwargs, params=(), fetch_size=None):
+        """
+        Run a consult query on a server-side cursor and return an iterator
+        over its rows, read ``fetch_size`` (default MYSQL_FETCH_SIZE) at a
+        time. The iterator holds a pooled connection until it is exhausted
+        or closed; a response streaming it must close it when the response
+        is closed, which also happens when the client disconnects.
+        """
+        if not isinstance(base_query, ConsultTableQuery):
+            raise MyslApiException("Only consult queries can be streamed")
+        try:
+            return self.replica_router.read(
+                lambda handler: handler.iter_consult_table(
+                    base_query=base_query,
+                    kwargs=kwargs,
+                    params=params,
+                    fetch_size=fetch_size
+                ),
+                primary=self._reads_from_primary()
+            )
+        except SQLDBHandlerException as e:
+            raise MyslApiException("Unable to execute command") from e
@@ -0,0 +1,120 @@
+import time
+import threading
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPoolException
+from input_data_test_cases.mysql_api.db_handler import SQLDBHandlerException
+
+STRATEGIES = ('round_robin', 'least_loaded')
+DEFAULT_RETRY_SECONDS = 30
+
+
+class ReplicaRouterException(Exception):
+    pass
+
+
+class ReplicaRouter():
+    """
+    Picks the SQLDBHandler a read runs on: one of the healthy read
+    replicas, by round-robin or by fewest connections in use, falling
+    back to the next replica and finally to the primary when a replica
+    can not be reached. Writes always go to the primary.
+
+    A replica whose read failed on a connection error is skipped for
+    ``retry_seconds``; after that the next read probes it again. Replicas
+    whose handler is in its reconnect backoff are skipped as well.
+    """
+
+    def __init__(self, primary, replicas=None, strategy='round_robin', retry_seconds=DEFAULT_RETRY_SECONDS,
+                 clock=time.monotonic):
+        if strategy not in STRATEGIES:
+            raise ReplicaRouterException(f"Unknown replica strategy {strategy}, expected one of {STRATEGIES}")
+        self.primary = primary
+        self.replicas = dict(replicas or {})
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = {name: 0.0 for name in self.replicas}
+        self._reads = {name: 0 for name in self.replicas}
+        self._failures = {name: 0 for name in self.replicas}
+        self._counters = {
+            'primary_reads': 0,
+            'pinned_reads': 0,
+            'failovers': 0,
+        }
+
+    def _healthy(self):
+        now = self.clock()
+        return [
+            name for name, handler in self.replicas.items()
+            # .get: a replica added to ``replicas`` later is not tracked yet
+            if self._down_until.get(name, 0) <= now and not handler.connect_state()['retry_in_seconds']
+        ]
+
+    def readers(self):
+        """
+        ``(name, handler)`` pairs to try for a read, in order, ending with
+        the primary (named None).
+        """
+        with self._lock:
+            healthy = self._healthy()
+            if self.strategy == 'least_loaded':
+                healthy.sort(key=lambda name: self.replicas[name].pool_stats()['in_use'])
+            elif healthy:
+                start = self._next % len(healthy)
+                self._next += 1
+                healthy = healthy[start:] + healthy[:start]
+        return [(name, self.replicas[name]) for name in healthy] + [(None, self.primary)]
+
+    def read(self, run, primary=False):
+        """
+        Return ``run(handler)`` on the first reader that can serve it. With
+        ``primary`` the read is pinned to the primary, e.g. to see the
+        session's own writes.
+        """
+        if primary or not self.replicas:
+            with self._lock:
+                self._counters['pinned_reads' if primary else 'primary_reads'] += 1
+            return run(self.primary)
+        for name, handler in self.readers():
+            if name is None:
+                with self._lock:
+                    self._counters['primary_reads'] += 1
+                return run(handler)
+            try:
+                result = run(handler)
+            except SQLDBHandlerException as e:
+                if not isinstance(e.__cause__, (handler.dialect.OperationalError, ConnectionPoolException)):
+                    raise
+                self.mark_down(name)
+                continue
+            with self._lock:
+                self._reads[name] = self._reads.get(name, 0) + 1
+            return result
+
+    def mark_down(self, name):
+        with self._lock:
+            self._down_until[name] = self.clock() + self.retry_seconds
+            self._failures[name] = self._failures.get(name, 0) + 1
+            self._counters['failovers'] += 1
+
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            return {
+                **self._counters,
+                'strategy': self.strategy,
+                'replicas': {
+                    name: {
+                        'reads': self._reads.get(name, 0),
+                        'failures': self._failures.get(name, 0),
+                        'down_for_seconds': round(max(self._down_until.get(name, 0) - now, 0), 3),
+                        'pool': handler.pool_stats(),
+                    }
+                    for name, handler in self.replicas.items()
+                },
+            }
+
+    def close(self):
+        for handler in self.replicas.values():
+            handler.close()
@@ -0,0 +1,91 @@
+import json
+import time
+import threading
+from collections import deque
+from input_data_test_cases.cache import TTLCache
+
+EXPLAINABLE_STATEMENTS = ('select', 'update', 'delete')
+
+
+class SlowQueryLog():
+    """
+    Bounded ring buffer of statements that ran for longer than
+    ``threshold_seconds``, optionally mirrored to a JSONL file.
+
+    Entries carry the statement template, the type/length shape of the
+    bound parameters (never their values), duration, row count and the
+    ``EXPLAIN`` plan. Plans are kept per statement for ``explain_ttl``
+    seconds so a statement that is slow on every call is only explained
+    once in a while.
+    """
+
+    def __init__(self, threshold_seconds=0.2, max_entries=100, path=None, explain=True, explain_ttl=300,
+                 clock=time.time):
+        self.threshold_seconds = threshold_seconds
+        self.path = path
+        self.explain = explain
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=max_entries)
+        self._plans = TTLCache(max_size=max_entries, ttl=explain_ttl)
+        self._counters = {
+            'recorded': 0,
+            'explained': 0,
+            'explain_errors': 0,
+        }
+
+    def is_slow(self, seconds):
+        return self.threshold_seconds is not None and seconds >= self.threshold_seconds
+
+    def wants_plan(self, statement):
+        return self.explain and statement.lstrip().lower().startswith(EXPLAINABLE_STATEMENTS)
+
+    def cached_plan(self, statement):
+        return self._plans.get(statement)
+
+    def store_plan(self, statement, plan, failed=False):
+        with self._lock:
+            self._counters['explain_errors' if failed else 'explained'] += 1
+        if not failed:
+            self._plans.set(statement, plan)
+
+    @staticmethod
+    def param_shape(value):
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}({len(value)})"
+        return type(value).__name__
+
+    def record(self, query, statement, params, seconds, rows, plan=None):
+        entry = {
+            'at': self.clock(),
+            'query': query,
+            'statement': statement,
+            'param_shapes': [self.param_shape(p) for p in params or ()],
+            'seconds': round(seconds, 6),
+            'rows': rows,
+            'explain': plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._counters['recorded'] += 1
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as log_file:
+                    log_file.write(json.dumps(entry, default=str) + "\n")
+        return entry
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                'threshold_seconds': self.threshold_seconds,
+                'size': len(self._entries),
+                'max_entries': self._entries.maxlen,
+            }
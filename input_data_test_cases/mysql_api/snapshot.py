@@ -0,0 +1,369 @@
+import sys
+import time
+import threading
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery
+
+DEFAULT_POLL_SECONDS = 5
+DEFAULT_FETCH_CHUNK = 1000
+FULL_RELOAD_RATIO = 0.5
+# A logged change this recent may belong to a write innodb_trx did not list
+# yet, the log position only moves past older ones
+CHANGES_SETTLE_SECONDS = 1
+
+
+class TableSnapshotException(Exception):
+    pass
+
+
+class TableSnapshot():
+    """
+    In-process copy of a ``id, name, params`` table indexed by id and by
+    name, kept current by a background thread.
+
+    Every ``poll_seconds`` the thread reads the table version: with a
+    ``changes_table`` the head of the change log kept by the write
+    triggers (latest version and start of the oldest open write, an index
+    lookup), otherwise the row count and XOR of the per-row CRC32, which
+    the database computes over the whole table.
+
+    When the version moved, the ids to fetch again come from the change
+    log entries past the last position known to be fully applied. Without
+    a change log, or before such a position is known, the per-row
+    checksums are compared with the ones held in memory instead. Rows
+    that are gone are dropped. The first load, or a change touching most
+    of the table, streams the whole table into new indexes that replace
+    the old ones at once.
+
+    ``encode_params`` turns a stored ``params`` value into whatever the
+    caller serves (e.g. an encoded body and its ETag), so a hit costs two
+    dict lookups.
+    """
+
+    def __init__(self, db_handler, table_name, encode_params, poll_seconds=DEFAULT_POLL_SECONDS,
+                 fetch_chunk=DEFAULT_FETCH_CHUNK, clock=time.time, changes_table=None):
+        if poll_seconds <= 0:
+            raise TableSnapshotException(f"Invalid poll interval {poll_seconds}")
+        self.db_handler = db_handler
+        self.table_name = table_name
+        self.encode_params = encode_params
+        self.poll_seconds = poll_seconds
+        self.fetch_chunk = fetch_chunk
+        self.clock = clock
+        self.changes_table = changes_table
+        # id -> (name, checksum, encoded params); name -> id
+        self._by_id = {}
+        self._ids_by_name = {}
+        self._bytes = 0
+        self._version = None
+        self._polled_version = None
+        # Change log version up to which every change is in the snapshot
+        self._log_version = None
+        self._discards = 0
+        self._discarded_ids = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._counters = {
+            'polls': 0,
+            'unchanged_polls': 0,
+            'full_reloads': 0,
+            'incremental_reloads': 0,
+            'changes_read': 0,
+            'rows_reloaded': 0,
+            'rows_deleted': 0,
+            'hits': 0,
+            'misses': 0,
+            'errors': 0,
+        }
+        self._last = {
+            'reload_seconds': None,
+            'reload_at': None,
+            'error': None,
+        }
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self, column, value):
+        """
+        Encoded params of the row where ``column = value`` (``id`` or
+        ``name``), or None when it is not in the snapshot.
+        """
+        if column == 'id':
+            try:
+                row_id = int(value)
+            except (TypeError, ValueError):
+                row_id = None
+        else:
+            row_id = self._ids_by_name.get(value)
+        entry = self._by_id.get(row_id) if row_id is not None else None
+        with self._lock:
+            self._counters['hits' if entry is not None else 'misses'] += 1
+        return entry[2] if entry is not None else None
+
+    def discard(self, column, value):
+        """
+        Drop the row where ``column = value`` after a local write, so reads
+        miss until the next reload brings the new version in.
+        """
+        if column == 'id':
+            try:
+                row_id = int(value)
+            except (TypeError, ValueError):
+                return
+        else:
+            row_id = self._ids_by_name.get(value)
+        with self._lock:
+            self._remove_locked(row_id)
+            if row_id is not None:
+                self._discarded_ids.add(row_id)
+            # Forces the next refresh to diff even if the version is the same
+            self._version = None
+            self._discards += 1
+        self.wake()
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=f"snapshot-{self.table_name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                self.refresh()
+            except Exception as e:  # the poller must outlive any failed refresh
+                with self._lock:
+                    self._counters['errors'] += 1
+                    self._last['error'] = str(e)
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def refresh(self):
+        """
+        Bring the snapshot up to date. Returns False when the table version
+        did not move since the last refresh.
+        """
+        with self._refresh_lock:
+            start = time.perf_counter()
+            version, committed_before = self._table_version()
+            # The open writes of a change log head come from innodb_trx, a
+            # cache refreshed every 0.1s: a write it missed can commit below
+            # the latest version without moving the head, so a head is only
+            # recorded once a second poll returned it as well
+            settled = self.changes_table is None or version == self._polled_version
+            self._polled_version = version
+            with self._lock:
+                self._counters['polls'] += 1
+                if version == self._version:
+                    self._counters['unchanged_polls'] += 1
+                    return False
+                discards = self._discards
+                discarded_ids, self._discarded_ids = self._discarded_ids, set()
+            log_version = None
+            if not self._loaded:
+                self._full_reload()
+            elif self._log_version is None:
+                self._checksum_reload()
+            else:
+                log_version = self._log_reload(committed_before, discarded_ids)
+            with self._lock:
+                # A row discarded meanwhile may have been diffed before it
+                # was dropped, keep the version unset so it is fetched again
+                if discards == self._discards and settled:
+                    self._version = version
+                # A settled head without open writes has every change up to
+                # it committed, and so read by the reload that followed
+                if self.changes_table is not None and settled and version is not None and version[1] is None:
+                    self._log_version = version[0]
+                elif log_version is not None:
+                    self._log_version = log_version
+                self._last.update(
+                    reload_seconds=round(time.perf_counter() - start, 6),
+                    reload_at=self.clock(),
+                    error=None
+                )
+            return True
+
+    def _table_version(self):
+        """
+        The table version and, with a change log, the time before which
+        every logged change is known to be committed.
+        """
+        if self.changes_table is not None:
+            rows = self.db_handler.consult_table(
+                base_query=ConsultTableQuery.CHANGE_LOG_HEAD,
+                kwargs={'changes_table': self.changes_table, 'now': self.db_handler.dialect.epoch_now}
+            )
+            if not rows:
+                return None, None
+            # db_now changes on every poll and is not part of the version
+            version, db_now, oldest_write = self._values(rows[0])
+            committed_before = float(db_now) - CHANGES_SETTLE_SECONDS
+            if oldest_write is not None:
+                committed_before = min(committed_before, float(oldest_write))
+            return (version, oldest_write), committed_before
+        rows = self.db_handler.consult_table(
+            base_query=ConsultTableQuery.TABLE_VERSION,
+            kwargs={'table_name': self.table_name}
+        )
+        return (tuple(self._values(rows[0])) if rows else None), None
+
+    def _full_reload(self):
+        rows = self.db_handler.iter_consult_table(
+            base_query=ConsultTableQuery.SNAPSHOT_ROWS,
+            kwargs={'table_name': self.table_name},
+            fetch_size=self.fetch_chunk
+        )
+        by_id, ids_by_name, size = {}, {}, 0
+        for row in rows:
+            row_id, name, params, checksum = self._values(row)
+            by_id[row_id] = (name, checksum, self.encode_params(params))
+            ids_by_name[name] = row_id
+            size += self._entry_size(row_id, by_id[row_id])
+        with self._lock:
+            self._by_id, self._ids_by_name, self._bytes = by_id, ids_by_name, size
+            self._loaded = True
+            self._counters['full_reloads'] += 1
+            self._counters['rows_reloaded'] += len(by_id)
+
+    def _log_reload(self, committed_before, discarded_ids):
+        """
+        Fetch again the rows logged past the applied log position, plus the
+        ones discarded since the last reload. Returns the new position: the
+        last entry before the first one that may still have an open write
+        logged below it.
+        """
+        entries = self.db_handler.iter_consult_table(
+            base_query=ConsultTableQuery.CHANGED_IDS_SINCE,
+            kwargs={'changes_table': self.changes_table},
+            params=(self._log_version,),
+            fetch_size=self.fetch_chunk
+        )
+        changed, log_version, read, moving = set(discarded_ids), self._log_version, 0, True
+        for version, row_id, changed_at in map(self._values, entries):
+            read += 1
+            changed.add(row_id)
+            moving = moving and changed_at < committed_before
+            if moving:
+                log_version = version
+        with self._lock:
+            self._counters['changes_read'] += read
+        if len(changed) > FULL_RELOAD_RATIO * len(self._by_id):
+            self._full_reload()
+        else:
+            self._reload_ids(sorted(changed))
+        return log_version
+
+    def _checksum_reload(self):
+        checksums = {
+            row_id: checksum
+            for row_id, checksum in map(self._values, self.db_handler.consult_table(
+                base_query=ConsultTableQuery.ROW_CHECKSUMS,
+                kwargs={'table_name': self.table_name}
+            ))
+        }
+        changed = [
+            row_id for row_id, checksum in checksums.items()
+            if self._by_id.get(row_id, (None, None))[1] != checksum
+        ]
+        if len(changed) > FULL_RELOAD_RATIO * len(checksums):
+            return self._full_reload()
+        deleted = [row_id for row_id in self._by_id if row_id not in checksums]
+        with self._lock:
+            for row_id in deleted:
+                self._remove_locked(row_id)
+            self._counters['rows_deleted'] += len(deleted)
+        self._reload_ids(changed)
+
+    def _reload_ids(self, changed):
+        """
+        Replace the rows with the given ids by their current version,
+        dropping the ones no longer in the table.
+        """
+        for offset in range(0, len(changed), self.fetch_chunk):
+            chunk = changed[offset:offset + self.fetch_chunk]
+            rows = self.db_handler.consult_table(
+                base_query=ConsultTableQuery.SNAPSHOT_ROWS_WHERE_ID_IN,
+                kwargs={
+                    'table_name': self.table_name,
+                    'placeholders': ",".join([self.db_handler.param_symbol] * len(chunk)),
+                },
+                params=chunk
+            )
+            entries = []
+            for row in rows:
+                row_id, name, params, checksum = self._values(row)
+                entries.append((row_id, (name, checksum, self.encode_params(params))))
+            found = {row_id for row_id, _ in entries}
+            with self._lock:
+                deleted = [row_id for row_id in chunk if row_id not in found and row_id in self._by_id]
+                for row_id in deleted:
+                    self._remove_locked(row_id)
+                self._counters['rows_deleted'] += len(deleted)
+                for row_id, entry in entries:
+                    self._remove_locked(row_id)
+                    # A renamed row may take the name a deleted/renamed row had
+                    self._by_id[row_id] = entry
+                    self._ids_by_name[entry[0]] = row_id
+                    self._bytes += self._entry_size(row_id, entry)
+                self._counters['rows_reloaded'] += len(entries)
+        with self._lock:
+            self._counters['incremental_reloads'] += 1
+
+    def _remove_locked(self, row_id):
+        entry = self._by_id.pop(row_id, None)
+        if entry is None:
+            return
+        if self._ids_by_name.get(entry[0]) == row_id:
+            del self._ids_by_name[entry[0]]
+        self._bytes -= self._entry_size(row_id, entry)
+
+    @staticmethod
+    def _values(row):
+        return tuple(row.values()) if isinstance(row, dict) else row
+
+    @staticmethod
+    def _entry_size(row_id, entry):
+        """
+        Approximate bytes held for one row: the key, the entry tuple and
+        its members (one level into tuples, e.g. a ``(body, etag)`` pair).
+        """
+        name, checksum, encoded = entry
+        size = sys.getsizeof(row_id) + sys.getsizeof(entry) + sys.getsizeof(name) + sys.getsizeof(checksum)
+        size += sys.getsizeof(encoded)
+        if isinstance(encoded, tuple):
+            size += sum(sys.getsizeof(part) for part in encoded)
+        return size
+
+    def stats(self):
+        with self._lock:
+            index_bytes = sys.getsizeof(self._by_id) + sys.getsizeof(self._ids_by_name)
+            return {
+                **self._counters,
+                'loaded': self._loaded,
+                'rows': len(self._by_id),
+                'approx_bytes': self._bytes + index_bytes,
+                'version': list(self._version) if self._version else None,
+                'poll_seconds': self.poll_seconds,
+                'last_reload_seconds': self._last['reload_seconds'],
+                'last_reload_at': self._last['reload_at'],
+                'last_error': self._last['error'],
+            }
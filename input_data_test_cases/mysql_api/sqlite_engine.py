@@ -0,0 +1,101 @@
+import zlib
+import uuid
+import hashlib
+import sqlite3
+import threading
+
+MEMORY_PATH = ":memory:"
+DEFAULT_BUSY_TIMEOUT = 5000
+
+
+class SQLiteEngineException(Exception):
+    pass
+
+
+def _md5(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return hashlib.md5(value).hexdigest()
+
+
+def _crc32(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return zlib.crc32(value)
+
+
+class _BitXor():
+    """
+    MySQL's ``bit_xor`` aggregate, NULL values are skipped.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+class SQLiteEngine():
+    """
+    Connection factory for an embedded SQLite database, the counterpart of
+    ``flask_mysqldb.MySQL`` for ``SQLDBHandler``.
+
+    File databases are switched to WAL so readers never block the single
+    writer; ``:memory:`` opens a named shared-cache database kept alive by
+    one connection held by the engine, so every pooled connection sees the
+    same tables. Each connection gets the SQL functions the MySQL queries
+    rely on (``md5``, ``crc32`` and the ``bit_xor`` aggregate).
+    """
+
+    def __init__(self, path=MEMORY_PATH, busy_timeout=DEFAULT_BUSY_TIMEOUT, wal=True):
+        if sqlite3.sqlite_version_info < (3, 38, 0):
+            raise SQLiteEngineException(
+                f"SQLite {sqlite3.sqlite_version} has no built in JSON support, 3.38 or newer is required")
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.in_memory = path == MEMORY_PATH
+        self.wal = wal and not self.in_memory
+        self._lock = threading.Lock()
+        self._keeper = None
+        if self.in_memory:
+            self.database = f"file:input_data_test_cases_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self.database = path
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            uri=self.in_memory,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=False
+        )
+        conn.create_function("md5", 1, _md5, deterministic=True)
+        conn.create_function("crc32", 1, _crc32, deterministic=True)
+        conn.create_aggregate("bit_xor", 1, _BitXor)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.wal:
+            conn.execute("PRAGMA journal_mode = WAL")
+            # Durable at checkpoints only, the usual trade-off under WAL
+            conn.execute("PRAGMA synchronous = NORMAL")
+        if self.in_memory:
+            with self._lock:
+                if self._keeper is None:
+                    # The shared-cache database is dropped with its last connection
+                    self._keeper = sqlite3.connect(self.database, uri=True, check_same_thread=False)
+        return conn
+
+    def close(self):
+        with self._lock:
+            if self._keeper is not None:
+                self._keeper.close()
+                self._keeper = None
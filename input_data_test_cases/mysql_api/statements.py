@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+
+
+class StatementRegistryException(Exception):
+    pass
+
+
+class StatementRegistry():
+    """
+    Client-side LRU cache of rendered ``ModifyTableQuery``/``ConsultTableQuery``
+    templates: ``str.format`` runs once per template and kwargs, later
+    executions get the cached SQL text back. Nothing is prepared on the
+    server, the driver still sends the text on every execution.
+
+    Template kwargs only carry identifiers and statement shape (table,
+    columns, placeholder lists); values are always bound by the driver, so
+    the text for a given shape never changes and the cache stays small.
+
+    ``overrides`` maps a template to the text used in its place, for
+    engines that phrase a query differently.
+    """
+
+    def __init__(self, param_symbol, max_size=1024, overrides=None):
+        self.param_symbol = param_symbol
+        self.overrides = dict(overrides or {})
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()
+        self._counters = {
+            'cache_misses': 0,
+            'executions': 0,
+            'evictions': 0,
+        }
+
+    def render(self, base_query, kwargs):
+        key = (base_query, tuple(sorted(kwargs.items())))
+        with self._lock:
+            self._counters['executions'] += 1
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                return statement
+        try:
+            template = self.overrides.get(base_query, base_query)
+            statement = template.format(placeholder=self.param_symbol, **kwargs)
+        except KeyError as e:
+            name = getattr(base_query, 'name', base_query)
+            raise StatementRegistryException(f"Missing template argument {e} for {name}") from e
+        with self._lock:
+            self._counters['cache_misses'] += 1
+            self._statements[key] = statement
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+                self._counters['evictions'] += 1
+        return statement
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                'cached': len(self._statements),
+                'max_size': self.max_size,
+            }
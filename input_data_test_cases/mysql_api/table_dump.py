@@ -0,0 +1,371 @@
+"""
+Export a table to a dump file and load it back.
+
+Two formats, picked from the file extension:
+
+* ``.tcdump``: length-prefixed binary. A magic string, a JSON header
+  (table and columns) prefixed by its length, then every row as one
+  field per column, each a little-endian uint32 length followed by that
+  many UTF-8 bytes (``0xFFFFFFFF`` for NULL). Read back through a memory
+  map, without parsing anything but the header.
+* ``.ndjson.zst`` / ``.ndjson``: the header object on the first line,
+  then one JSON array per row, zstd compressed when the name ends in
+  ``.zst``.
+
+Loading goes through ``LOAD DATA LOCAL INFILE`` when the dialect supports
+it and the connection allows it (``local_infile``), otherwise through
+``SQLDBHandler.insert_many``. Both directions report their rows/s.
+
+Seeding an environment from a dump is much faster than ``init_database``
+from YAML:
+
+    DB_MODE=local python -m input_data_test_cases.mysql_api.table_dump export parameters.tcdump
+    DB_MODE=local python -m input_data_test_cases.mysql_api.table_dump import parameters.tcdump --truncate
+"""
+import io
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import tempfile
+from input_data_test_cases.mysql_api.db_handler import (
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandlerException
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+MAGIC = b"TCDUMP\x00\x01"
+FIELD = struct.Struct("<I")
+NULL_LENGTH = 0xFFFFFFFF
+DEFAULT_COLUMNS = ('id', 'name', 'params')
+DEFAULT_CHUNK_SIZE = 1000
+ZSTD_LEVEL = 3
+FORMATS = {
+    '.tcdump': 'binary',
+    '.ndjson.zst': 'ndjson.zst',
+    '.ndjson': 'ndjson',
+}
+# Characters LOAD DATA reads as field/line separators or escapes
+LOAD_DATA_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+class TableDumpException(Exception):
+    pass
+
+
+def dump_format(path):
+    for extension, name in FORMATS.items():
+        if path.endswith(extension):
+            if name == 'ndjson.zst' and zstandard is None:
+                raise TableDumpException("zstandard is required for .zst dumps")
+            return name
+    raise TableDumpException(f"Unknown dump format for {path}, expected one of {list(FORMATS)}")
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _report(table_name, fmt, rows, size, start, **extra):
+    seconds = time.perf_counter() - start
+    return {
+        'table': table_name,
+        'format': fmt,
+        **extra,
+        'rows': rows,
+        'bytes': size,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds) if seconds else None,
+    }
+
+
+# ------------------------------------------------------------------ export
+def _write_binary(out, header, rows):
+    header = json.dumps(header).encode()
+    out.write(MAGIC + FIELD.pack(len(header)) + header)
+    count = 0
+    for row in rows:
+        fields = []
+        for value in row:
+            if value is None:
+                fields.append(FIELD.pack(NULL_LENGTH))
+            else:
+                data = _text(value).encode()
+                fields.append(FIELD.pack(len(data)))
+                fields.append(data)
+        out.write(b"".join(fields))
+        count += 1
+    return count
+
+
+def _write_ndjson(out, header, rows):
+    out.write(json.dumps(header).encode() + b"\n")
+    count = 0
+    for row in rows:
+        out.write(json.dumps([_text(value) for value in row]).encode() + b"\n")
+        count += 1
+    return count
+
+
+def export_table(db_handler, table_name, path, columns=DEFAULT_COLUMNS, fetch_size=None):
+    """
+    Stream ``columns`` of every row of ``table_name``, in id order, into a
+    dump at ``path``. Returns the export report.
+    """
+    fmt = dump_format(path)
+    header = {'table': table_name, 'columns': list(columns)}
+    start = time.perf_counter()
+    try:
+        rows = db_handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_COLUMNS_ORDER_BY_ID,
+            kwargs={'table_name': table_name, 'columns': ",".join(columns)},
+            fetch_size=fetch_size
+        )
+    except SQLDBHandlerException as e:
+        raise TableDumpException(f"Unable to read {table_name}") from e
+    try:
+        with open(path, 'wb') as raw:
+            if fmt == 'binary':
+                count = _write_binary(raw, header, rows)
+            elif fmt == 'ndjson.zst':
+                with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as out:
+                    count = _write_ndjson(out, header, rows)
+            else:
+                count = _write_ndjson(raw, header, rows)
+    finally:
+        rows.close()
+    return _report(table_name, fmt, count, os.path.getsize(path), start)
+
+
+# ------------------------------------------------------------------ import
+def _read_binary(view):
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise TableDumpException("Not a table dump, bad magic")
+    offset = len(MAGIC)
+    (length,) = FIELD.unpack_from(view, offset)
+    offset += FIELD.size
+    header = json.loads(bytes(view[offset:offset + length]))
+    offset += length
+
+    def rows():
+        position = offset
+        width = len(header['columns'])
+        end = len(view)
+        while position < end:
+            row = []
+            for _ in range(width):
+                (length,) = FIELD.unpack_from(view, position)
+                position += FIELD.size
+                if length == NULL_LENGTH:
+                    row.append(None)
+                else:
+                    row.append(str(view[position:position + length], 'utf-8'))
+                    position += length
+            yield row
+    return header, rows()
+
+
+def _read_ndjson(lines):
+    try:
+        header = json.loads(next(lines, b"null"))
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or 'columns' not in header:
+        raise TableDumpException("Not a table dump, missing header line")
+    return header, (json.loads(line) for line in lines if line.strip())
+
+
+class _DumpReader():
+    """
+    Memory maps a dump and yields ``(header, rows)`` while open.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fmt = dump_format(path)
+        self.size = os.path.getsize(path)
+        self._file = None
+        self._map = None
+        self._view = None
+        self._stream = None
+
+    def __enter__(self):
+        if self.size < len(MAGIC):
+            raise TableDumpException(f"{self.path} is too short to be a table dump")
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.fmt == 'binary':
+                self._view = memoryview(self._map)
+                return _read_binary(self._view)
+            if self.fmt == 'ndjson.zst':
+                self._stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(self._map))
+                return _read_ndjson(iter(self._stream))
+            return _read_ndjson(iter(self._map.readline, b""))
+        except Exception:
+            self.__exit__()
+            raise
+
+    def __exit__(self, *exc):
+        # Everything reading the map has to let go of it before it closes
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._map.close()
+        self._file.close()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_rows(db_handler, table_name, columns, rows, chunk_size):
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        db_handler.insert_many(
+            table_name=table_name,
+            data=[dict(zip(columns, row)) for row in chunk],
+            chunk_size=chunk_size
+        )
+        count += len(chunk)
+    return count
+
+
+def _load_data_local(db_handler, table_name, columns, rows):
+    """
+    Write ``rows`` as the tab separated file LOAD DATA expects and load
+    it in one statement. Returns the row count.
+    """
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', newline='\n') as tsv:
+        count = 0
+        for row in rows:
+            tsv.write("\t".join("\\N" if value is None else value.translate(LOAD_DATA_ESCAPES) for value in row))
+            tsv.write("\n")
+            count += 1
+        tsv.flush()
+        db_handler.modify_table(
+            base_query=ModifyTableQuery.LOAD_DATA_LOCAL_INFILE,
+            kwargs={
+                'path': db_handler.dialect.string_literal(tsv.name),
+                'table_name': table_name,
+                'columns': ",".join(columns),
+            },
+        )
+    return count
+
+
+def import_table(db_handler, path, table_name=None, chunk_size=DEFAULT_CHUNK_SIZE, load_data=True,
+                 truncate=False):
+    """
+    Load the dump at ``path`` into ``table_name`` (default: the table it
+    was exported from), emptied first with ``truncate`` (row by row when
+    the table has a change log, TRUNCATE fires no delete trigger and would
+    leave no tombstones). Rows keep their ids. Returns the import report,
+    whose ``method`` tells whether LOAD DATA or multi-row INSERTs did it;
+    ``load_data_error`` holds why LOAD DATA was refused when it fell back
+    to INSERTs.
+    """
+    if chunk_size < 1:
+        raise TableDumpException(f"Invalid chunk size {chunk_size}")
+    start = time.perf_counter()
+    reader = _DumpReader(path)
+    with reader as (header, _):
+        table_name = table_name or header['table']
+        columns = header['columns']
+    try:
+        if truncate:
+            if db_handler.has_change_log(table_name):
+                empty_query = ModifyTableQuery.DELETE_ALL_ROWS
+            else:
+                empty_query = ModifyTableQuery.TRUNCATE_TABLE
+            db_handler.modify_table(empty_query, kwargs={'table_name': table_name})
+        method = None
+        extra = {}
+        if load_data and db_handler.dialect.load_data_local:
+            with reader as (_, rows):
+                try:
+                    count = _load_data_local(db_handler, table_name, columns, rows)
+                    method = 'load_data'
+                except SQLDBHandlerException as e:
+                    # local_infile off on the server or the client
+                    extra['load_data_error'] = str(e.__cause__ or e)
+        if method is None:
+            with reader as (_, rows):
+                count = _insert_rows(db_handler, table_name, columns, rows, chunk_size)
+            method = 'insert'
+    except SQLDBHandlerException as e:
+        raise TableDumpException(f"Unable to load {path} into {table_name}: {e}") from e
+    return _report(table_name, reader.fmt, count, reader.size, start, method=method, **extra)
+
+
+# --------------------------------------------------------------------- cli
+def main():
+    from input_data_test_cases.mysql_api.config import load_mysql_config
+    from input_data_test_cases.mysql_api.ecommerce_data_test_cases.ecommerce_data_tc import EcommerceDataTC
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Dump a table to a file")
+    export_parser.add_argument('path', help=f"Dump file, one of {list(FORMATS)}")
+    export_parser.add_argument('--table', default=EcommerceDataTC.TABLE_NAME)
+    export_parser.add_argument('--columns', default=",".join(DEFAULT_COLUMNS), help="Comma separated columns")
+    import_parser = commands.add_parser("import", help="Load a dump into its table")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--table', help="Target table, by default the exported one")
+    import_parser.add_argument('--truncate', action='store_true', help="Empty the table first")
+    import_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per INSERT")
+    import_parser.add_argument('--no-load-data', dest='load_data', action='store_false',
+                               help="Always use INSERTs, never LOAD DATA LOCAL INFILE")
+    args = parser.parse_args()
+
+    config = load_mysql_config(os.getenv("DB_MODE", "remote"))
+    if args.command == "import" and args.load_data:
+        # Client side switch for LOAD DATA LOCAL, the server needs local_infile=ON too
+        config['MYSQL_CUSTOM_OPTIONS'] = {**config.get('MYSQL_CUSTOM_OPTIONS', {}), 'local_infile': 1}
+    db_handler = EcommerceDataTC(config=config).db_handler
+    try:
+        db_handler.wait_until_ready(max_seconds=60)
+        if args.command == "export":
+            report = export_table(db_handler, args.table, args.path, columns=args.columns.split(","))
+        else:
+            report = import_table(
+                db_handler,
+                args.path,
+                table_name=args.table,
+                chunk_size=args.chunk_size,
+                load_data=args.load_data,
+                truncate=args.truncate
+            )
+    finally:
+        db_handler.close()
+    if report.get('load_data_error'):
+        print(f"LOAD DATA LOCAL INFILE refused ({report['load_data_error']}), inserted instead", file=sys.stderr)
+    print(json.dumps(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import re
+import json
+import uuid
+import datetime
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class SerializerException(Exception):
+    pass
+
+
+class RawJSON():
+    """
+    Already encoded JSON (bytes or str) to be written into a response as
+    is, e.g. a document read from MySQL or a body kept in a cache.
+    """
+    __slots__ = ('encoded',)
+
+    def __init__(self, encoded):
+        self.encoded = encoded.encode() if isinstance(encoded, str) else bytes(encoded)
+
+    def __repr__(self):
+        return f"RawJSON({self.encoded[:32]!r}...)" if len(self.encoded) > 32 else f"RawJSON({self.encoded!r})"
+
+
+class JSONSerializer():
+    """
+    Compact UTF-8 JSON encoder on the standard library ``json`` module.
+
+    ``RawJSON`` values anywhere in the payload are spliced into the output
+    verbatim: the encoder writes a per call token in their place and the
+    tokens are swapped for the stored bytes once the payload is encoded.
+    """
+    name = "json"
+
+    def dumps(self, obj):
+        fragments = []
+        token = uuid.uuid4().hex
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                fragments.append(value.encoded)
+                return f"{token}{len(fragments) - 1}"
+            return self._default(value)
+
+        encoded = self._dumps(obj, default)
+        if not fragments:
+            return encoded
+        return re.sub(
+            rb'"' + token.encode() + rb'(\d+)"',
+            lambda match: fragments[int(match.group(1))],
+            encoded
+        )
+
+    def _dumps(self, obj, default):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=default).encode()
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, (Decimal, uuid.UUID)):
+            return str(value)
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, bytes):
+            return value.decode()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    ``JSONSerializer`` on top of orjson, used when it is installed.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise SerializerException("orjson is not installed")
+
+    def _dumps(self, obj, default):
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+SERIALIZERS = {
+    JSONSerializer.name: JSONSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+}
+
+
+def get_serializer(name="auto"):
+    """
+    Return the serializer called ``name``; ``auto`` picks orjson when it
+    is available and falls back to the standard library otherwise.
+    """
+    if name in (None, "auto"):
+        name = OrjsonSerializer.name if orjson is not None else JSONSerializer.name
+    if name not in SERIALIZERS:
+        raise SerializerException(f"Unknown serializer {name}, expected one of {sorted(SERIALIZERS)}")
+    return SERIALIZERS[name]()
@@ -50,5 +50,5 @@ Feature: API availability and test case retrieval
     And I receive a positive response for my DELETE request
 
     Examples:
-    |    test_case           |              parameters               |
-    |  test_new_test_case    |  [{"timeout":"10"}, {"timeout":"20"}] |
+    |    test_case            |              parameters               |
+    |  test_deleted_test_case |  [{"timeout":"10"}, {"timeout":"20"}] |
@@ -3,8 +3,8 @@ Behave environment setup for functional tests.
 
 Initializes all shared resources:
 - Logger and result managers
-- Docker Compose environment
-- MySQL test database
+- Docker Compose environment, or an in-process API on SQLite (env=sqlite)
+- MySQL/SQLite test database
 - HTTP session for API requests
 
 The configuration is loaded from:
@@ -13,7 +13,10 @@ The configuration is loaded from:
 """
 
 import os
+import tempfile
+import threading
 from pathlib import Path
+from werkzeug.serving import make_server
 from test_utils.logger_manager import LoggerManager
 from test_utils.result_manager import ResultManagerClass
 from input_data_test_cases.mysql_api.db_handler import SQLDBHandler
@@ -54,10 +57,30 @@ def before_all(context):
         context.logger.info("Setting up test database...")
         db_client = EcommerceDataTC(config=db_config).client
         context.db_handler = SQLDBHandler(engine=db_client)
+        context.db_handler.wait_until_ready(max_seconds=60)
         context.db_handler.init_database(
             table=test_data["table"],
             data=test_data["init_values"]["data"],
+            bulk=True,
         )
+    elif env.lower() == "sqlite":
+        # No containers: the API is served from this process on a temporary
+        # SQLite file, so the suite starts in well under a second.
+        context.logger.info("Serving the API in process on SQLite")
+        context.sqlite_dir = tempfile.TemporaryDirectory()
+        api = EcommerceDataTC(config={
+            'DB_ENGINE': 'sqlite',
+            'SQLITE_PATH': os.path.join(context.sqlite_dir.name, "ecommerce.db"),
+        })
+        context.db_handler = api.db_handler
+        context.db_handler.init_database(
+            table=test_data["table"],
+            data=test_data["init_values"]["data"],
+            bulk=True,
+        )
+        context.server = make_server("127.0.0.1", 0, api.app, threaded=True)
+        threading.Thread(target=context.server.serve_forever, daemon=True).start()
+        context.config.userdata["BASE_URL"] = f"http://127.0.0.1:{context.server.server_port}/"
     else:
         context.logger.info("Running CI")
 
@@ -88,11 +111,19 @@ def after_all(context):
     """
     context.logger.info("Tearing down test environment...")
 
+    # Stop the in-process API
+    if getattr(context, "server", None):
+        context.server.shutdown()
+        context.logger.info("In-process API stopped.")
+
     # Close database connection
     if getattr(context, "db_handler", None):
         context.db_handler.close()
         context.logger.info("Database connection closed.")
 
+    if getattr(context, "sqlite_dir", None):
+        context.sqlite_dir.cleanup()
+
     # Stop Docker containers
     if getattr(context, "docker_compose_handler", None):
         context.docker_compose_handler.down_docker_compose()
@@ -0,0 +1,169 @@
+"""
+TestAsyncSQLDBHandler unit test
+"""
+import asyncio
+import unittest
+import xmlrunner
+import pymysql
+from unittest.mock import AsyncMock, MagicMock, patch
+from input_data_test_cases.mysql_api.async_db_handler import AsyncSQLDBHandler
+from input_data_test_cases.mysql_api.db_handler import (
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandlerException
+)
+
+
+class TestAsyncSQLDBHandler(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit test suite for the AsyncSQLDBHandler class.
+
+    These tests validate how connections are taken from and returned to
+    a mocked aiomysql pool and how driver errors are wrapped.
+    """
+
+    def setUp(self):
+        """
+        Build a handler whose aiomysql pool hands out one mocked connection.
+        """
+        self.cursor = MagicMock()
+        for method in ('execute', 'fetchall', 'fetchmany', 'close'):
+            setattr(self.cursor, method, AsyncMock())
+        self.conn = MagicMock()
+        for method in ('ping', 'commit', 'rollback'):
+            setattr(self.conn, method, AsyncMock())
+        self.conn.cursor = AsyncMock(return_value=self.cursor)
+        self.pool = MagicMock(size=1, freesize=1, minsize=1, maxsize=10)
+        self.pool.acquire = AsyncMock(return_value=self.conn)
+        self.pool.wait_closed = AsyncMock()
+        patcher = patch(
+            "input_data_test_cases.mysql_api.async_db_handler.aiomysql.create_pool",
+            new_callable=AsyncMock,
+            return_value=self.pool
+        )
+        self.create_pool = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.handler = AsyncSQLDBHandler(connect_kwargs={'host': 'fake_host'}, checkout_timeout=0.05)
+
+    async def consult(self):
+        return await self.handler.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'}
+        )
+
+    async def test_pool_opened_once_on_first_use(self):
+        """
+        Test that concurrent first queries open a single pool and that
+        every connection is released after its query.
+        """
+        self.assertEqual(self.handler.pool_stats()['size'], 0)
+        self.cursor.fetchall.return_value = [(1, 'tc_1', '[]')]
+        results = await asyncio.gather(self.consult(), self.consult())
+        self.assertEqual(results, [[(1, 'tc_1', '[]')]] * 2)
+        self.create_pool.assert_awaited_once()
+        self.assertFalse(self.create_pool.call_args.kwargs['autocommit'])
+        self.assertEqual(self.pool.release.call_count, 2)
+        self.cursor.execute.assert_awaited_with("select * from parameters", ())
+        await self.handler.close()
+        self.pool.close.assert_called_once_with()
+        self.assertIsNone(self.handler.pool)
+
+    async def test_checkout_errors(self):
+        """
+        Test that an unreachable server, an exhausted pool and a dead
+        connection all surface as SQLDBHandlerException, the dead
+        connection being closed before it goes back to the pool.
+        """
+        self.create_pool.side_effect = pymysql.err.OperationalError(2003, "Can't connect")
+        with self.assertRaises(SQLDBHandlerException):
+            await self.consult()
+        ready, details = await self.handler.readiness()
+        self.assertFalse(ready)
+        self.assertIn("Can't connect", details['error'])
+
+        self.create_pool.side_effect = None
+
+        async def never():
+            await asyncio.sleep(1)
+        self.pool.acquire = never
+        with self.assertRaises(SQLDBHandlerException):
+            await self.consult()
+
+        self.pool.acquire = AsyncMock(return_value=self.conn)
+        self.conn.ping.side_effect = pymysql.err.OperationalError(2006, "MySQL server has gone away")
+        with self.assertRaises(SQLDBHandlerException):
+            await self.consult()
+        self.conn.close.assert_called_once_with()
+        self.pool.release.assert_called_once_with(self.conn)
+
+    async def test_statement_errors_are_wrapped(self):
+        """
+        Test that failed statements are rolled back, their connection
+        released and the driver error wrapped, constraint violations
+        being recognisable and missing tables included.
+        """
+        self.cursor.execute.side_effect = pymysql.err.IntegrityError(1062, "Duplicate entry")
+        with self.assertRaises(SQLDBHandlerException) as error:
+            await self.handler.modify_table(
+                base_query=ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+                kwargs={'table_name': 'parameters', 'column': 'id'},
+                params=(1,)
+            )
+        self.assertTrue(self.handler.violates_constraint(error.exception))
+        self.conn.rollback.assert_awaited_once_with()
+        self.conn.commit.assert_not_awaited()
+
+        self.cursor.execute.side_effect = pymysql.err.OperationalError(1205, "Lock wait timeout")
+        with self.assertRaisesRegex(SQLDBHandlerException, "Unable to modify table"):
+            await self.handler.modify_table(
+                base_query=ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+                kwargs={'table_name': 'parameters', 'column': 'id'},
+                params=(1,)
+            )
+        with self.assertRaises(SQLDBHandlerException) as error:
+            await self.consult()
+        self.assertFalse(self.handler.violates_constraint(error.exception))
+        self.assertEqual(self.pool.release.call_count, 3)
+
+        self.cursor.execute.side_effect = pymysql.err.ProgrammingError(1146, "Table doesn't exist")
+        with self.assertRaises(SQLDBHandlerException):
+            await self.consult()
+
+    async def test_insert_many_commit_error(self):
+        """
+        Test that a failed commit of a bulk insert reports how many rows
+        were committed before it.
+        """
+        self.cursor.lastrowid = 1
+        self.conn.commit.side_effect = [None, pymysql.err.OperationalError(1205, "Lock wait timeout")]
+        data = [{'name': f'tc_{i}', 'params': []} for i in range(3)]
+        with self.assertRaisesRegex(SQLDBHandlerException, "after 2 committed rows"):
+            await self.handler.insert_many('parameters', data, chunk_size=2)
+        self.pool.release.assert_called_once_with(self.conn)
+
+    async def test_iter_consult_table_closed_early(self):
+        """
+        Test that a stream closed before its end drops the half-read
+        connection instead of reusing it.
+        """
+        self.cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        rows = await self.handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'},
+            fetch_size=2
+        )
+        self.assertEqual(await rows.__anext__(), (1,))
+        await rows.aclose()
+        self.conn.close.assert_called_once_with()
+        self.pool.release.assert_called_once_with(self.conn)
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
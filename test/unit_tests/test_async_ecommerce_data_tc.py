@@ -0,0 +1,216 @@
+"""
+TestAsyncEcommerceDataTC unit test
+"""
+import time
+import unittest
+import xmlrunner
+from unittest.mock import patch, AsyncMock
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    async_ecommerce_data_tc as async_ec_data
+)
+from input_data_test_cases.mysql_api.mysql_api import MyslApiException
+
+
+class TestAsyncEcommerceDataTC(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit test suite for the AsyncEcommerceDataTC class.
+
+    These tests validate that the coroutine views keep the same
+    request validation, query mapping and responses as the WSGI API.
+    """
+
+    def setUp(self):
+        """
+        Set up the test environment before each test case.
+
+        Initializes an AsyncEcommerceDataTC instance with a fake config;
+        the aiomysql pool is never opened because queries are mocked.
+        """
+        config = {
+            'MYSQL_HOST': 'fake_host',
+            'MYSQL_USER': 'fake_user',
+            'MYSQL_PASSWORD': 'fake_pssw',
+            'MYSQL_DB': 'fake_db',
+            'MYSQL_PORT': 1111,
+        }
+        self.api = async_ec_data.AsyncEcommerceDataTC(config=config)
+        self.app = self.api.app
+
+    async def test_get_test_case_invalid_requests(self):
+        """
+        Test get_test_case when called with invalid request parameters.
+
+        Ensures no query is attempted and BAD_REQUEST is returned.
+        """
+        with patch.object(self.api, "query", new_callable=AsyncMock) as patch_query:
+            async with self.app.test_request_context("/test_case?id=test_case"):
+                resp, code = await self.api.get_test_case()
+                data = await resp.get_json()
+        patch_query.assert_not_awaited()
+        self.assertEqual(code, StatusCode.BAD_REQUEST)
+        self.assertEqual(data, {'message': "ID should be an integer"})
+
+    async def test_get_test_case_found(self):
+        """
+        Test get_test_case with a valid id.
+
+        Ensures the params query is awaited with a bound value, the rows
+        are returned with an ETag and the result is cached.
+        """
+        rows = [{'params': '{"a": 1}'}]
+        with patch.object(self.api, "query", new_callable=AsyncMock, return_value=rows) as patch_query:
+            async with self.app.test_request_context("/test_case?id=1"):
+                resp, code = await self.api.get_test_case()
+                data = await resp.get_json()
+            async with self.app.test_request_context("/test_case?id=1"):
+                await self.api.get_test_case()
+        patch_query.assert_awaited_once_with(
+            base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': self.api.TABLE_NAME, 'column': 'id'},
+            params=('1',)
+        )
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(data, rows)
+        self.assertIsNotNone(resp.get_etag()[0])
+
+    async def test_get_test_case_not_found(self):
+        """
+        Test get_test_case when the query fails.
+
+        Ensures NOT_FOUND is returned with the usual message.
+        """
+        with patch.object(self.api, "query", new_callable=AsyncMock, side_effect=MyslApiException("boom")):
+            async with self.app.test_request_context("/test_case?name=dummy"):
+                resp, code = await self.api.get_test_case()
+                data = await resp.get_json()
+        self.assertEqual(code, StatusCode.NOT_FOUND)
+        self.assertEqual(data, {'message': 'Unable find the desired test case'})
+
+    async def test_get_all_test_cases_page(self):
+        """
+        Test get_all_test_cases with keyset pagination arguments.
+
+        Ensures the page query is used and next_after_id points at the
+        last row of a full page.
+        """
+        rows = [{'id': 4, 'name': 'a', 'params': '{}'}, {'id': 5, 'name': 'b', 'params': '{}'}]
+        with patch.object(self.api, "query", new_callable=AsyncMock, return_value=rows) as patch_query:
+            async with self.app.test_request_context("/all_test_cases?limit=2&after_id=3"):
+                resp, code = await self.api.get_all_test_cases()
+                data = await resp.get_json()
+        patch_query.assert_awaited_once_with(
+            base_query=ConsultTableQuery.GET_PAGE_AFTER_ID,
+            kwargs={'table_name': self.api.TABLE_NAME},
+            params=(3, 2)
+        )
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(data, {'test_cases': rows, 'next_after_id': 5})
+
+    async def test_ndjson_stream_closed_unread(self):
+        """
+        Test that closing an NDJSON body nobody read from still closes the
+        row iterator, and that a read body yields one line per row.
+        """
+        for read in (False, True):
+            rows = AsyncMock()
+            rows.__anext__.side_effect = [(1, 'tc_1', '[]'), StopAsyncIteration()]
+            with patch.object(self.api, "stream_query", new_callable=AsyncMock, return_value=rows):
+                async with self.app.test_request_context("/all_test_cases?format=ndjson"):
+                    resp = await self.api.get_all_test_cases()
+            async with resp.response as body:
+                lines = [line async for line in body] if read else []
+            rows.aclose.assert_awaited_once_with()
+        self.assertEqual(lines, [b'[1, "tc_1", "[]"]\n'])
+
+    async def test_patch_test_case(self):
+        """
+        Test patch_test_case on the async app.
+
+        Ensures the operations become the same bound JSON_* expression as
+        on the WSGI app and bad bodies are rejected without a query.
+        """
+        with patch.object(self.api, "query", new_callable=AsyncMock, side_effect=[[], 1]) as patch_query:
+            async with self.app.test_request_context(
+                    "/test_case?id=1", method="PATCH", json=[{'op': 'set', 'path': '[0].timeout', 'value': 30}]):
+                _, code = await self.api.patch_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        patch_query.assert_awaited_with(
+            base_query=ModifyTableQuery.PATCH_PARAMS_WHERE_COLUMN_EQUALS,
+            kwargs={
+                'table_name': self.api.TABLE_NAME,
+                'params_expression': "json_set(params, %s, cast(%s as json))",
+                'column': 'id'
+            },
+            params=['$[0].timeout', '30', '1']
+        )
+        with patch.object(self.api, "query", new_callable=AsyncMock) as patch_query:
+            async with self.app.test_request_context("/test_case?id=1", method="PATCH", json=[]):
+                _, code = await self.api.patch_test_case()
+        self.assertEqual(code, StatusCode.BAD_REQUEST)
+        patch_query.assert_not_awaited()
+
+    async def test_get_test_case_changes(self):
+        """
+        Test the change feed on the async app.
+
+        Ensures settled changes are returned at once and a long-poll
+        without changes ends after wait seconds.
+        """
+        now = time.time()
+        head = [(1, now, None)]
+        rows = [(1, 3, 'tc_3', 'insert', now, '[]')]
+        with patch.object(self.api, "query", new_callable=AsyncMock, side_effect=[head, rows]):
+            async with self.app.test_request_context("/test_cases/changes"):
+                resp, code = await self.api.get_test_case_changes()
+                data = await resp.get_json()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(data['next_since'], 1)
+        self.assertEqual([c['name'] for c in data['changes']], ['tc_3'])
+        with patch.object(self.api, "query", new_callable=AsyncMock, return_value=head):
+            async with self.app.test_request_context("/test_cases/changes?since=1&wait=0.1"):
+                resp, code = await self.api.get_test_case_changes()
+                data = await resp.get_json()
+        self.assertEqual(data['changes'], [])
+        # Without the PROCESS privilege the head is read without the open writes
+        side_effect = [MyslApiException("Access denied"), [(1, now)], rows]
+        with patch.object(self.api, "query", new_callable=AsyncMock, side_effect=side_effect):
+            async with self.app.test_request_context("/test_cases/changes"):
+                resp, code = await self.api.get_test_case_changes()
+                data = await resp.get_json()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(data['gap_check'], 'time_window')
+
+    def test_sqlite_rejected(self):
+        """
+        Test that the async app refuses the sqlite engine with a clear error.
+        """
+        with self.assertRaisesRegex(MyslApiException, "only serves MySQL"):
+            async_ec_data.AsyncEcommerceDataTC(config={'DB_ENGINE': 'sqlite', 'SQLITE_PATH': ':memory:'})
+
+    async def test_health_and_metrics(self):
+        """
+        Test /livez, /readyz (following the pool readiness) and /metrics.
+        """
+        client = self.app.test_client()
+        resp = await client.get('/livez')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        with patch.object(self.api.db_handler, "readiness", new_callable=AsyncMock,
+                          return_value=(False, {'error': 'db down'})):
+            resp = await client.get('/readyz')
+        self.assertEqual(resp.status_code, StatusCode.SERVICE_UNAVAILABLE)
+        self.assertEqual((await resp.get_json())['error'], 'db down')
+        resp = await client.get('/metrics')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertIn('route="/readyz"', (await resp.get_data(as_text=True)))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,100 @@
+"""
+TestTTLCache unit test
+"""
+import unittest
+import xmlrunner
+from input_data_test_cases.cache import TTLCache
+
+
+class FakeClock():
+    """
+    Manually advanced clock used to drive entry expiration.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    """
+    Unit test suite for the TTLCache class.
+
+    These tests validate LRU eviction, TTL expiration, invalidation
+    and the hit/miss counters.
+    """
+
+    def setUp(self):
+        """
+        Create a two entry cache with a 10 second TTL over a fake clock.
+        """
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_size=2, ttl=10, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        """
+        Test that stored values are returned and counted as hits while
+        unknown keys count as misses.
+        """
+        self.cache.set(('id', '1'), [['{}']])
+        self.assertEqual(self.cache.get(('id', '1')), [['{}']])
+        self.assertIsNone(self.cache.get(('id', '2')))
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        Test that the least recently read entry is evicted first once
+        max_size is exceeded.
+        """
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        """
+        Test that entries are no longer served once their TTL elapsed.
+        """
+        self.cache.set('a', 1)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    def test_invalidate_and_clear(self):
+        """
+        Test explicit invalidation of single keys and of the whole cache.
+        """
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.invalidate('a', 'missing')
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+
+    def test_disabled_cache(self):
+        """
+        Test that a cache with max_size 0 never stores anything.
+        """
+        cache = TTLCache(max_size=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertFalse(cache.enabled)
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'],
+        exit=False
+    )
@@ -0,0 +1,251 @@
+"""
+TestChangeFeed unit test
+"""
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import xmlrunner
+from unittest.mock import patch
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery
+from input_data_test_cases.mysql_api.mysql_api import MyslApiException
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    ecommerce_data_tc as ec_data
+)
+
+TABLE = {
+    'name': 'parameters',
+    'columns': [
+        {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+        {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+        {'name': 'params', 'type': 'json'},
+    ],
+    'indexes': [{'name': 'uq_parameters_name', 'unique': True, 'columns': ['name']}],
+    'change_log': True,
+}
+DATA = [
+    {'name': 'test_case_dummy', 'params': [{'timeout': 10}]},
+    {'name': 'test_case_cart', 'params': [{'article': 'T-shirt'}]},
+]
+
+
+class TestChangeFeed(unittest.TestCase):
+    """
+    Unit tests for the parameters change log and /test_cases/changes on SQLite.
+    """
+
+    def setUp(self):
+        """
+        Build the API on an in-memory database with the change log enabled.
+        """
+        self.api = ec_data.EcommerceDataTC(config={'DB_ENGINE': 'sqlite'})
+        self.api.db_handler.init_database(table=TABLE, data=DATA, bulk=True)
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Close the pool and the in-memory database.
+        """
+        self.api.db_handler.close()
+        self.api.client.close()
+
+    def changes(self, **args):
+        resp = self.client.get('/test_cases/changes', query_string=args)
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        return resp.get_json()
+
+    def test_backfill(self):
+        """
+        Rows present before the log are reported as inserts.
+        """
+        feed = self.changes()
+        self.assertEqual([(c['version'], c['name'], c['op']) for c in feed['changes']], [
+            (1, 'test_case_dummy', 'insert'),
+            (2, 'test_case_cart', 'insert'),
+        ])
+        self.assertEqual(json.loads(feed['changes'][0]['params']), [{'timeout': 10}])
+        self.assertEqual(feed['next_since'], 2)
+        self.assertEqual(feed['version'], 2)
+        self.assertEqual(feed['gap_check'], 'open_writes')
+
+    def test_init_is_idempotent(self):
+        """
+        Running the setup again adds neither triggers nor log rows.
+        """
+        self.api.db_handler.create_change_log(table_name='parameters')
+        self.assertEqual(self.changes()['version'], 2)
+
+    def test_update_and_tombstone(self):
+        """
+        Updates and deletes get new versions, deletes lose their params.
+        """
+        self.client.put('/test_case', query_string={'name': 'test_case_cart'}, data={'params': '[{"a": 2}]'})
+        self.client.delete('/test_case', query_string={'name': 'test_case_dummy'})
+        feed = self.changes(since=2)
+        self.assertEqual([(c['version'], c['id'], c['op']) for c in feed['changes']], [
+            (3, 2, 'update'),
+            (4, 1, 'delete'),
+        ])
+        self.assertEqual(json.loads(feed['changes'][0]['params']), [{'a': 2}])
+        self.assertIsNone(feed['changes'][1]['params'])
+
+    def test_paging(self):
+        """
+        limit pages through the log with next_since.
+        """
+        feed = self.changes(limit=1)
+        self.assertEqual(len(feed['changes']), 1)
+        feed = self.changes(since=feed['next_since'], limit=1)
+        self.assertEqual(feed['changes'][0]['version'], 2)
+        feed = self.changes(since=feed['next_since'])
+        self.assertEqual(feed['changes'], [])
+        self.assertEqual(feed['next_since'], 2)
+
+    def test_unsettled_gap_held_back(self):
+        """
+        Rows after a hole in the versions wait while a write transaction
+        older than them is open, however long it runs.
+        """
+        now = time.time()
+        rows = [(1, 1, 'a', 'insert', now, '[]'), (3, 3, 'c', 'insert', now, '[]')]
+        settle = self.api.CHANGES_SETTLE_SECONDS
+        for db_now, oldest_write, versions in (
+                (now, None, [1]),
+                (now + 3600, now - 1, [1]),
+                (now + settle, now + 0.5, [1, 3]),
+                (now + settle, None, [1, 3])):
+            changes = self.api._settled_changes(rows, since=0, db_now=db_now, oldest_write=oldest_write)
+            self.assertEqual([c['version'] for c in changes], versions)
+
+    def test_reads_pinned_to_primary(self):
+        """
+        The head and the rows are both read from the primary, whose open
+        transactions a replica does not know about.
+        """
+        with patch.object(self.api.replica_router, 'read', wraps=self.api.replica_router.read) as read:
+            self.changes()
+        self.assertEqual(read.call_count, 2)
+        self.assertTrue(all(call.kwargs['primary'] for call in read.call_args_list))
+
+    def test_open_writes_unreadable(self):
+        """
+        Without the PROCESS privilege the head is read without the open
+        writes, holes wait out the time window and the response says so.
+        """
+        query = self.api.query
+
+        def no_process_privilege(base_query, **kwargs):
+            if base_query == ConsultTableQuery.CHANGE_LOG_HEAD:
+                raise MyslApiException("Access denied; you need the PROCESS privilege")
+            return query(base_query=base_query, **kwargs)
+        with patch.object(self.api, 'query', side_effect=no_process_privilege) as patch_query:
+            feed = self.changes()
+            self.changes(since=2)
+        self.assertEqual(feed['version'], 2)
+        self.assertEqual(feed['gap_check'], 'time_window')
+        heads = [c.kwargs['base_query'] for c in patch_query.call_args_list]
+        self.assertEqual(heads.count(ConsultTableQuery.CHANGE_LOG_HEAD), 1)
+        self.assertEqual(self.changes()['gap_check'], 'time_window')
+
+        now = time.time()
+        rows = [(1, 1, 'a', 'insert', now, '[]'), (3, 3, 'c', 'insert', now, '[]')]
+        window = self.api.CHANGES_UNTRACKED_SETTLE_SECONDS
+        for db_now, versions in ((now + window - 1, [1]), (now + window, [1, 3])):
+            changes = self.api._settled_changes(rows, 0, db_now, None, writes_tracked=False)
+            self.assertEqual([c['version'] for c in changes], versions)
+
+    def test_long_poll(self):
+        """
+        A waiting request returns as soon as a change is written.
+        """
+        def write():
+            time.sleep(0.2)
+            self.api.app.test_client().post('/test_case', json={'name': 'late_case', 'params': []})
+        writer = threading.Thread(target=write)
+        start = time.monotonic()
+        writer.start()
+        feed = self.changes(since=2, wait=self.api.MAX_CHANGES_WAIT)
+        writer.join()
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual([c['name'] for c in feed['changes']], ['late_case'])
+
+    def test_wait_timeout(self):
+        """
+        Without changes the request ends after wait seconds.
+        """
+        feed = self.changes(since=2, wait=0.1)
+        self.assertEqual(feed['changes'], [])
+
+    def test_invalid_arguments(self):
+        """
+        Bad since, limit or wait values are refused.
+        """
+        for args in ({'since': 'x'}, {'since': -1}, {'limit': 0}, {'wait': self.api.MAX_CHANGES_WAIT + 1}):
+            resp = self.client.get('/test_cases/changes', query_string=args)
+            self.assertEqual(resp.status_code, StatusCode.BAD_REQUEST)
+
+    def test_log_table(self):
+        """
+        The log lives in <table>_changes.
+        """
+        rows = self.api.db_handler.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': self.api.db_handler.change_log_table('parameters')}
+        )
+        self.assertEqual(len(rows), 2)
+
+
+class TestChangeLogMigration(unittest.TestCase):
+    """
+    Unit tests for creating the change log outside of init_database.
+    """
+
+    def setUp(self):
+        """
+        Build the API on a SQLite file holding the table but no change log.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            'DB_ENGINE': 'sqlite',
+            'SQLITE_PATH': os.path.join(self.tmp_dir.name, 'ecommerce.db'),
+            'TEST_CASE_CHANGE_LOG': True,
+        }
+        self.api = ec_data.EcommerceDataTC(config=self.config)
+        self.api.db_handler.init_database(table={**TABLE, 'change_log': False}, data=DATA, bulk=True)
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Close the pool and remove the database file.
+        """
+        self.api.db_handler.close()
+        self.tmp_dir.cleanup()
+
+    def test_migrate(self):
+        """
+        Without the log the feed answers a JSON error, migrate creates it.
+        """
+        resp = self.client.get('/test_cases/changes')
+        self.assertEqual(resp.status_code, StatusCode.NOT_FOUND)
+        self.assertEqual(resp.get_json(), {'message': 'Unable to get the test case changes'})
+        ec_data.EcommerceDataTC.migrate({**self.config, 'TEST_CASE_CHANGE_LOG': False})
+        self.assertEqual(self.client.get('/test_cases/changes').status_code, StatusCode.NOT_FOUND)
+        ec_data.EcommerceDataTC.migrate(self.config)
+        ec_data.EcommerceDataTC.migrate(self.config)
+        resp = self.client.get('/test_cases/changes')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(resp.get_json()['version'], 2)
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,123 @@
+"""
+TestResponseCompressor unit test
+"""
+import gzip
+import json
+import unittest
+import xmlrunner
+from unittest.mock import patch
+from flask import Flask, Response, jsonify, request
+from input_data_test_cases.compression import (
+    CompressionException,
+    GzipCodec,
+    ResponseCompressor
+)
+
+
+class TestResponseCompressor(unittest.TestCase):
+    """
+    Unit test suite for the ResponseCompressor after_request hook.
+
+    These tests validate encoding negotiation, the size threshold,
+    streamed bodies, ETag handling and the compressed body cache.
+    """
+
+    def setUp(self):
+        """
+        Build a Flask app with a large, a small and a streamed route
+        behind a gzip only compressor.
+        """
+        self.payload = [{'id': i, 'params': '[{"timeout": 10}]'} for i in range(200)]
+        self.compressor = ResponseCompressor(min_size=512, encodings=['gzip'])
+        self.app = Flask(__name__)
+        self.app.after_request(self.compressor.after_request)
+
+        @self.app.route('/large')
+        def large():
+            response = jsonify(self.payload)
+            response.set_etag('abc')
+            return response.make_conditional(request)
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'message': 'Base url'})
+
+        @self.app.route('/stream')
+        def stream():
+            return Response((json.dumps(row) + "\n" for row in self.payload), mimetype='application/x-ndjson')
+
+        self.client = self.app.test_client()
+
+    def test_large_body_is_compressed(self):
+        """
+        Test that a body over the threshold is gzip encoded, tagged with
+        an encoding specific ETag and varies on Accept-Encoding.
+        """
+        resp = self.client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual(resp.get_etag(), ('abc-gzip', False))
+        self.assertEqual(json.loads(gzip.decompress(resp.data)), self.payload)
+
+    def test_not_compressed_without_accept_encoding_or_when_small(self):
+        """
+        Test that identity clients and small bodies are left alone.
+        """
+        resp = self.client.get('/large', headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(resp.get_json(), self.payload)
+        resp = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+
+    def test_conditional_request_on_compressed_etag(self):
+        """
+        Test that If-None-Match with the encoded ETag answers 304.
+        """
+        headers = {'Accept-Encoding': 'gzip', 'If-None-Match': '"abc-gzip"'}
+        resp = self.client.get('/large', headers=headers)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.get_etag(), ('abc-gzip', False))
+
+    def test_streamed_body_is_compressed(self):
+        """
+        Test that generator responses are compressed chunk by chunk.
+        """
+        resp = self.client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', resp.headers)
+        lines = gzip.decompress(resp.data).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.payload)
+
+    def test_compressed_bodies_are_cached(self):
+        """
+        Test that an unchanged result is compressed only once.
+        """
+        with patch.object(GzipCodec, 'compress', wraps=GzipCodec().compress) as patch_compress:
+            for _ in range(3):
+                self.client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        patch_compress.assert_called_once()
+        self.assertEqual(self.compressor.cache.stats()['hits'], 2)
+
+    def test_negotiation_and_levels(self):
+        """
+        Test quality based negotiation, level clamping and rejection of
+        unavailable encodings.
+        """
+        with self.app.test_request_context(headers={'Accept-Encoding': 'br;q=0.5, gzip;q=0'}):
+            self.assertIsNone(self.compressor.negotiate(request.accept_encodings))
+        self.compressor.level = 42
+        self.assertEqual(self.compressor.codec_level(GzipCodec()), 9)
+        with self.assertRaises(CompressionException):
+            ResponseCompressor(encodings=['lzma'])
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
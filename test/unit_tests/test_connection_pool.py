@@ -0,0 +1,133 @@
+"""
+TestConnectionPool unit test
+"""
+import time
+import unittest
+import threading
+import xmlrunner
+from unittest.mock import Mock
+from input_data_test_cases.mysql_api.connection_pool import (
+    ConnectionPool,
+    ConnectionPoolException
+)
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Unit test suite for the ConnectionPool class.
+
+    These tests validate connection reuse, pool bounds, checkout
+    timeouts, health checks and idle eviction using mocked
+    DB-API connections.
+    """
+
+    def setUp(self):
+        """
+        Create a pool whose factory hands out fresh Mock connections.
+        """
+        self.factory = Mock(side_effect=lambda: Mock())
+        self.pool = ConnectionPool(
+            factory=self.factory,
+            min_size=1,
+            max_size=2,
+            checkout_timeout=0.2,
+            max_idle_seconds=60
+        )
+
+    def test_connection_is_reused(self):
+        """
+        Test that a returned connection is handed out again instead of
+        opening a new one.
+        """
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+        first.ping.assert_called_once_with()
+
+    def test_checkout_times_out_when_exhausted(self):
+        """
+        Test that checkout raises once max_size connections are in use
+        and none is returned before the timeout.
+        """
+        self.pool.checkout()
+        self.pool.checkout()
+        with self.assertRaises(ConnectionPoolException):
+            self.pool.checkout()
+        stats = self.pool.stats()
+        self.assertEqual(stats['in_use'], 2)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        """
+        Test that a blocked checkout is served as soon as another thread
+        returns its connection.
+        """
+        first = self.pool.checkout()
+        self.pool.checkout()
+        timer = threading.Timer(0.05, self.pool.checkin, args=(first,))
+        timer.start()
+        self.assertIs(self.pool.checkout(timeout=1), first)
+        timer.join()
+        self.assertEqual(self.pool.stats()['waits'], 1)
+
+    def test_unhealthy_connection_is_replaced(self):
+        """
+        Test that a connection failing its health check is closed and
+        replaced by a new one.
+        """
+        with self.pool.connection() as broken:
+            broken.ping.side_effect = Exception("gone away")
+        with self.pool.connection() as conn:
+            self.assertIsNot(conn, broken)
+        broken.close.assert_called_once_with()
+        self.assertEqual(self.pool.stats()['health_check_failures'], 1)
+
+    def test_failed_rollback_discards_connection(self):
+        """
+        Test that a connection whose rollback fails after an error is
+        dropped from the pool.
+        """
+        with self.assertRaises(ValueError):
+            with self.pool.connection() as conn:
+                conn.rollback.side_effect = Exception("gone away")
+                raise ValueError("query failed")
+        stats = self.pool.stats()
+        self.assertEqual(stats['size'], 0)
+        self.assertEqual(stats['idle'], 0)
+
+    def test_idle_connections_are_evicted_above_min_size(self):
+        """
+        Test that idle connections older than max_idle_seconds are closed
+        while keeping min_size connections open.
+        """
+        self.pool.max_idle_seconds = 0.01
+        first = self.pool.checkout()
+        second = self.pool.checkout()
+        self.pool.checkin(first)
+        self.pool.checkin(second)
+        time.sleep(0.02)
+        self.pool.checkout()
+        stats = self.pool.stats()
+        self.assertEqual(stats['evicted_idle'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_invalid_bounds(self):
+        """
+        Test that inconsistent pool bounds are rejected.
+        """
+        with self.assertRaises(ConnectionPoolException):
+            ConnectionPool(factory=Mock(), min_size=3, max_size=2)
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'],
+        exit=False
+    )
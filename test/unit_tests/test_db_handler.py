@@ -0,0 +1,328 @@
+"""
+TestSQLDBHandler unit test
+"""
+import unittest
+import xmlrunner
+from unittest.mock import MagicMock, PropertyMock
+from prometheus_client import REGISTRY
+from input_data_test_cases.mysql_api.db_handler import (
+    ConsultTableQuery,
+    SQLDBHandler,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPoolException
+
+
+class TestSQLDBHandler(unittest.TestCase):
+    """
+    Unit test suite for the SQLDBHandler class.
+
+    These tests validate how statements are issued against pooled
+    connections using a mocked engine.
+    """
+
+    def setUp(self):
+        """
+        Build a handler over a mocked engine whose connections all share
+        the same mocked cursor.
+        """
+        self.engine = MagicMock()
+        self.conn = self.engine.connect
+        self.cursor = self.conn.cursor.return_value
+        self.handler = SQLDBHandler(engine=self.engine)
+        self.cursor.reset_mock()
+        self.conn.reset_mock()
+
+    def test_insert_many_groups_and_chunks(self):
+        """
+        Test that rows are grouped by column set, sent as one multi-row
+        INSERT per chunk and committed once per chunk.
+        """
+        data = [
+            {'name': 'tc_1', 'params': [{'timeout': 1}]},
+            {'name': 'tc_2', 'params': [{'timeout': 2}]},
+            {'name': 'tc_3'},
+            {'name': 'tc_4', 'params': {'user': 'John123'}},
+        ]
+        self.cursor.lastrowid = 10
+        report = self.handler.insert_many(
+            table_name='parameters',
+            data=data,
+            chunk_size=2
+        )
+        self.assertEqual(self.cursor.execute.call_count, 3)
+        first_query, first_params = self.cursor.execute.call_args_list[0].args
+        self.assertEqual(
+            first_query,
+            "INSERT INTO parameters (name,params) VALUES (?,?),(?,?)"
+        )
+        self.assertEqual(
+            first_params,
+            ['tc_1', '[{"timeout": 1}]', 'tc_2', '[{"timeout": 2}]']
+        )
+        self.assertEqual(self.conn.commit.call_count, 3)
+        self.assertEqual(report['rows'], 4)
+        self.assertEqual(report['chunks'], 3)
+        self.assertEqual(report['ids'], [10, 11, 10, 10])
+
+    def test_insert_many_single_transaction(self):
+        """
+        Test that single_transaction commits once after every chunk has
+        been sent.
+        """
+        self.cursor.lastrowid = 1
+        data = [{'name': f'tc_{i}', 'params': []} for i in range(5)]
+        report = self.handler.insert_many(
+            table_name='parameters',
+            data=data,
+            chunk_size=2,
+            single_transaction=True
+        )
+        self.assertEqual(self.cursor.execute.call_count, 3)
+        self.conn.commit.assert_called_once_with()
+        self.assertEqual(report['rows'], 5)
+
+    def test_insert_many_invalid_chunk_size(self):
+        """
+        Test that a non positive chunk size is rejected before touching
+        the database.
+        """
+        with self.assertRaises(SQLDBHandlerException):
+            self.handler.insert_many('parameters', [{'name': 'a'}], chunk_size=0)
+        self.cursor.execute.assert_not_called()
+
+    def test_insert_many_wraps_checkout_and_commit_errors(self):
+        """
+        Test that a failed connection checkout or final commit surfaces as
+        SQLDBHandlerException like a failed INSERT does.
+        """
+        data = [{'name': 'tc_1', 'params': []}]
+        self.conn.commit.side_effect = self.handler.dialect.Error("lock wait timeout")
+        with self.assertRaises(SQLDBHandlerException):
+            self.handler.insert_many('parameters', data, single_transaction=True)
+
+        engine = MagicMock()
+        type(engine).connect = PropertyMock(side_effect=OSError("db down"))
+        handler = SQLDBHandler(engine=engine, backoff_initial=60)
+        with self.assertRaises(OSError):
+            handler._connect()
+        with self.assertRaises(SQLDBHandlerException):
+            handler.insert_many('parameters', data)
+
+    def test_iter_consult_table_releases_connection_on_close(self):
+        """
+        Test that closing a partially consumed row iterator returns its
+        slot to the pool and discards the half-read connection.
+        """
+        self.cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        rows = self.handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'},
+            fetch_size=2
+        )
+        self.assertEqual(next(rows), (1,))
+        self.assertEqual(self.handler.pool_stats()['in_use'], 1)
+        rows.close()
+        stats = self.handler.pool_stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['idle'], 0)
+
+    def test_iter_consult_table_yields_all_rows(self):
+        """
+        Test that every fetched batch is yielded and the connection goes
+        back to the pool once the iterator is exhausted.
+        """
+        self.cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        rows = self.handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'},
+            fetch_size=2
+        )
+        self.assertEqual(list(rows), [(1,), (2,), (3,)])
+        self.cursor.execute.assert_called_once_with("select * from parameters", ())
+        self.assertEqual(self.handler.pool_stats()['idle'], 1)
+
+    def test_iter_consult_table_default_fetch_size(self):
+        """
+        Test that rows are fetched by the handler's fetch size unless the
+        call asks for another one, and that a non positive size is
+        rejected before a connection is taken.
+        """
+        handler = SQLDBHandler(engine=self.engine, fetch_size=50)
+        self.cursor.fetchmany.side_effect = [[(1,)], []]
+        list(handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'}
+        ))
+        self.cursor.fetchmany.assert_called_with(50)
+        with self.assertRaises(SQLDBHandlerException):
+            handler.iter_consult_table(
+                base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+                kwargs={'table_name': 'parameters'},
+                fetch_size=-1
+            )
+        self.assertEqual(handler.pool_stats()['in_use'], 0)
+        with self.assertRaises(SQLDBHandlerException):
+            SQLDBHandler(engine=self.engine, fetch_size=0)
+
+    def test_statements_are_rendered_once_and_bound(self):
+        """
+        Test that a consult query is rendered once into parameterized SQL
+        and that the looked up value is bound instead of interpolated.
+        """
+        self.cursor.fetchall.return_value = [('[]',)]
+        for _ in range(3):
+            rows = self.handler.consult_table(
+                base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+                kwargs={'table_name': 'parameters', 'column': 'name'},
+                params=("tc' or '1'='1",)
+            )
+        self.assertEqual(rows, [('[]',)])
+        self.cursor.execute.assert_called_with(
+            "select params from parameters where name = ?",
+            ("tc' or '1'='1",)
+        )
+        stats = self.handler.statement_stats()
+        self.assertEqual(stats['cache_misses'], 1)
+        self.assertEqual(stats['executions'], 3)
+
+    def test_missing_template_argument(self):
+        """
+        Test that a template rendered without one of its arguments is
+        reported as a handler error.
+        """
+        with self.assertRaises(SQLDBHandlerException):
+            self.handler.consult_table(
+                base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+                kwargs={'table_name': 'parameters'},
+                params=(1,)
+            )
+
+    def test_create_indexes_is_idempotent(self):
+        """
+        Test that only missing indexes are created and that prefix
+        lengths and the UNIQUE flag are rendered.
+        """
+        self.cursor.fetchall.side_effect = [[], [('idx_params_label',)]]
+        self.handler.create_indexes(
+            table_name='parameters',
+            indexes=[
+                {'name': 'uq_parameters_name', 'unique': True, 'columns': [{'name': 'name', 'length': 191}]},
+                {'name': 'idx_params_label', 'columns': ['label']},
+            ]
+        )
+        executed = [c.args[0] for c in self.cursor.execute.call_args_list]
+        self.assertEqual(
+            executed.count("CREATE UNIQUE INDEX uq_parameters_name ON parameters (name(191))"),
+            1
+        )
+        self.assertFalse(any('idx_params_label ON' in query for query in executed))
+
+    def test_slow_queries_are_logged_with_plan(self):
+        """
+        Test that statements over the threshold are recorded with their
+        parameter shapes and EXPLAIN plan, and that a statement is only
+        explained once while its plan is cached.
+        """
+        handler = SQLDBHandler(engine=self.engine, slow_query_config={'threshold_seconds': 0})
+        self.cursor.reset_mock()
+        self.cursor.connection = self.conn
+        self.cursor.description = (('id',), ('key',))
+        self.cursor.rowcount = 1
+        self.cursor.fetchall.side_effect = [[(1, 'uq_parameters_name')], [('[]',)], [('[]',)]]
+        for _ in range(2):
+            handler.consult_table(
+                base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+                kwargs={'table_name': 'parameters', 'column': 'name'},
+                params=('test_case_cart',)
+            )
+        entries = handler.slow_query_stats()['entries']
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['query'], 'WHERE_COLUMN_EQUALS')
+        self.assertEqual(entries[0]['statement'], "select params from parameters where name = ?")
+        self.assertEqual(entries[0]['param_shapes'], ['str(14)'])
+        self.assertEqual(entries[0]['explain'], [{'id': 1, 'key': 'uq_parameters_name'}])
+        self.assertEqual(entries[1]['explain'], entries[0]['explain'])
+        explains = [c for c in self.cursor.execute.call_args_list if c.args[0].startswith('EXPLAIN')]
+        self.assertEqual(len(explains), 1)
+
+    def test_fast_queries_are_not_logged(self):
+        """
+        Test that nothing is recorded under the default threshold.
+        """
+        self.cursor.fetchall.return_value = [('[]',)]
+        self.handler.consult_table(
+            base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'id'},
+            params=(1,)
+        )
+        self.assertEqual(self.handler.slow_query_stats()['entries'], [])
+
+    def test_handler_does_not_connect_on_creation(self):
+        """
+        Test that building a handler opens no connection.
+        """
+        engine = MagicMock()
+        type(engine).connect = PropertyMock(side_effect=OSError("db down"))
+        handler = SQLDBHandler(engine=engine)
+        self.assertEqual(handler.pool_stats()['created'], 0)
+
+    def test_connect_failures_back_off(self):
+        """
+        Test that a failed connect makes the following attempts fail fast
+        until the backoff expires, and that readiness reports it.
+        """
+        engine = MagicMock()
+        connect = PropertyMock(side_effect=OSError("db down"))
+        type(engine).connect = connect
+        handler = SQLDBHandler(engine=engine, backoff_initial=60)
+        with self.assertRaises(OSError):
+            handler._connect()
+        with self.assertRaises(ConnectionPoolException):
+            handler._connect()
+        self.assertEqual(connect.call_count, 1)
+        ready, details = handler.readiness()
+        self.assertFalse(ready)
+        self.assertEqual(details['connect_failures'], 1)
+        self.assertGreater(details['retry_in_seconds'], 0)
+        with self.assertRaises(SQLDBHandlerException):
+            handler.consult_table(
+                base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+                kwargs={'table_name': 'parameters'}
+            )
+        self.assertEqual(connect.call_count, 1)
+
+    def test_failed_checkout_is_timed(self):
+        """
+        Test that the pool checkout wait is observed even when no
+        connection could be handed out.
+        """
+        engine = MagicMock()
+        type(engine).connect = PropertyMock(side_effect=OSError("db down"))
+        handler = SQLDBHandler(engine=engine)
+        before = REGISTRY.get_sample_value('db_pool_checkout_seconds_count') or 0
+        with self.assertRaises(OSError):
+            handler.consult_table(
+                base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+                kwargs={'table_name': 'parameters'}
+            )
+        self.assertEqual(REGISTRY.get_sample_value('db_pool_checkout_seconds_count'), before + 1)
+
+    def test_readiness(self):
+        """
+        Test that a reachable database is reported ready.
+        """
+        ready, details = self.handler.readiness()
+        self.assertTrue(ready)
+        self.assertEqual(details['connect_failures'], 0)
+        self.cursor.execute.assert_called_with("SELECT 1")
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'],
+        exit=False
+    )
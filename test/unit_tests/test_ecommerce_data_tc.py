@@ -1,6 +1,7 @@
 """
 TestEcommerDataTC unit test
 """
+import hashlib
 import unittest
 import xmlrunner
 from flask import Flask, jsonify
@@ -287,6 +288,308 @@ class TestEcommerceDataTC(unittest.TestCase):
         )
         self.assertEqual(code, expected_code)
 
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_all_test_cases_page(self, patch_query):
+        """
+        Test keyset pagination on /all_test_cases.
+
+        Verifies that after_id and limit are bound as query parameters
+        and that next_after_id points at the last row of a full page.
+        """
+        rows = [[3, 'tc_3', '[]'], [4, 'tc_4', '[]']]
+        patch_query.return_value = rows
+        with self.app.test_request_context('/all_test_cases?limit=2&after_id=2'):
+            resp, code = self.api.get_all_test_cases()
+        patch_query.assert_called_once_with(
+            base_query=ConsultTableQuery.GET_PAGE_AFTER_ID,
+            kwargs={'table_name': 'parameters'},
+            params=(2, 2)
+        )
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(
+            resp.get_json(),
+            {'test_cases': rows, 'next_after_id': 4}
+        )
+        with self.app.test_request_context('/all_test_cases?limit=0'):
+            _, code = self.api.get_all_test_cases()
+        self.assertEqual(code, StatusCode.BAD_REQUEST)
+
+    @patch.object(ec_data.EcommerceDataTC, "stream_query")
+    def test_get_all_test_cases_ndjson(self, patch_stream):
+        """
+        Test the NDJSON streaming mode of /all_test_cases.
+
+        Verifies that every row is written as one JSON line and that
+        the row iterator is closed once the body has been consumed.
+        """
+        rows = Mock()
+        rows.__iter__ = Mock(return_value=iter([[1, 'tc_1', '[]'], [2, 'tc_2', '[]']]))
+        patch_stream.return_value = rows
+        with self.app.test_request_context('/all_test_cases?format=ndjson'):
+            resp = self.api.get_all_test_cases()
+            body = resp.get_data(as_text=True)
+        self.assertEqual(resp.mimetype, 'application/x-ndjson')
+        self.assertEqual(body, '[1, "tc_1", "[]"]\n[2, "tc_2", "[]"]\n')
+        rows.close.assert_called_once_with()
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_test_case_is_cached_until_delete(self, patch_query):
+        """
+        Test the read-through cache of get_test_case.
+
+        A second read of the same id is served without querying, and
+        deleting the test case by name drops both its id and name keys.
+        """
+        patch_query.return_value = [['[{"timeout": 2}]']]
+        for _ in range(2):
+            with self.app.test_request_context('/test_case?id=1'):
+                _, code = self.api.get_test_case()
+            self.assertEqual(code, StatusCode.OK)
+        patch_query.assert_called_once()
+        self.assertEqual(self.api.test_case_cache.stats()['hits'], 1)
+
+        patch_query.reset_mock()
+        patch_query.side_effect = [[(1, 'test_timeout')], 1]
+        with self.app.test_request_context('/test_case?name=test_timeout'):
+            _, code = self.api.delete_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(self.api.test_case_cache.stats()['size'], 0)
+        self.assertEqual(
+            patch_query.call_args_list[0].kwargs['base_query'],
+            ConsultTableQuery.GET_ID_AND_NAME_WHERE_COLUMN_EQUALS
+        )
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_cache_invalidated_after_write(self, patch_query):
+        """
+        Test that a row cached while an update runs, as a concurrent read
+        would do, is dropped once the update is done, renamed keys included
+        and looked up on the primary.
+        """
+        cache = self.api.test_case_cache
+
+        def update(base_query, kwargs, params=(), primary=None):
+            if base_query == ConsultTableQuery.GET_ID_AND_NAME_WHERE_COLUMN_EQUALS:
+                self.assertTrue(primary)
+                return [(1, 'test_timeout')]
+            cache.set(('id', '1'), (b'old', 'etag'))
+            cache.set(('name', 'test_timeout'), (b'old', 'etag'))
+            return 1
+        patch_query.side_effect = update
+        with self.app.test_request_context('/test_case?id=1', method='PUT', data={'name': 'renamed'}):
+            _, code = self.api.update_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertIsNone(cache.get(('id', '1')))
+        self.assertIsNone(cache.get(('name', 'test_timeout')))
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_test_cases_batch(self, patch_query):
+        """
+        Test the batch lookup endpoint.
+
+        Ids and names are resolved with one IN query per column, the
+        response is keyed by the requested identifier and unknown ones
+        are marked as not found.
+        """
+        self.api.db_handler.param_symbol = "%s"
+        patch_query.side_effect = [
+            [(1, 'tc_1', '[1]')],
+            [(2, 'tc_2', '[2]')],
+        ]
+        payload = {'ids': [1, 7], 'names': ['tc_2']}
+        with self.app.test_request_context('/test_cases', method='POST', json=payload):
+            resp, code = self.api.get_test_cases()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(resp.get_json(), {
+            'ids': {'1': {'found': True, 'params': '[1]'}, '7': {'found': False}},
+            'names': {'tc_2': {'found': True, 'params': '[2]'}},
+        })
+        self.assertEqual(
+            patch_query.call_args_list[0].kwargs,
+            {
+                'base_query': ConsultTableQuery.WHERE_COLUMN_IN,
+                'kwargs': {'table_name': 'parameters', 'column': 'id', 'placeholders': '%s,%s'},
+                'params': [1, 7],
+            }
+        )
+        with self.app.test_request_context('/test_cases?id=one'):
+            _, code = self.api.get_test_cases()
+        self.assertEqual(code, StatusCode.BAD_REQUEST)
+
+    @patch.object(ec_data.EcommerceDataTC, "bulk_insert")
+    def test_post_test_cases_bulk(self, patch_bulk):
+        """
+        Test the bulk create endpoint with an NDJSON body.
+
+        Invalid rows are reported by index and left out, valid rows are
+        inserted in one call and returned with their new ids.
+        """
+        patch_bulk.return_value = {'ids': [10, 11]}
+        body = "\n".join([
+            '{"name": "tc_a", "params": [{"timeout": 1}]}',
+            '{"name": "12", "params": []}',
+            '{"name": "tc_b", "params": {"user": "x"}}',
+        ])
+        with self.app.test_request_context(
+                '/test_cases/bulk',
+                method='POST',
+                data=body,
+                content_type='application/x-ndjson'):
+            resp, code = self.api.post_test_cases_bulk()
+        self.assertEqual(code, StatusCode.CREATED)
+        patch_bulk.assert_called_once_with(
+            table_name='parameters',
+            data=[
+                {'name': 'tc_a', 'params': [{'timeout': 1}]},
+                {'name': 'tc_b', 'params': {'user': 'x'}},
+            ],
+            chunk_size=self.api.BULK_CHUNK_SIZE
+        )
+        self.assertEqual(resp.get_json(), {
+            'created': [
+                {'index': 0, 'name': 'tc_a', 'id': 10},
+                {'index': 2, 'name': 'tc_b', 'id': 11},
+            ],
+            'errors': [{'index': 1, 'message': 'Name should be a string'}],
+        })
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_test_case_etag(self, patch_query):
+        """
+        Test ETag handling of get_test_case.
+
+        The ETag of a full read matches the one derived from MySQL's
+        md5(params), so a conditional request is answered with 304 after
+        the checksum query alone.
+        """
+        params = '[{"timeout": 2}]'
+        self.api.test_case_cache.max_size = 0
+        patch_query.return_value = [(params,)]
+        with self.app.test_request_context('/test_case?id=1'):
+            resp, code = self.api.get_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        etag, _ = resp.get_etag()
+
+        patch_query.reset_mock()
+        patch_query.return_value = [(hashlib.md5(params.encode()).hexdigest(),)]
+        headers = {'If-None-Match': f'"{etag}"'}
+        with self.app.test_request_context('/test_case?id=1', headers=headers):
+            resp, code = self.api.get_test_case()
+        self.assertEqual(code, StatusCode.NOT_MODIFIED)
+        patch_query.assert_called_once_with(
+            base_query=ConsultTableQuery.PARAMS_CHECKSUM_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'id'},
+            params=('1',)
+        )
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_all_test_cases_etag(self, patch_query):
+        """
+        Test that /all_test_cases answers 304 when the body hash matches
+        the request's If-None-Match.
+        """
+        patch_query.return_value = [[1, 'tc_1', '[]']]
+        with self.app.test_request_context('/all_test_cases'):
+            resp, code = self.api.get_all_test_cases()
+        etag, _ = resp.get_etag()
+        headers = {'If-None-Match': f'"{etag}"'}
+        with self.app.test_request_context('/all_test_cases', headers=headers):
+            resp, code = self.api.get_all_test_cases()
+        self.assertEqual(code, StatusCode.NOT_MODIFIED)
+        self.assertEqual(resp.get_etag(), (etag, False))
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_get_test_case_json_path(self, patch_query):
+        """
+        Test get_test_case with index/path projection.
+
+        Ensures the JSON path is bound as a parameter of the json_extract
+        query, the cache is bypassed and bad paths are rejected up front.
+        """
+        patch_query.return_value = [('500',)]
+        url = '/test_case?name=test_case_cart&index=0&path=expected_price'
+        with self.app.test_request_context(url):
+            resp, code = self.api.get_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(resp.get_json(), [['500']])
+        patch_query.assert_called_once_with(
+            base_query=ConsultTableQuery.JSON_PATH_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('$[0].expected_price', 'test_case_cart')
+        )
+        self.assertEqual(self.api.test_case_cache.stats()['size'], 0)
+
+        patch_query.reset_mock()
+        for url in ['/test_case?id=1&index=a', '/test_case?id=1&path=$.a;drop']:
+            with self.app.test_request_context(url):
+                resp, code = self.api.get_test_case()
+            self.assertEqual(code, StatusCode.BAD_REQUEST)
+        patch_query.assert_not_called()
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_patch_test_case(self, patch_query):
+        """
+        Test patch_test_case with path operations.
+
+        Ensures the operations become one nested JSON_* expression whose
+        paths and values are bound, and invalid operations are rejected.
+        """
+        # Cache invalidation lookup, then the UPDATE
+        patch_query.side_effect = [[], 1]
+        operations = [
+            {'op': 'set', 'path': '[0].timeout', 'value': 30},
+            {'op': 'remove', 'path': '$[1]'},
+        ]
+        with self.app.test_request_context('/test_case?id=1', method='PATCH', json=operations):
+            resp, code = self.api.patch_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        patch_query.assert_called_with(
+            base_query=ModifyTableQuery.PATCH_PARAMS_WHERE_COLUMN_EQUALS,
+            kwargs={
+                'table_name': 'parameters',
+                'params_expression': "json_remove(json_set(params, ?, cast(? as json)), ?)",
+                'column': 'id'
+            },
+            params=['$[0].timeout', '30', '$[1]', '1']
+        )
+
+        patch_query.reset_mock()
+        for body in [[{'op': 'move', 'path': '$'}], [{'op': 'set', 'path': '$[*]', 'value': 1}],
+                     [{'op': 'set', 'path': '$.a'}], [{'op': 'remove', 'path': '$'}], []]:
+            with self.app.test_request_context('/test_case?id=1', method='PATCH', json=body):
+                resp, code = self.api.patch_test_case()
+            self.assertEqual(code, StatusCode.BAD_REQUEST)
+        patch_query.assert_not_called()
+
+    @patch.object(ec_data.EcommerceDataTC, "query")
+    def test_merge_patch_test_case(self, patch_query):
+        """
+        Test patch_test_case with a JSON merge patch document.
+        """
+        patch_query.side_effect = [[], 1]
+        with self.app.test_request_context('/test_case?name=test_case_cart', method='PATCH',
+                                           data='{"timeout": null}', content_type='application/merge-patch+json'):
+            resp, code = self.api.patch_test_case()
+        self.assertEqual(code, StatusCode.OK)
+        self.assertEqual(patch_query.call_args.kwargs['kwargs']['params_expression'],
+                         "json_merge_patch(params, cast(? as json))")
+        self.assertEqual(patch_query.call_args.kwargs['params'], ['{"timeout": null}', 'test_case_cart'])
+
+
+    def test_livez_and_readyz(self):
+        """
+        Test that /livez always answers while /readyz reflects the
+        database readiness reported by the handler.
+        """
+        client = self.app.test_client()
+        self.assertEqual(client.get('/livez').status_code, StatusCode.OK)
+        with patch.object(self.api.db_handler, "readiness", return_value=(True, {})):
+            self.assertEqual(client.get('/readyz').status_code, StatusCode.OK)
+        details = {'connect_failures': 3, 'error': 'db down'}
+        with patch.object(self.api.db_handler, "readiness", return_value=(False, details)):
+            resp = client.get('/readyz')
+        self.assertEqual(resp.status_code, StatusCode.SERVICE_UNAVAILABLE)
+        self.assertEqual(resp.get_json()['status'], 'unavailable')
 
 if __name__ == '__main__':
     # Specify the output directory for the XML reports
@@ -0,0 +1,184 @@
+"""
+TestGroupCommitQueue unit test
+"""
+import unittest
+import xmlrunner
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPoolException
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, SQLDBHandler, SQLDBHandlerException
+from input_data_test_cases.mysql_api.sqlite_engine import SQLiteEngine
+from input_data_test_cases.mysql_api.group_commit import GroupCommitException, GroupCommitQueue
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    ecommerce_data_tc as ec_data
+)
+
+TABLE = {
+    'name': 'parameters',
+    'columns': [
+        {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+        {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+        {'name': 'params', 'type': 'json'},
+    ],
+    'indexes': [{'name': 'uq_parameters_name', 'unique': True, 'columns': ['name']}],
+}
+
+
+class TestGroupCommitQueue(unittest.TestCase):
+    """
+    Unit tests for GroupCommitQueue batching on an in-memory SQLite database.
+    """
+
+    def setUp(self):
+        """
+        Create the parameters table and a queue with a wide latency window.
+        """
+        self.engine = SQLiteEngine()
+        self.handler = SQLDBHandler(engine=self.engine)
+        self.handler.create_db(table_name='parameters', columns=TABLE['columns'], indexes=TABLE['indexes'])
+        self.queue = GroupCommitQueue(
+            db_handler=self.handler,
+            table_name='parameters',
+            max_batch_size=8,
+            max_latency=0.2
+        )
+
+    def tearDown(self):
+        """
+        Stop the flusher and close the database.
+        """
+        self.queue.close()
+        self.handler.close()
+        self.engine.close()
+
+    def row_count(self):
+        return len(self.handler.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'}
+        ))
+
+    def test_invalid_bounds(self):
+        """
+        A batch size below one is rejected.
+        """
+        with self.assertRaises(GroupCommitException):
+            GroupCommitQueue(db_handler=self.handler, table_name='parameters', max_batch_size=0)
+
+    def test_concurrent_inserts_are_batched(self):
+        """
+        Concurrent submits share multi-row inserts and each get their id.
+        """
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            ids = list(pool.map(
+                lambda i: self.queue.submit({'name': f"case_{i}", 'params': '[]'}),
+                range(16)
+            ))
+        self.assertEqual(sorted(ids), list(range(1, 17)))
+        self.assertEqual(self.row_count(), 16)
+        stats = self.queue.stats()
+        self.assertEqual(stats['rows'], 16)
+        self.assertLess(stats['batches'], 16)
+        self.assertLessEqual(stats['last_batch_size'], 8)
+
+    def test_failed_row_isolated(self):
+        """
+        A row breaking the unique index only fails its own caller.
+        """
+        self.queue.submit({'name': 'taken', 'params': '[]'})
+
+        def submit(name):
+            try:
+                return self.queue.submit({'name': name, 'params': '[]'})
+            except GroupCommitException:
+                return None
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(submit, ['a', 'taken', 'b', 'c']))
+        self.assertIsNone(results[1])
+        self.assertTrue(all(results[i] for i in (0, 2, 3)))
+        self.assertEqual(self.row_count(), 4)
+        self.assertEqual(self.queue.stats()['failed_rows'], 1)
+
+    def test_transient_error_fails_fast(self):
+        """
+        A batch failing for another reason than a constraint fails all its
+        callers at once with the same error, without retrying row by row.
+        """
+        try:
+            raise ConnectionPoolException("Timed out waiting for a connection")
+        except ConnectionPoolException as e:
+            wrapped = SQLDBHandlerException("Bulk insert failed after 0 committed rows")
+            wrapped.__cause__ = e
+        for error in (wrapped, ConnectionPoolException("Timed out waiting for a connection")):
+            with patch.object(self.handler, 'insert_many', side_effect=error) as insert_many:
+                def submit(name):
+                    try:
+                        return self.queue.submit({'name': name, 'params': '[]'})
+                    except GroupCommitException as e:
+                        return str(e)
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    results = list(pool.map(submit, ['a', 'b', 'c', 'd']))
+            self.assertEqual(set(results), {"Unable to insert rows: Timed out waiting for a connection"})
+            self.assertEqual(sum(len(c.kwargs['data']) for c in insert_many.call_args_list), 4)
+        stats = self.queue.stats()
+        self.assertEqual(stats['fallbacks'], 0)
+        self.assertEqual(stats['failed_rows'], 8)
+
+    def test_closed_queue(self):
+        """
+        A closed queue refuses new rows.
+        """
+        self.queue.close()
+        with self.assertRaises(GroupCommitException):
+            self.queue.submit({'name': 'late', 'params': '[]'})
+
+
+class TestGroupCommitApi(unittest.TestCase):
+    """
+    POST /test_case through the group commit queue.
+    """
+
+    def setUp(self):
+        """
+        Build the API on SQLite with GROUP_COMMIT enabled.
+        """
+        self.api = ec_data.EcommerceDataTC(config={
+            'DB_ENGINE': 'sqlite',
+            'GROUP_COMMIT': True,
+            'GROUP_COMMIT_MAX_LATENCY': 0.001,
+        })
+        self.api.db_handler.create_db(table_name='parameters', columns=TABLE['columns'], indexes=TABLE['indexes'])
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Stop the flusher and close the pool.
+        """
+        self.api.write_queue.close()
+        self.api.db_handler.close()
+        self.api.client.close()
+
+    def test_post_test_case(self):
+        """
+        Queued posts are readable once acknowledged, duplicates are refused.
+        """
+        resp = self.client.post('/test_case', json={'name': 'queued', 'params': [{'a': 1}]})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.get('/test_case', query_string={'name': 'queued'})
+        self.assertEqual(len(resp.get_json()), 1)
+        resp = self.client.post('/test_case', json={'name': 'queued', 'params': []})
+        self.assertEqual(resp.status_code, StatusCode.NOT_FOUND)
+        stats = self.client.get('/group_commit_stats').get_json()
+        self.assertEqual(stats['rows'], 1)
+        self.assertEqual(stats['failed_rows'], 1)
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
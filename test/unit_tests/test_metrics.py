@@ -0,0 +1,105 @@
+"""
+TestMetrics unit test
+"""
+import unittest
+import xmlrunner
+from unittest.mock import MagicMock
+from flask import Flask
+from prometheus_client import REGISTRY
+from input_data_test_cases.metrics import RequestMetrics
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, SQLDBHandler
+
+
+def sample(name, **labels):
+    """
+    Current value of a sample in the default registry, 0 when missing.
+    """
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Unit test suite for the request and database metrics.
+
+    These tests validate that requests are counted per route template
+    and status, that in-flight requests are released and that SQL
+    statements are timed per query member.
+    """
+
+    def setUp(self):
+        """
+        Build a Flask app instrumented with RequestMetrics.
+        """
+        self.app = Flask(__name__)
+        self.metrics = RequestMetrics(self.app)
+
+        @self.app.route('/items/<int:item_id>')
+        def item(item_id):
+            return {'id': item_id}
+
+        @self.app.route('/metrics')
+        def metrics():
+            body, content_type = self.metrics.render()
+            return self.app.response_class(body, content_type=content_type)
+
+        self.client = self.app.test_client()
+
+    def test_requests_are_counted_per_route(self):
+        """
+        Test that requests are labelled with the route template rather
+        than the concrete url, and unknown urls share one label.
+        """
+        labels = {'method': 'GET', 'route': '/items/<int:item_id>', 'status': '200'}
+        before = sample('http_requests_total', **labels)
+        before_unmatched = sample('http_requests_total', method='GET', route='unmatched', status='404')
+        self.client.get('/items/1')
+        self.client.get('/items/2')
+        self.client.get('/does/not/exist')
+        self.assertEqual(sample('http_requests_total', **labels), before + 2)
+        self.assertEqual(
+            sample('http_requests_total', method='GET', route='unmatched', status='404'),
+            before_unmatched + 1
+        )
+        self.assertGreaterEqual(sample('http_request_duration_seconds_count', **labels), 2)
+        self.assertEqual(sample('http_requests_in_flight', method='GET'), 0)
+
+    def test_metrics_endpoint(self):
+        """
+        Test that /metrics answers in the Prometheus text format.
+        """
+        resp = self.client.get('/metrics')
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content_type.startswith('text/plain'))
+        self.assertIn(b'# TYPE http_request_duration_seconds histogram', resp.data)
+
+    def test_db_queries_are_timed(self):
+        """
+        Test that SQL statements are timed per query member and that the
+        rows returned by consult queries are observed.
+        """
+        engine = MagicMock()
+        cursor = engine.connect.cursor.return_value
+        handler = SQLDBHandler(engine=engine)
+        cursor.fetchall.return_value = [('[]',), ('[]',)]
+        query = ConsultTableQuery.WHERE_COLUMN_EQUALS.name
+        before = sample('db_query_duration_seconds_count', query=query, status='ok')
+        before_rows = sample('db_query_rows_sum', query=query)
+        handler.consult_table(
+            base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('tc',)
+        )
+        self.assertEqual(sample('db_query_duration_seconds_count', query=query, status='ok'), before + 1)
+        self.assertEqual(sample('db_query_rows_sum', query=query), before_rows + 2)
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,258 @@
+"""
+TestReplicaRouter unit test
+"""
+import time
+import unittest
+import xmlrunner
+from unittest.mock import Mock, patch
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.db_handler import SQLDBHandlerException
+from input_data_test_cases.mysql_api.connection_pool import ConnectionPoolException
+from input_data_test_cases.mysql_api.replicas import ReplicaRouter, ReplicaRouterException
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    ecommerce_data_tc as ec_data
+)
+
+
+class FakeOperationalError(Exception):
+    pass
+
+
+def fake_handler(in_use=0, retry_in_seconds=0):
+    handler = Mock()
+    handler.dialect.OperationalError = FakeOperationalError
+    handler.connect_state.return_value = {'retry_in_seconds': retry_in_seconds}
+    handler.pool_stats.return_value = {'in_use': in_use}
+    return handler
+
+
+def unreachable(handler):
+    try:
+        raise ConnectionPoolException("Timed out")
+    except ConnectionPoolException as e:
+        raise SQLDBHandlerException("Unable to perform research") from e
+
+
+class TestReplicaRouter(unittest.TestCase):
+    """
+    Unit tests for ReplicaRouter reader selection and failover.
+    """
+
+    def setUp(self):
+        """
+        A primary and two replicas on a controllable clock.
+        """
+        self.now = 1000.0
+        self.primary = fake_handler()
+        self.replica_a = fake_handler(in_use=3)
+        self.replica_b = fake_handler(in_use=1)
+        self.router = ReplicaRouter(
+            primary=self.primary,
+            replicas={'a': self.replica_a, 'b': self.replica_b},
+            retry_seconds=30,
+            clock=lambda: self.now
+        )
+
+    def test_unknown_strategy(self):
+        """
+        Only the known strategies are accepted.
+        """
+        with self.assertRaises(ReplicaRouterException):
+            ReplicaRouter(primary=self.primary, strategy='random')
+
+    def test_round_robin(self):
+        """
+        Reads alternate between the replicas, the primary is last.
+        """
+        first = [name for name, _ in self.router.readers()]
+        second = [name for name, _ in self.router.readers()]
+        self.assertEqual(first, ['a', 'b', None])
+        self.assertEqual(second, ['b', 'a', None])
+
+    def test_least_loaded(self):
+        """
+        least_loaded prefers the replica with fewer connections in use.
+        """
+        router = ReplicaRouter(
+            primary=self.primary,
+            replicas={'a': self.replica_a, 'b': self.replica_b},
+            strategy='least_loaded'
+        )
+        self.assertEqual([name for name, _ in router.readers()], ['b', 'a', None])
+
+    def test_no_replicas(self):
+        """
+        Without replicas every read runs on the primary.
+        """
+        router = ReplicaRouter(primary=self.primary)
+        self.assertIs(router.read(lambda handler: handler), self.primary)
+        self.assertEqual(router.stats()['primary_reads'], 1)
+
+    def test_failover(self):
+        """
+        An unreachable replica is skipped for retry_seconds.
+        """
+        result = self.router.read(lambda handler: unreachable(handler) if handler is self.replica_a else handler)
+        self.assertIs(result, self.replica_b)
+        stats = self.router.stats()
+        self.assertEqual(stats['failovers'], 1)
+        self.assertEqual(stats['replicas']['a']['down_for_seconds'], 30)
+        self.assertEqual([name for name, _ in self.router.readers()], ['b', None])
+        self.now += 31
+        self.assertIn('a', [name for name, _ in self.router.readers()])
+
+    def test_failover_to_primary(self):
+        """
+        With every replica down the read runs on the primary.
+        """
+        result = self.router.read(lambda handler: handler if handler is self.primary else unreachable(handler))
+        self.assertIs(result, self.primary)
+        self.assertEqual(self.router.stats()['failovers'], 2)
+
+    def test_query_error_not_failed_over(self):
+        """
+        Errors unrelated to the connection reach the caller.
+        """
+        def failing(handler):
+            raise SQLDBHandlerException("Missing template argument")
+        with self.assertRaises(SQLDBHandlerException):
+            self.router.read(failing)
+        self.assertEqual(self.router.stats()['failovers'], 0)
+
+    def test_backoff_skipped(self):
+        """
+        A replica in its reconnect backoff is not tried.
+        """
+        self.replica_a.connect_state.return_value = {'retry_in_seconds': 2.5}
+        self.assertEqual([name for name, _ in self.router.readers()], ['b', None])
+
+    def test_untracked_replica(self):
+        """
+        A replica added after the router was built is read from.
+        """
+        replica_c = fake_handler()
+        self.router.replicas = {'c': replica_c}
+        self.assertIs(self.router.read(lambda handler: handler), replica_c)
+        self.assertEqual(self.router.stats()['replicas']['c']['reads'], 1)
+
+    def test_pinned_read(self):
+        """
+        primary=True bypasses the replicas.
+        """
+        self.assertIs(self.router.read(lambda handler: handler, primary=True), self.primary)
+        self.assertEqual(self.router.stats()['pinned_reads'], 1)
+
+
+class TestReplicaSetup(unittest.TestCase):
+    """
+    Replica handlers built by MysqlApi from its config.
+    """
+
+    @patch("input_data_test_cases.mysql_api.mysql_api.MySQL")
+    def test_replicas_from_config(self, mock_mysql):
+        """
+        Every MYSQL_REPLICAS entry gets its own engine bound to its host.
+        """
+        api = ec_data.EcommerceDataTC(config={
+            'MYSQL_HOST': 'primary',
+            'MYSQL_PORT': 3306,
+            'MYSQL_REPLICAS': [{'MYSQL_HOST': 'replica1'}, {'MYSQL_HOST': 'replica2', 'MYSQL_PORT': 3307}],
+            'MYSQL_REPLICA_STRATEGY': 'least_loaded',
+        })
+        self.assertEqual(list(api.replica_router.replicas), ['replica1:3306', 'replica2:3307'])
+        self.assertEqual(api.replica_router.strategy, 'least_loaded')
+        replica_app = mock_mysql.call_args_list[-1].args[0]
+        self.assertEqual(replica_app.config['MYSQL_HOST'], 'replica2')
+        self.assertEqual(replica_app.config['MYSQL_PORT'], 3307)
+
+
+class TestReadYourWrites(unittest.TestCase):
+    """
+    Read-your-writes cookie handling in MysqlApi.
+    """
+
+    def setUp(self):
+        """
+        Build the API on SQLite with a 5 seconds read-your-writes window.
+        """
+        self.api = ec_data.EcommerceDataTC(config={'DB_ENGINE': 'sqlite', 'MYSQL_READ_YOUR_WRITES_SECONDS': 5})
+        self.api.db_handler.create_db(
+            table_name='parameters',
+            columns=[
+                {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+                {'name': 'name', 'type': 'VARCHAR'},
+                {'name': 'params', 'type': 'json'},
+            ]
+        )
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Close the pool.
+        """
+        self.api.db_handler.close()
+        self.api.client.close()
+
+    def test_write_sets_cookie(self):
+        """
+        A write response pins the client's next reads to the primary.
+        """
+        resp = self.client.post('/test_case', json={'name': 'rw_case', 'params': []})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        cookie = self.client.get_cookie(self.api.READ_YOUR_WRITES_COOKIE)
+        self.assertGreater(float(cookie.value), time.time())
+        with patch.object(self.api.replica_router, 'read', wraps=self.api.replica_router.read) as read:
+            self.client.get('/test_case', query_string={'name': 'rw_case'})
+            self.assertTrue(read.call_args.kwargs['primary'])
+
+    def test_forged_cookie_ignored(self):
+        """
+        A cookie further out than the window is not honoured.
+        """
+        self.client.set_cookie(self.api.READ_YOUR_WRITES_COOKIE, str(time.time() + 3600))
+        with patch.object(self.api.replica_router, 'read', wraps=self.api.replica_router.read) as read:
+            self.client.get('/test_case', query_string={'name': 'rw_case'})
+            self.assertFalse(read.call_args.kwargs['primary'])
+
+    def test_read_your_writes_skips_cache(self):
+        """
+        A pinned read is answered by the primary, ignoring the cached row,
+        and fills the cache; a read served by a replica is not cached.
+        """
+        replica = fake_handler()
+        replica.consult_table.return_value = [('["from replica"]',)]
+        self.api.replica_router = ReplicaRouter(primary=self.api.db_handler, replicas={'replica:3306': replica})
+        self.client.post('/test_case', json={'name': 'rw_case', 'params': [1]})
+        self.api.test_case_cache.set(('name', 'rw_case'), (b'[["[]"]]', 'stale'))
+        resp = self.client.get('/test_case', query_string={'name': 'rw_case'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(resp.get_json(), [['[1]']])
+        replica.consult_table.assert_not_called()
+        self.assertNotEqual(self.api.test_case_cache.get(('name', 'rw_case'))[1], 'stale')
+
+        self.client.delete_cookie(self.api.READ_YOUR_WRITES_COOKIE)
+        self.api.test_case_cache.clear()
+        resp = self.client.get('/test_case', query_string={'name': 'rw_case'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(resp.get_json(), [['["from replica"]']])
+        self.assertIsNone(self.api.test_case_cache.get(('name', 'rw_case')))
+
+    def test_reads_without_write(self):
+        """
+        Reads are not pinned and no cookie is set without a write.
+        """
+        resp = self.client.get('/replica_stats')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(resp.get_json()['replicas'], {})
+        self.assertIsNone(self.client.get_cookie(self.api.READ_YOUR_WRITES_COOKIE))
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,103 @@
+"""
+TestSerializers unit test
+"""
+import json
+import unittest
+import datetime
+import xmlrunner
+from decimal import Decimal
+from unittest.mock import patch
+from input_data_test_cases import serializers
+from input_data_test_cases.serializers import (
+    JSONSerializer,
+    OrjsonSerializer,
+    RawJSON,
+    SerializerException,
+    get_serializer
+)
+
+
+class TestSerializers(unittest.TestCase):
+    """
+    Unit test suite for the pluggable JSON serializers.
+
+    These tests validate that every backend produces the same JSON,
+    splices pre-encoded fragments verbatim and that the factory picks
+    and rejects backends as expected.
+    """
+
+    def backends(self):
+        """
+        Serializers available in this environment.
+        """
+        backends = [JSONSerializer()]
+        if serializers.orjson is not None:
+            backends.append(OrjsonSerializer())
+        return backends
+
+    def test_dumps_round_trip(self):
+        """
+        Test that plain payloads, including values the json module can not
+        encode natively, decode back to the expected structure.
+        """
+        payload = {
+            'name': 'test_case_dummy',
+            'price': Decimal('1.50'),
+            'day': datetime.date(2024, 1, 2),
+            'params': [{'timeout': 10}, {'timeout': 20}],
+        }
+        expected = {
+            'name': 'test_case_dummy',
+            'price': '1.50',
+            'day': '2024-01-02',
+            'params': [{'timeout': 10}, {'timeout': 20}],
+        }
+        for serializer in self.backends():
+            encoded = serializer.dumps(payload)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(json.loads(encoded), expected)
+
+    def test_dumps_raw_json(self):
+        """
+        Test that RawJSON fragments are written as is, wherever they sit
+        in the payload.
+        """
+        params = b'[{"timeout": 10}]'
+        payload = [{'params': RawJSON(params), 'name': 'tc'}, RawJSON('3')]
+        for serializer in self.backends():
+            encoded = serializer.dumps(payload)
+            self.assertIn(params, encoded)
+            self.assertEqual(json.loads(encoded), [{'params': [{'timeout': 10}], 'name': 'tc'}, 3])
+
+    def test_raw_json_token_in_user_strings(self):
+        """
+        Test that user strings never get replaced by fragments.
+        """
+        for serializer in self.backends():
+            encoded = serializer.dumps({'a': RawJSON('1'), 'b': '0'})
+            self.assertEqual(json.loads(encoded), {'a': 1, 'b': '0'})
+
+    def test_get_serializer(self):
+        """
+        Test backend selection by name and the auto fallback when orjson
+        is not installed.
+        """
+        self.assertIsInstance(get_serializer('json'), JSONSerializer)
+        with patch.object(serializers, 'orjson', None):
+            self.assertEqual(get_serializer('auto').name, 'json')
+            with self.assertRaises(SerializerException):
+                get_serializer('orjson')
+        with self.assertRaises(SerializerException):
+            get_serializer('yaml')
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,83 @@
+"""
+TestSlowQueryLog unit test
+"""
+import os
+import json
+import tempfile
+import unittest
+import xmlrunner
+from input_data_test_cases.mysql_api.slow_queries import SlowQueryLog
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    """
+    Unit test suite for the SlowQueryLog ring buffer.
+
+    These tests validate the threshold, the bounded buffer, the JSONL
+    mirror and which statements get an EXPLAIN plan.
+    """
+
+    def setUp(self):
+        """
+        Create a two entry log mirrored to a temporary JSONL file.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'slow_queries.jsonl')
+        self.log = SlowQueryLog(threshold_seconds=0.5, max_entries=2, path=self.path, clock=lambda: 100.0)
+
+    def tearDown(self):
+        """
+        Remove the temporary JSONL file.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_threshold(self):
+        """
+        Test that only durations at or over the threshold are slow and
+        that a None threshold disables the log.
+        """
+        self.assertFalse(self.log.is_slow(0.49))
+        self.assertTrue(self.log.is_slow(0.5))
+        self.assertFalse(SlowQueryLog(threshold_seconds=None).is_slow(10))
+
+    def test_ring_buffer_and_jsonl_mirror(self):
+        """
+        Test that the buffer keeps the latest entries while the JSONL
+        file keeps every one of them, without parameter values.
+        """
+        for rows in range(3):
+            self.log.record(
+                query='WHERE_COLUMN_EQUALS',
+                statement='select params from parameters where name = %s',
+                params=('secret_name',),
+                seconds=0.75,
+                rows=rows
+            )
+        self.assertEqual([e['rows'] for e in self.log.entries()], [1, 2])
+        self.assertEqual(self.log.stats()['recorded'], 3)
+        with open(self.path, encoding='utf-8') as log_file:
+            lines = [json.loads(line) for line in log_file]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]['param_shapes'], ['str(11)'])
+        self.assertNotIn('secret_name', json.dumps(lines))
+
+    def test_wants_plan(self):
+        """
+        Test that only SELECT, UPDATE and DELETE statements are explained.
+        """
+        self.assertTrue(self.log.wants_plan('select * from parameters'))
+        self.assertTrue(self.log.wants_plan('UPDATE parameters set name = %s where id = %s'))
+        self.assertFalse(self.log.wants_plan('INSERT INTO parameters (name) VALUES (%s)'))
+        self.assertFalse(SlowQueryLog(explain=False).wants_plan('select 1'))
+
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
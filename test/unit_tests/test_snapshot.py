@@ -0,0 +1,267 @@
+"""
+TestTableSnapshot unit test
+"""
+import json
+import unittest
+import xmlrunner
+from unittest.mock import patch
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.db_handler import ConsultTableQuery, ModifyTableQuery, SQLDBHandler
+from input_data_test_cases.mysql_api.sqlite_engine import SQLiteEngine
+from input_data_test_cases.mysql_api.snapshot import TableSnapshot, TableSnapshotException
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    ecommerce_data_tc as ec_data
+)
+
+TABLE = {
+    'name': 'parameters',
+    'columns': [
+        {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+        {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+        {'name': 'params', 'type': 'json'},
+    ],
+    'indexes': [{'name': 'uq_parameters_name', 'unique': True, 'columns': ['name']}],
+}
+DATA = [{'name': f"case_{i}", 'params': [{'timeout': i}]} for i in range(10)]
+
+
+class TestTableSnapshot(unittest.TestCase):
+    """
+    Unit tests for TableSnapshot loading and incremental reloads, run on an
+    in-memory SQLite database.
+    """
+
+    def setUp(self):
+        """
+        Fill the table and build a snapshot storing the raw params.
+        """
+        self.engine = SQLiteEngine()
+        self.handler = SQLDBHandler(engine=self.engine)
+        self.handler.init_database(table=TABLE, data=DATA, bulk=True)
+        self.snapshot = TableSnapshot(
+            db_handler=self.handler,
+            table_name='parameters',
+            encode_params=json.loads
+        )
+
+    def tearDown(self):
+        """
+        Stop the poller and close the database.
+        """
+        self.snapshot.stop()
+        self.handler.close()
+        self.engine.close()
+
+    def update_params(self, row_id, params):
+        self.handler.modify_table(
+            ModifyTableQuery.UPDATE_VALUE_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'updates': 'params = ?', 'column': 'id'},
+            params=(json.dumps(params), row_id)
+        )
+
+    def test_invalid_poll_interval(self):
+        """
+        A non positive poll interval is rejected.
+        """
+        with self.assertRaises(TableSnapshotException):
+            TableSnapshot(db_handler=self.handler, table_name='parameters', encode_params=str, poll_seconds=0)
+
+    def test_full_load(self):
+        """
+        The first refresh loads every row, indexed by id and by name.
+        """
+        self.assertIsNone(self.snapshot.get('id', '1'))
+        self.assertTrue(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.get('id', '3'), [{'timeout': 2}])
+        self.assertEqual(self.snapshot.get('name', 'case_9'), [{'timeout': 9}])
+        self.assertIsNone(self.snapshot.get('name', 'unknown'))
+        stats = self.snapshot.stats()
+        self.assertTrue(stats['loaded'])
+        self.assertEqual(stats['rows'], 10)
+        self.assertEqual(stats['full_reloads'], 1)
+        self.assertGreater(stats['approx_bytes'], 0)
+        self.assertIsNotNone(stats['last_reload_seconds'])
+
+    def test_unchanged_table(self):
+        """
+        Polling an unchanged table reloads nothing.
+        """
+        self.snapshot.refresh()
+        self.assertFalse(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.stats()['unchanged_polls'], 1)
+
+    def test_incremental_reload(self):
+        """
+        Only the updated, inserted and deleted rows are reloaded.
+        """
+        self.snapshot.refresh()
+        self.update_params(2, [{'timeout': 99}])
+        self.handler.insert_new_value(table_name='parameters', data=[{'name': 'case_new', 'params': []}])
+        self.handler.modify_table(
+            ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('case_0',)
+        )
+        self.assertTrue(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.get('id', 2), [{'timeout': 99}])
+        self.assertEqual(self.snapshot.get('name', 'case_new'), [])
+        self.assertIsNone(self.snapshot.get('name', 'case_0'))
+        stats = self.snapshot.stats()
+        self.assertEqual(stats['incremental_reloads'], 1)
+        self.assertEqual(stats['rows_reloaded'], 12)
+        self.assertEqual(stats['rows_deleted'], 1)
+        self.assertEqual(stats['rows'], 10)
+
+    def test_discard(self):
+        """
+        A discarded row misses until the next refresh fetches it again.
+        """
+        self.snapshot.refresh()
+        self.snapshot.discard('name', 'case_1')
+        self.assertIsNone(self.snapshot.get('id', 2))
+        self.assertTrue(self.snapshot.refresh())
+        self.assertEqual(self.snapshot.get('id', 2), [{'timeout': 1}])
+
+    def test_change_log_version(self):
+        """
+        With a change log the poll reads its head instead of checksumming
+        the table, a new head being recorded once two polls agree.
+        """
+        self.handler.create_change_log(table_name='parameters')
+        snapshot = TableSnapshot(
+            db_handler=self.handler,
+            table_name='parameters',
+            encode_params=json.loads,
+            changes_table=self.handler.change_log_table('parameters')
+        )
+        with patch.object(self.handler, 'consult_table', wraps=self.handler.consult_table) as consult:
+            self.assertTrue(snapshot.refresh())
+            self.assertTrue(snapshot.refresh())
+            self.assertFalse(snapshot.refresh())
+            self.update_params(2, [{'timeout': 99}])
+            self.assertTrue(snapshot.refresh())
+            self.assertEqual(snapshot.get('id', 2), [{'timeout': 99}])
+            self.assertTrue(snapshot.refresh())
+            self.assertFalse(snapshot.refresh())
+        queries = [call.kwargs['base_query'] for call in consult.call_args_list]
+        self.assertEqual(queries.count(ConsultTableQuery.CHANGE_LOG_HEAD), 6)
+        self.assertNotIn(ConsultTableQuery.TABLE_VERSION, queries)
+        self.assertEqual(snapshot.stats()['version'], [11, None])
+
+    def test_change_log_reload(self):
+        """
+        Once the log position is known, a reload fetches the ids logged past
+        it instead of checksumming every row, and the position only moves
+        past changes old enough to have no open write below them.
+        """
+        self.handler.create_change_log(table_name='parameters')
+        changes_table = self.handler.change_log_table('parameters')
+        snapshot = TableSnapshot(
+            db_handler=self.handler,
+            table_name='parameters',
+            encode_params=json.loads,
+            changes_table=changes_table
+        )
+        snapshot.refresh()
+        snapshot.refresh()
+        self.update_params(2, [{'timeout': 99}])
+        self.handler.modify_table(
+            ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('case_0',)
+        )
+        with patch.object(self.handler, 'consult_table', wraps=self.handler.consult_table) as consult:
+            self.assertTrue(snapshot.refresh())
+        queries = [call.kwargs['base_query'] for call in consult.call_args_list]
+        self.assertNotIn(ConsultTableQuery.ROW_CHECKSUMS, queries)
+        self.assertEqual(snapshot.get('id', 2), [{'timeout': 99}])
+        self.assertIsNone(snapshot.get('name', 'case_0'))
+        stats = snapshot.stats()
+        self.assertEqual(stats['changes_read'], 2)
+        self.assertEqual(stats['rows_deleted'], 1)
+        self.assertEqual(stats['rows'], 9)
+        # The changes are too recent for the position to move past them
+        self.assertEqual(snapshot._log_version, 10)
+        self.handler.modify_table(
+            ModifyTableQuery.UPDATE_VALUE_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': changes_table, 'updates': 'changed_at = changed_at - 10', 'column': 'version'},
+            params=(11,)
+        )
+        self.update_params(3, [{'timeout': 30}])
+        self.assertTrue(snapshot.refresh())
+        self.assertEqual(snapshot.get('id', 3), [{'timeout': 30}])
+        self.assertEqual(snapshot._log_version, 11)
+        self.assertEqual(snapshot.stats()['changes_read'], 5)
+
+
+class TestSnapshotApi(unittest.TestCase):
+    """
+    EcommerceDataTC answering single test case reads from the snapshot.
+    """
+
+    def setUp(self):
+        """
+        Build the API on SQLite with the snapshot enabled and loaded.
+        """
+        self.api = ec_data.EcommerceDataTC(config={
+            'DB_ENGINE': 'sqlite',
+            'TEST_CASE_SNAPSHOT': True,
+            'TEST_CASE_SNAPSHOT_POLL_SECONDS': 3600,
+        })
+        self.api.db_handler.init_database(table=TABLE, data=DATA, bulk=True)
+        self.api.snapshot.refresh()
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Stop the poller and close the pool.
+        """
+        self.api.snapshot.stop()
+        self.api.db_handler.close()
+        self.api.client.close()
+
+    def test_get_from_snapshot(self):
+        """
+        Reads are served from memory with the same body and ETag as the
+        database path.
+        """
+        resp = self.client.get('/test_case', query_string={'name': 'case_4'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(json.loads(resp.get_json()[0][0]), [{'timeout': 4}])
+        self.assertEqual(self.api.snapshot.stats()['hits'], 1)
+        self.api.snapshot.discard('name', 'case_4')
+        from_db = self.client.get('/test_case', query_string={'name': 'case_4'})
+        self.assertEqual(from_db.get_data(), resp.get_data())
+        self.assertEqual(from_db.headers['ETag'], resp.headers['ETag'])
+        self.api.snapshot.refresh()
+        resp = self.client.get('/test_case', query_string={'id': 5}, headers={'If-None-Match': resp.headers['ETag']})
+        self.assertEqual(resp.status_code, StatusCode.NOT_MODIFIED)
+
+    def test_update_is_visible(self):
+        """
+        A local update drops the row so the next read sees the new params.
+        """
+        self.client.get('/test_case', query_string={'id': 3})
+        self.client.put('/test_case', query_string={'id': 3}, data={'params': '[{"timeout": 30}]'})
+        resp = self.client.get('/test_case', query_string={'id': 3})
+        self.assertEqual(json.loads(resp.get_json()[0][0]), [{'timeout': 30}])
+
+    def test_snapshot_stats(self):
+        """
+        /snapshot_stats reports the rows and memory held.
+        """
+        resp = self.client.get('/snapshot_stats')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(resp.get_json()['rows'], 10)
+        self.assertIn('approx_bytes', resp.get_json())
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
@@ -0,0 +1,288 @@
+"""
+TestSQLiteBackend unit test
+"""
+import os
+import json
+import hashlib
+import tempfile
+import unittest
+import xmlrunner
+from input_data_test_cases.base_api import StatusCode
+from input_data_test_cases.mysql_api.db_handler import (
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandler,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.sqlite_engine import SQLiteEngine
+from input_data_test_cases.mysql_api.ecommerce_data_test_cases import (
+    ecommerce_data_tc as ec_data
+)
+
+TABLE = {
+    'name': 'parameters',
+    'columns': [
+        {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+        {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+        {'name': 'params', 'type': 'json'},
+    ],
+    'indexes': [
+        {'name': 'uq_parameters_name', 'unique': True, 'columns': [{'name': 'name', 'length': 100}]},
+    ],
+}
+DATA = [
+    {'name': 'test_case_dummy', 'params': [{'timeout': 10}, {'timeout': 20}]},
+    {'name': 'test_case_cart', 'params': [{'article': 'T-shirt'}]},
+]
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """
+    Runs SQLDBHandler against a real in-memory SQLite database.
+    """
+
+    def setUp(self):
+        """
+        Create the parameters table and insert the sample rows.
+        """
+        self.engine = SQLiteEngine()
+        self.handler = SQLDBHandler(engine=self.engine, pool_config={'max_size': 2})
+        self.report = self.handler.init_database(table=TABLE, data=DATA, bulk=True)
+
+    def tearDown(self):
+        """
+        Close the pooled connections and the in-memory database.
+        """
+        self.handler.close()
+        self.engine.close()
+
+    def test_dialect(self):
+        """
+        SQLiteEngine selects the sqlite dialect and qmark placeholders.
+        """
+        self.assertEqual(self.handler.dialect.name, 'sqlite')
+        self.assertEqual(self.handler.param_symbol, '?')
+
+    def test_insert_many_ids(self):
+        """
+        Bulk inserts report the generated ids in input order.
+        """
+        self.assertEqual(self.report['ids'], [1, 2])
+        report = self.handler.insert_many(
+            table_name='parameters',
+            data=[{'name': f"bulk_{i}", 'params': []} for i in range(5)],
+            chunk_size=2
+        )
+        self.assertEqual(report['ids'], [3, 4, 5, 6, 7])
+
+    def test_consult_table(self):
+        """
+        Stored params are returned as JSON text.
+        """
+        rows = self.handler.consult_table(
+            base_query=ConsultTableQuery.WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('test_case_cart',)
+        )
+        self.assertEqual(json.loads(rows[0][0]), [{'article': 'T-shirt'}])
+
+    def test_json_path_and_checksum(self):
+        """
+        JSON path projection and md5 checksums behave as on MySQL.
+        """
+        fragment = self.handler.consult_table(
+            base_query=ConsultTableQuery.JSON_PATH_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'id'},
+            params=('$[1].timeout', 1)
+        )
+        self.assertEqual(fragment, [('20',)])
+        checksum = self.handler.consult_table(
+            base_query=ConsultTableQuery.PARAMS_CHECKSUM_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'id'},
+            params=(2,)
+        )
+        expected = hashlib.md5(json.dumps(DATA[1]['params']).encode()).hexdigest()
+        self.assertEqual(checksum, [(expected,)])
+
+    def test_unique_index(self):
+        """
+        The unique index is created once and enforced.
+        """
+        self.handler.create_indexes(table_name='parameters', indexes=TABLE['indexes'])
+        exists = self.handler.consult_table(
+            base_query=ConsultTableQuery.INDEX_EXISTS,
+            kwargs={},
+            params=('parameters', 'uq_parameters_name')
+        )
+        self.assertEqual(len(exists), 1)
+        with self.assertRaises(SQLDBHandlerException) as ctx:
+            self.handler.insert_new_value(table_name='parameters', data=[DATA[0]])
+        self.assertEqual(str(ctx.exception), "Value violates a table constraint")
+
+    def test_invalid_json_rejected(self):
+        """
+        The json column only accepts valid documents.
+        """
+        with self.assertRaises(SQLDBHandlerException):
+            self.handler.insert_new_value(table_name='parameters', data=[{'name': 'bad', 'params': '{oops'}])
+
+    def test_truncate_and_stream(self):
+        """
+        TRUNCATE_TABLE empties the table and streaming reads see the change.
+        """
+        self.handler.modify_table(ModifyTableQuery.TRUNCATE_TABLE, kwargs={'table_name': 'parameters'})
+        rows = list(self.handler.iter_consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'}
+        ))
+        self.assertEqual(rows, [])
+
+    def test_readiness(self):
+        """
+        The readiness probe succeeds on the embedded database.
+        """
+        ready, _ = self.handler.readiness()
+        self.assertTrue(ready)
+
+
+class TestSQLiteApi(unittest.TestCase):
+    """
+    Serves EcommerceDataTC from a SQLite file through DB_ENGINE=sqlite.
+    """
+
+    def setUp(self):
+        """
+        Build the API on a temporary WAL database holding the sample rows.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, 'ecommerce.db')
+        self.api = ec_data.EcommerceDataTC(config={'DB_ENGINE': 'sqlite', 'SQLITE_PATH': path})
+        self.api.db_handler.init_database(table=TABLE, data=DATA, bulk=True)
+        self.client = self.api.app.test_client()
+
+    def tearDown(self):
+        """
+        Close the pool and remove the database file.
+        """
+        self.api.db_handler.close()
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode(self):
+        """
+        File databases run in WAL journal mode.
+        """
+        rows = self.api.db_handler.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'pragma_journal_mode'}
+        )
+        self.assertEqual(rows, [('wal',)])
+
+    def test_test_case_routes(self):
+        """
+        Create, read, update and delete a test case over HTTP.
+        """
+        resp = self.client.post('/test_case', json={'name': 'new_case', 'params': [{'a': 1}]})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.get('/test_case', query_string={'name': 'new_case'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(json.loads(resp.get_json()[0][0]), [{'a': 1}])
+        resp = self.client.put('/test_case', query_string={'name': 'new_case'}, data={'params': '[{"a": 2}]'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.get('/test_case', query_string={'name': 'new_case', 'path': '[0].a'})
+        self.assertEqual(resp.get_json(), [['2']])
+        resp = self.client.delete('/test_case', query_string={'name': 'new_case'})
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.get('/readyz')
+        self.assertEqual(resp.status_code, StatusCode.OK)
+
+    def test_stream_query(self):
+        """
+        query(stream=True) yields the rows and frees the connection once read.
+        """
+        rows = self.api.query(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'},
+            stream=True
+        )
+        self.assertEqual(self.api.pool_stats()['in_use'], 1)
+        self.assertEqual([row[1] for row in rows], ['test_case_dummy', 'test_case_cart'])
+        self.assertEqual(self.api.pool_stats()['in_use'], 0)
+
+    def test_unread_stream_released(self):
+        """
+        An NDJSON response closed before its body is read frees the connection.
+        """
+        resp = self.client.get('/all_test_cases', query_string={'format': 'ndjson'}, buffered=False)
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        self.assertEqual(self.api.pool_stats()['in_use'], 1)
+        resp.close()
+        self.assertEqual(self.api.pool_stats()['in_use'], 0)
+
+    def test_patch_test_case(self):
+        """
+        Merge patches and path operations are applied in place by SQLite.
+        """
+        resp = self.client.patch('/test_case', query_string={'id': 1}, json=[
+            {'op': 'set', 'path': '[0].timeout', 'value': 15},
+            {'op': 'append', 'path': '$', 'value': {'timeout': 30}},
+            {'op': 'remove', 'path': '[1]'},
+        ])
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.get('/test_case', query_string={'id': 1})
+        self.assertEqual(json.loads(resp.get_json()[0][0]), [{'timeout': 15}, {'timeout': 30}])
+        resp = self.client.patch('/test_case', query_string={'id': 2}, json=[
+            {'op': 'set', 'path': '[0].size', 'value': 'M'},
+        ])
+        resp = self.client.get('/test_case', query_string={'id': 2})
+        self.assertEqual(json.loads(resp.get_json()[0][0]), [{'article': 'T-shirt', 'size': 'M'}])
+        # A merge patch object replaces a non object document (RFC 7396)
+        resp = self.client.patch(
+            '/test_case', query_string={'name': 'test_case_cart'},
+            data='{"size": "L", "color": null}', content_type='application/merge-patch+json'
+        )
+        self.assertEqual(resp.status_code, StatusCode.OK)
+        resp = self.client.patch(
+            '/test_case', query_string={'name': 'test_case_cart'},
+            data='{"size": null, "color": "red"}', content_type='application/merge-patch+json'
+        )
+        resp = self.client.get('/test_case', query_string={'id': 2})
+        self.assertEqual(json.loads(resp.get_json()[0][0]), {'color': 'red'})
+        resp = self.client.patch('/test_case', query_string={'id': 99}, json={'a': 1})
+        self.assertEqual(resp.status_code, StatusCode.NOT_FOUND)
+
+    def test_bulk_duplicate_names(self):
+        """
+        Names repeated in the batch are refused per row, names already
+        stored make the whole batch answer 409 and add nothing.
+        """
+        resp = self.client.post('/test_cases/bulk', json=[
+            {'name': 'bulk_a', 'params': []},
+            {'name': 'bulk_a', 'params': [1]},
+        ])
+        self.assertEqual(resp.status_code, StatusCode.CREATED)
+        self.assertEqual([c['index'] for c in resp.get_json()['created']], [0])
+        self.assertEqual(resp.get_json()['errors'], [
+            {'index': 1, 'message': 'Duplicate name, already given at index 0'},
+        ])
+        resp = self.client.post('/test_cases/bulk', json=[
+            {'name': 'bulk_b', 'params': []},
+            {'name': 'test_case_cart', 'params': []},
+        ])
+        self.assertEqual(resp.status_code, StatusCode.CONFLICT)
+        self.assertEqual(resp.get_json()['conflicts'], ['test_case_cart'])
+        self.assertEqual(resp.get_json()['errors'], [
+            {'index': 1, 'message': 'Test case test_case_cart already exists'},
+        ])
+        resp = self.client.get('/test_case', query_string={'name': 'bulk_b'})
+        self.assertEqual(resp.get_json(), [])
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )
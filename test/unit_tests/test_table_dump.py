@@ -0,0 +1,186 @@
+"""
+TestTableDump unit test
+"""
+import os
+import tempfile
+import unittest
+import xmlrunner
+from unittest.mock import MagicMock, patch
+from input_data_test_cases.mysql_api.db_handler import (
+    ConsultTableQuery,
+    ModifyTableQuery,
+    SQLDBHandler,
+    SQLDBHandlerException
+)
+from input_data_test_cases.mysql_api.sqlite_engine import SQLiteEngine
+from input_data_test_cases.mysql_api.table_dump import (
+    TableDumpException,
+    export_table,
+    import_table
+)
+
+COLUMNS = [
+    {'name': 'id', 'type': 'int', 'primary': True, 'auto_increment': True},
+    {'name': 'name', 'type': 'VARCHAR', 'length': 255},
+    {'name': 'params', 'type': 'json'},
+]
+DATA = [
+    {'name': 'test_case_dummy', 'params': [{'timeout': 10}, {'timeout': 20}]},
+    {'name': 'test_case_tab\tnew\nline', 'params': [{'path': 'C:\\tmp', 'text': 'caf\u00e9'}]},
+    {'name': 'test_case_null', 'params': None},
+]
+
+
+class TestTableDump(unittest.TestCase):
+    """
+    Round trips of the parameters table through each dump format on SQLite.
+    """
+
+    def setUp(self):
+        """
+        A source database holding the sample rows and an empty target one.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source_engine = SQLiteEngine()
+        self.source = SQLDBHandler(engine=self.source_engine)
+        self.source.create_db(table_name='parameters', columns=COLUMNS, indexes=[])
+        self.source.insert_many(table_name='parameters', data=DATA)
+        # Leave a hole in the ids, they have to survive the round trip
+        self.source.modify_table(
+            ModifyTableQuery.DELETE_VALUE_WHERE_COLUMN_EQUALS,
+            kwargs={'table_name': 'parameters', 'column': 'name'},
+            params=('test_case_dummy',)
+        )
+        self.target_engine = SQLiteEngine()
+        self.target = SQLDBHandler(engine=self.target_engine)
+        self.target.create_db(table_name='parameters', columns=COLUMNS, indexes=[])
+
+    def tearDown(self):
+        """
+        Close both databases and remove the dumps.
+        """
+        for handler, engine in ((self.source, self.source_engine), (self.target, self.target_engine)):
+            handler.close()
+            engine.close()
+        self.tmp_dir.cleanup()
+
+    def rows(self, handler):
+        return handler.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': 'parameters'}
+        )
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_round_trip(self):
+        """
+        Every format restores the same rows, ids and NULLs included.
+        """
+        for name in ('parameters.tcdump', 'parameters.ndjson.zst', 'parameters.ndjson'):
+            with self.subTest(name):
+                report = export_table(self.source, 'parameters', self.path(name))
+                self.assertEqual(report['rows'], 2)
+                self.assertEqual(report['bytes'], os.path.getsize(self.path(name)))
+                report = import_table(self.target, self.path(name), truncate=True)
+                self.assertEqual(report['method'], 'insert')
+                self.assertEqual(report['rows'], 2)
+                self.assertEqual(report['table'], 'parameters')
+                self.assertEqual(self.rows(self.target), self.rows(self.source))
+
+    def test_empty_table(self):
+        """
+        An empty table gives a dump holding only its header.
+        """
+        self.source.modify_table(ModifyTableQuery.TRUNCATE_TABLE, kwargs={'table_name': 'parameters'})
+        export_table(self.source, 'parameters', self.path('empty.tcdump'))
+        report = import_table(self.target, self.path('empty.tcdump'))
+        self.assertEqual(report['rows'], 0)
+        self.assertEqual(self.rows(self.target), [])
+
+    def test_not_a_dump(self):
+        """
+        Unknown extensions and foreign files are refused.
+        """
+        with self.assertRaises(TableDumpException):
+            export_table(self.source, 'parameters', self.path('parameters.csv'))
+        for name in ('bad.tcdump', 'bad.ndjson'):
+            with open(self.path(name), 'wb') as dump:
+                dump.write(b"id,name,params\n1,a,[]\n")
+            with self.assertRaises(TableDumpException):
+                import_table(self.target, self.path(name))
+        with self.assertRaises(TableDumpException):
+            import_table(self.target, self.path('bad.tcdump'), chunk_size=0)
+
+    def test_duplicate_rows(self):
+        """
+        Loading a dump twice breaks the primary key and is reported.
+        """
+        export_table(self.source, 'parameters', self.path('parameters.tcdump'))
+        import_table(self.target, self.path('parameters.tcdump'))
+        with self.assertRaises(TableDumpException):
+            import_table(self.target, self.path('parameters.tcdump'))
+
+    def test_truncate_with_change_log(self):
+        """
+        A table with a change log is emptied with DELETE so every removed
+        row leaves a tombstone, TRUNCATE firing no trigger.
+        """
+        export_table(self.source, 'parameters', self.path('parameters.tcdump'))
+        self.target.create_change_log(table_name='parameters')
+        import_table(self.target, self.path('parameters.tcdump'))
+        with patch.object(self.target, 'modify_table', wraps=self.target.modify_table) as modify_table:
+            import_table(self.target, self.path('parameters.tcdump'), truncate=True)
+        self.assertEqual(modify_table.call_args_list[0].args[0], ModifyTableQuery.DELETE_ALL_ROWS)
+        log = self.target.consult_table(
+            base_query=ConsultTableQuery.GET_ALL_COLUMNS,
+            kwargs={'table_name': self.target.change_log_table('parameters')}
+        )
+        self.assertEqual([row[3] for row in log], ['insert', 'insert', 'delete', 'delete', 'insert', 'insert'])
+        self.assertEqual(self.rows(self.target), self.rows(self.source))
+
+    def test_load_data_local(self):
+        """
+        LOAD DATA reads an escaped tab separated file; when it is refused
+        the rows are inserted instead.
+        """
+        export_table(self.source, 'parameters', self.path('parameters.tcdump'))
+        handler = MagicMock()
+        handler.dialect.load_data_local = True
+        handler.dialect.string_literal = lambda value: f"'{value}'"
+        loaded = []
+
+        def load_data(base_query, kwargs, params=()):
+            if base_query == ModifyTableQuery.LOAD_DATA_LOCAL_INFILE:
+                with open(kwargs['path'].strip("'"), encoding='utf-8') as tsv:
+                    loaded.append(tsv.read())
+                self.assertEqual(kwargs['columns'], 'id,name,params')
+            return 2
+        handler.modify_table.side_effect = load_data
+        report = import_table(handler, self.path('parameters.tcdump'))
+        self.assertEqual(report['method'], 'load_data')
+        lines = loaded[0].split("\n")
+        self.assertEqual(lines[0].split("\t")[:2], ['2', 'test_case_tab\\tnew\\nline'])
+        self.assertIn('C:\\\\\\\\tmp', lines[0])
+        self.assertEqual(lines[1], '3\ttest_case_null\t\\N')
+        handler.insert_many.assert_not_called()
+        self.assertNotIn('load_data_error', report)
+
+        handler.modify_table.side_effect = SQLDBHandlerException("Unable to modify table")
+        report = import_table(handler, self.path('parameters.tcdump'))
+        self.assertEqual(report['method'], 'insert')
+        self.assertEqual(report['load_data_error'], "Unable to modify table")
+        data = handler.insert_many.call_args.kwargs['data']
+        self.assertEqual([row['id'] for row in data], ['2', '3'])
+        self.assertIsNone(data[1]['params'])
+
+if __name__ == '__main__':
+    # Specify the output directory for the XML reports
+    output_dir = 'test-reports'
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output=output_dir),
+        # Optional: hide options not applicable to xmlrunner from the help menu
+        failfast=False, buffer=False, catchbreak=False,
+        argv=['first-arg-is-ignored'], # Required to avoid issues with how unittest parses argv
+        exit=False # Prevents main from calling sys.exit
+    )